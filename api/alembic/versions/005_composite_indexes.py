@@ -0,0 +1,42 @@
+"""Composite indexes for hot query shapes
+
+Revision ID: 005
+Revises: 004
+Create Date: 2026-10-17
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '005'
+down_revision = '004'
+branch_labels = None
+depends_on = None
+
+# (index name, table, columns) - filter column first, sort column second
+INDEXES = [
+    ("ix_care_events_plant_id_event_date", "care_events", "plant_id, event_date"),
+    ("ix_care_events_batch_id_event_date", "care_events", "batch_id, event_date"),
+    ("ix_photos_batch_id_taken_at", "photos", "batch_id, taken_at"),
+    ("ix_photos_event_id_taken_at", "photos", "event_id, taken_at"),
+    ("ix_photos_user_id_taken_at", "photos", "user_id, taken_at"),
+    ("ix_distributions_batch_id", "distributions", "batch_id"),
+    ("ix_distributions_user_id", "distributions", "user_id"),
+    ("ix_events_batch_id_event_date", "events", "batch_id, event_date"),
+    ("ix_events_user_id_event_date", "events", "user_id, event_date"),
+    ("ix_season_costs_season_id_category", "season_costs", "season_id, category"),
+    ("ix_season_costs_user_id", "season_costs", "user_id"),
+]
+
+
+def upgrade() -> None:
+    # CONCURRENTLY avoids locking writes while building, but can't run inside a transaction
+    with op.get_context().autocommit_block():
+        for name, table, columns in INDEXES:
+            op.execute(f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} ON {table} ({columns})")
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, _table, _columns in reversed(INDEXES):
+            op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
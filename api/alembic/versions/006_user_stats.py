@@ -0,0 +1,170 @@
+"""User stats counters - maintained by triggers on events and plant_batches
+
+Revision ID: 006
+Revises: 005
+Create Date: 2026-10-17
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '006'
+down_revision = '005'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.execute("""
+        CREATE TABLE user_stats (
+            user_id INTEGER PRIMARY KEY REFERENCES users(id) ON DELETE CASCADE,
+            batch_count INTEGER NOT NULL DEFAULT 0,
+            event_count INTEGER NOT NULL DEFAULT 0,
+            last_active_day DATE,
+            current_streak INTEGER NOT NULL DEFAULT 0,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+
+    # Gaps-and-islands: consecutive days share the same (day - row_number) value,
+    # so the latest island is the user's most recent run of active days
+    op.execute("""
+        CREATE FUNCTION refresh_user_streak(uid INTEGER) RETURNS void AS $$
+        DECLARE
+            last_day DATE;
+            streak INTEGER;
+        BEGIN
+            WITH days AS (
+                SELECT DISTINCT event_date::date AS d FROM events WHERE user_id = uid
+            ), islands AS (
+                SELECT d, d - (ROW_NUMBER() OVER (ORDER BY d))::integer AS grp FROM days
+            )
+            SELECT max(d), count(*) INTO last_day, streak
+            FROM islands GROUP BY grp ORDER BY max(d) DESC LIMIT 1;
+
+            UPDATE user_stats
+            SET last_active_day = last_day, current_streak = COALESCE(streak, 0), updated_at = now()
+            WHERE user_id = uid;
+        END
+        $$ LANGUAGE plpgsql
+    """)
+
+    # New event: extend, restart or leave the latest run without rescanning history.
+    # Only a back-dated event landing right before the run needs a full recompute
+    # (it may join the run to an earlier one).
+    op.execute("""
+        CREATE FUNCTION user_stats_event_inserted() RETURNS trigger AS $$
+        DECLARE
+            d DATE := NEW.event_date::date;
+            last_day DATE;
+            streak INTEGER;
+        BEGIN
+            INSERT INTO user_stats (user_id, event_count) VALUES (NEW.user_id, 1)
+            ON CONFLICT (user_id) DO UPDATE SET event_count = user_stats.event_count + 1
+            RETURNING last_active_day, current_streak INTO last_day, streak;
+
+            IF last_day IS NULL OR d > last_day + 1 THEN
+                UPDATE user_stats SET last_active_day = d, current_streak = 1, updated_at = now()
+                WHERE user_id = NEW.user_id;
+            ELSIF d = last_day + 1 THEN
+                UPDATE user_stats SET last_active_day = d, current_streak = current_streak + 1, updated_at = now()
+                WHERE user_id = NEW.user_id;
+            ELSIF d = last_day - streak THEN
+                PERFORM refresh_user_streak(NEW.user_id);
+            END IF;
+            RETURN NULL;
+        END
+        $$ LANGUAGE plpgsql
+    """)
+
+    # Deletes are rare and may remove a whole batch's events at once:
+    # one statement-level pass per affected user
+    op.execute("""
+        CREATE FUNCTION user_stats_events_deleted() RETURNS trigger AS $$
+        DECLARE
+            r RECORD;
+        BEGIN
+            FOR r IN SELECT user_id, count(*) AS n FROM old_rows GROUP BY user_id LOOP
+                UPDATE user_stats SET event_count = GREATEST(event_count - r.n, 0)
+                WHERE user_id = r.user_id;
+                PERFORM refresh_user_streak(r.user_id);
+            END LOOP;
+            RETURN NULL;
+        END
+        $$ LANGUAGE plpgsql
+    """)
+
+    op.execute("""
+        CREATE FUNCTION user_stats_event_updated() RETURNS trigger AS $$
+        BEGIN
+            IF OLD.user_id <> NEW.user_id THEN
+                UPDATE user_stats SET event_count = GREATEST(event_count - 1, 0)
+                WHERE user_id = OLD.user_id;
+                INSERT INTO user_stats (user_id, event_count) VALUES (NEW.user_id, 1)
+                ON CONFLICT (user_id) DO UPDATE SET event_count = user_stats.event_count + 1;
+                PERFORM refresh_user_streak(OLD.user_id);
+            END IF;
+            PERFORM refresh_user_streak(NEW.user_id);
+            RETURN NULL;
+        END
+        $$ LANGUAGE plpgsql
+    """)
+
+    op.execute("""
+        CREATE FUNCTION user_stats_batch_changed() RETURNS trigger AS $$
+        BEGIN
+            IF TG_OP IN ('DELETE', 'UPDATE') THEN
+                UPDATE user_stats SET batch_count = GREATEST(batch_count - 1, 0)
+                WHERE user_id = OLD.user_id;
+            END IF;
+            IF TG_OP IN ('INSERT', 'UPDATE') THEN
+                INSERT INTO user_stats (user_id, batch_count) VALUES (NEW.user_id, 1)
+                ON CONFLICT (user_id) DO UPDATE SET batch_count = user_stats.batch_count + 1;
+            END IF;
+            RETURN NULL;
+        END
+        $$ LANGUAGE plpgsql
+    """)
+
+    op.execute("""
+        CREATE TRIGGER events_user_stats_insert AFTER INSERT ON events
+        FOR EACH ROW EXECUTE FUNCTION user_stats_event_inserted()
+    """)
+    op.execute("""
+        CREATE TRIGGER events_user_stats_delete AFTER DELETE ON events
+        REFERENCING OLD TABLE AS old_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION user_stats_events_deleted()
+    """)
+    op.execute("""
+        CREATE TRIGGER events_user_stats_update AFTER UPDATE OF user_id, event_date ON events
+        FOR EACH ROW
+        WHEN (OLD.user_id IS DISTINCT FROM NEW.user_id OR OLD.event_date IS DISTINCT FROM NEW.event_date)
+        EXECUTE FUNCTION user_stats_event_updated()
+    """)
+    op.execute("""
+        CREATE TRIGGER plant_batches_user_stats AFTER INSERT OR DELETE OR UPDATE OF user_id ON plant_batches
+        FOR EACH ROW EXECUTE FUNCTION user_stats_batch_changed()
+    """)
+
+    # Backfill from existing rows
+    op.execute("""
+        INSERT INTO user_stats (user_id, batch_count, event_count)
+        SELECT u.id,
+               (SELECT count(*) FROM plant_batches b WHERE b.user_id = u.id),
+               (SELECT count(*) FROM events e WHERE e.user_id = u.id)
+        FROM users u
+    """)
+    op.execute("SELECT refresh_user_streak(id) FROM users")
+
+
+def downgrade() -> None:
+    op.execute("DROP TRIGGER IF EXISTS plant_batches_user_stats ON plant_batches")
+    op.execute("DROP TRIGGER IF EXISTS events_user_stats_update ON events")
+    op.execute("DROP TRIGGER IF EXISTS events_user_stats_delete ON events")
+    op.execute("DROP TRIGGER IF EXISTS events_user_stats_insert ON events")
+    op.execute("DROP FUNCTION IF EXISTS user_stats_batch_changed()")
+    op.execute("DROP FUNCTION IF EXISTS user_stats_event_updated()")
+    op.execute("DROP FUNCTION IF EXISTS user_stats_events_deleted()")
+    op.execute("DROP FUNCTION IF EXISTS user_stats_event_inserted()")
+    op.execute("DROP FUNCTION IF EXISTS refresh_user_streak(INTEGER)")
+    op.execute("DROP TABLE IF EXISTS user_stats")
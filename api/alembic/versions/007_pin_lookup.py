@@ -0,0 +1,27 @@
+"""Add pin_lookup to users for single-verify PIN login
+
+Revision ID: 007
+Revises: 006
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '007'
+down_revision = '006'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Keyed HMAC of the PIN - nullable because existing rows can only be filled
+    # in once the plaintext PIN is seen again (next successful login)
+    op.add_column('users',
+        sa.Column('pin_lookup', sa.String(64), nullable=True)
+    )
+    op.create_index('ix_users_pin_lookup', 'users', ['pin_lookup'])
+
+
+def downgrade():
+    op.drop_index('ix_users_pin_lookup', 'users')
+    op.drop_column('users', 'pin_lookup')
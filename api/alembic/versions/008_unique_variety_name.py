@@ -0,0 +1,40 @@
+"""Unique plant_varieties.common_name for ON CONFLICT upserts
+
+Revision ID: 008
+Revises: 007
+Create Date: 2026-10-17
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '008'
+down_revision = '007'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # The API already refuses duplicate names; fold any older duplicates into
+    # the first row with that name before adding the constraint
+    op.execute("""
+        WITH keep AS (
+            SELECT common_name, min(id) AS id FROM plant_varieties
+            GROUP BY common_name HAVING count(*) > 1
+        )
+        UPDATE plant_batches b SET variety_id = keep.id
+        FROM plant_varieties v JOIN keep ON keep.common_name = v.common_name
+        WHERE b.variety_id = v.id AND v.id <> keep.id
+    """)
+    op.execute("""
+        DELETE FROM plant_varieties v
+        USING plant_varieties first
+        WHERE first.common_name = v.common_name AND first.id < v.id
+    """)
+    op.create_unique_constraint(
+        'plant_varieties_common_name_key', 'plant_varieties', ['common_name']
+    )
+
+
+def downgrade() -> None:
+    op.drop_constraint('plant_varieties_common_name_key', 'plant_varieties', type_='unique')
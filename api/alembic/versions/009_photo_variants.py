@@ -0,0 +1,27 @@
+"""Add resized photo variant mappings
+
+Revision ID: 009
+Revises: 008
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '009'
+down_revision = '008'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Filled in by the background derivative job (see imaging.make_variants);
+    # NULL until it has run, so clients fall back to the original file
+    op.add_column('photos', sa.Column('variants', sa.JSON(), nullable=True))
+    op.add_column('individual_plants', sa.Column('photo_variants', sa.JSON(), nullable=True))
+    op.add_column('care_events', sa.Column('photo_variants', sa.JSON(), nullable=True))
+
+
+def downgrade():
+    op.drop_column('care_events', 'photo_variants')
+    op.drop_column('individual_plants', 'photo_variants')
+    op.drop_column('photos', 'variants')
@@ -0,0 +1,30 @@
+"""Allow rows to share content-addressed photo files
+
+Revision ID: 010
+Revises: 009
+Create Date: 2026-10-17
+"""
+from alembic import op
+
+revision = '010'
+down_revision = '009'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Photos are stored as <sha256><ext>: the same picture on two batches is one
+    # file and two rows, so filename can no longer be unique
+    op.execute("ALTER TABLE photos DROP CONSTRAINT IF EXISTS photos_filename_key")
+
+    # Reference counting looks a filename up in all three columns
+    op.create_index('ix_photos_filename', 'photos', ['filename'])
+    op.create_index('ix_individual_plants_photo_url', 'individual_plants', ['photo_url'])
+    op.create_index('ix_care_events_photo_filename', 'care_events', ['photo_filename'])
+
+
+def downgrade():
+    op.drop_index('ix_care_events_photo_filename', 'care_events')
+    op.drop_index('ix_individual_plants_photo_url', 'individual_plants')
+    op.drop_index('ix_photos_filename', 'photos')
+    op.create_unique_constraint('photos_filename_key', 'photos', ['filename'])
@@ -0,0 +1,27 @@
+"""Add photo dimensions and byte size
+
+Revision ID: 011
+Revises: 010
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '011'
+down_revision = '010'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Read at upload time (after rotating upright) so clients can lay out a
+    # gallery without fetching the images; NULL for photos uploaded earlier
+    op.add_column('photos', sa.Column('width', sa.Integer(), nullable=True))
+    op.add_column('photos', sa.Column('height', sa.Integer(), nullable=True))
+    op.add_column('photos', sa.Column('byte_size', sa.Integer(), nullable=True))
+
+
+def downgrade():
+    op.drop_column('photos', 'byte_size')
+    op.drop_column('photos', 'height')
+    op.drop_column('photos', 'width')
@@ -0,0 +1,33 @@
+"""Add identify_cache for perceptual-hash lookups of plant identifications
+
+Revision ID: 012
+Revises: 011
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '012'
+down_revision = '011'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Looked up by Hamming distance over unexpired rows, so phash has no index -
+    # created_at bounds the scan and the expiry purge
+    op.create_table(
+        'identify_cache',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('phash', sa.BigInteger(), nullable=False),
+        sa.Column('result', sa.JSON(), nullable=False),
+        sa.Column('hit_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('last_hit_at', sa.DateTime(), nullable=True),
+    )
+    op.create_index('ix_identify_cache_created_at', 'identify_cache', ['created_at'])
+
+
+def downgrade():
+    op.drop_index('ix_identify_cache_created_at', table_name='identify_cache')
+    op.drop_table('identify_cache')
@@ -0,0 +1,31 @@
+"""Add exact and banded lookup columns to identify_cache
+
+Revision ID: 013
+Revises: 012
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision = '013'
+down_revision = '012'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # It's only a cache - start it over rather than backfill the new columns
+    op.execute("DELETE FROM identify_cache")
+    op.add_column('identify_cache', sa.Column('sha256', sa.String(64), nullable=False))
+    op.add_column('identify_cache', sa.Column('phash_bands', postgresql.ARRAY(sa.Integer()), nullable=False))
+    op.create_index('ix_identify_cache_sha256', 'identify_cache', ['sha256'])
+    # Near matches are found by overlapping bands (&&), which a GIN index serves
+    op.create_index('ix_identify_cache_phash_bands', 'identify_cache', ['phash_bands'], postgresql_using='gin')
+
+
+def downgrade():
+    op.drop_index('ix_identify_cache_phash_bands', table_name='identify_cache')
+    op.drop_index('ix_identify_cache_sha256', table_name='identify_cache')
+    op.drop_column('identify_cache', 'phash_bands')
+    op.drop_column('identify_cache', 'sha256')
@@ -0,0 +1,168 @@
+"""Signed session tokens and current-user resolution.
+
+/auth/login issues an HS256 JWT carrying the user id. Mutating endpoints depend
+on get_current_user, which verifies the token signature and resolves the user
+from a small in-process LRU cache - the database is only hit on a cache miss.
+
+The legacy ?user_id= parameter is only honoured with AUTH_ALLOW_QUERY_USER_ID=true,
+a temporary escape hatch for clients that predate tokens - it lets anyone act as
+any user, so leave it off (the default).
+
+require_admin guards the /admin diagnostics: a valid token whose user is listed
+in ADMIN_USER_IDS, never ?user_id=.
+"""
+
+import os
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Optional
+
+from fastapi import Depends, HTTPException, status
+from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
+from jose import JWTError, jwt
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from database import get_async_db
+from models import User
+
+SECRET_KEY = os.getenv("SECRET_KEY")
+if not SECRET_KEY:
+    # A guessable default would let anyone forge a token for any user
+    raise RuntimeError("SECRET_KEY is not set - generate one with: openssl rand -hex 32")
+ALGORITHM = "HS256"
+TOKEN_TTL_HOURS = int(os.getenv("TOKEN_TTL_HOURS", "720"))
+ALLOW_QUERY_USER_ID = os.getenv("AUTH_ALLOW_QUERY_USER_ID", "false").lower() == "true"
+ADMIN_USER_IDS = {int(i) for i in os.getenv("ADMIN_USER_IDS", "").split(",") if i.strip()}
+
+USER_CACHE_SIZE = int(os.getenv("USER_CACHE_SIZE", "256"))
+USER_CACHE_TTL = int(os.getenv("USER_CACHE_TTL", "300"))
+
+bearer_scheme = HTTPBearer(auto_error=False)
+
+
+@dataclass(frozen=True)
+class CurrentUser:
+    """The authenticated user, as cached between requests."""
+    id: int
+    name: str
+    display_color: str
+
+
+class UserCache:
+    """LRU of validated users with a TTL.
+
+    The API never renames or deletes users; a change made directly in the
+    database shows up once the entry expires (USER_CACHE_TTL seconds).
+    """
+
+    def __init__(self, max_size: int, ttl: float):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries = OrderedDict()  # user_id -> (expires_at, CurrentUser)
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, user_id: int) -> Optional[CurrentUser]:
+        entry = self._entries.get(user_id)
+        if entry is None or entry[0] < time.monotonic():
+            self._entries.pop(user_id, None)
+            self.misses += 1
+            return None
+        self._entries.move_to_end(user_id)
+        self.hits += 1
+        return entry[1]
+
+    def put(self, user: CurrentUser):
+        self._entries[user.id] = (time.monotonic() + self.ttl, user)
+        self._entries.move_to_end(user.id)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def stats(self) -> dict:
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "ttl_seconds": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+user_cache = UserCache(USER_CACHE_SIZE, USER_CACHE_TTL)
+
+
+def create_access_token(user: User) -> str:
+    """Signed token for a user who just logged in."""
+    now = datetime.utcnow()
+    claims = {
+        "sub": str(user.id),
+        "name": user.name,
+        "iat": now,
+        "exp": now + timedelta(hours=TOKEN_TTL_HOURS),
+    }
+    return jwt.encode(claims, SECRET_KEY, algorithm=ALGORITHM)
+
+
+def _unauthorized(detail: str) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail=detail,
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+
+
+def _decode_token(token: str) -> int:
+    """User id from a valid token; 401 if the signature or expiry check fails."""
+    try:
+        claims = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        return int(claims["sub"])
+    except (JWTError, KeyError, ValueError):
+        raise _unauthorized("Invalid or expired token")
+
+
+async def _load_user(user_id: int, db: AsyncSession) -> CurrentUser:
+    user = user_cache.get(user_id)
+    if user is not None:
+        return user
+
+    db_user = await db.get(User, user_id)
+    if not db_user:
+        raise _unauthorized("User not found")
+
+    user = CurrentUser(id=db_user.id, name=db_user.name, display_color=db_user.display_color)
+    user_cache.put(user)
+    return user
+
+
+async def get_current_user(
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(bearer_scheme),
+    user_id: Optional[int] = None,  # Legacy: injected from frontend session
+    db: AsyncSession = Depends(get_async_db),
+) -> CurrentUser:
+    """Resolve the caller from the Bearer token (or legacy ?user_id=)."""
+    if credentials is not None:
+        resolved_id = _decode_token(credentials.credentials)
+    elif user_id is not None and ALLOW_QUERY_USER_ID:
+        resolved_id = user_id
+    else:
+        raise _unauthorized("Not authenticated")
+
+    return await _load_user(resolved_id, db)
+
+
+async def require_admin(
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(bearer_scheme),
+    db: AsyncSession = Depends(get_async_db),
+) -> CurrentUser:
+    """Bearer-token caller listed in ADMIN_USER_IDS (403 otherwise, and for everyone when it's empty)."""
+    if credentials is None:
+        raise _unauthorized("Not authenticated")
+    user = await _load_user(_decode_token(credentials.credentials), db)
+    if user.id not in ADMIN_USER_IDS:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Admin access required"
+        )
+    return user
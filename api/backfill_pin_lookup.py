@@ -0,0 +1,98 @@
+#!/usr/bin/env python
+"""Fill users.pin_lookup for users who have none yet.
+
+Login finds the one PIN hash worth verifying through pin_lookup; while any user
+is without it, everyone has to pick their name before entering their PIN. Run this once after migration
+007, and again after rotating PIN_LOOKUP_KEY (clear the column first).
+
+A plaintext pin (pre-migration rows) is used directly. Otherwise the PIN is
+recovered from its argon2 hash - there are only 10,000 of them, so every
+candidate is verified in a process pool, --known PINs first. argon2 is slow on
+purpose: a full search takes minutes per core, a --known hit well under a second.
+
+    python backfill_pin_lookup.py --dry-run
+    python backfill_pin_lookup.py --known 1234
+"""
+
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from sqlalchemy import select
+
+from database import SessionLocal
+from models import User
+from security import pin_lookup, verify_pin
+
+# Candidate PINs handed to each worker at a time
+CHUNK_SIZE = 50
+
+
+def _matching_pin(pin_hash: str, pins: list[str]):
+    """First PIN in pins that verifies against pin_hash (runs in a worker)."""
+    for pin in pins:
+        if verify_pin(pin, pin_hash):
+            return pin
+    return None
+
+
+def recover_pin(pool: ProcessPoolExecutor, pin_hash: str, known: list[str]):
+    candidates = known + [f"{n:04d}" for n in range(10000) if f"{n:04d}" not in known]
+    chunks = [candidates[i:i + CHUNK_SIZE] for i in range(0, len(candidates), CHUNK_SIZE)]
+    futures = [pool.submit(_matching_pin, pin_hash, chunk) for chunk in chunks]
+    try:
+        # Checked in submission order, so known PINs win
+        for future in futures:
+            pin = future.result()
+            if pin is not None:
+                return pin
+        return None
+    finally:
+        for future in futures:
+            future.cancel()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Index users that have no pin_lookup yet.")
+    parser.add_argument("--known", nargs="*", default=[], help="PINs to try before searching all 10,000")
+    parser.add_argument("--dry-run", action="store_true", help="report what would be indexed, change nothing")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="processes (default: cpu count)")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        users = db.scalars(select(User).where(User.pin_lookup.is_(None)).order_by(User.id)).all()
+        print(f"🔐 {len(users)} users without a PIN lookup")
+
+        failed = 0
+        with ProcessPoolExecutor(max_workers=args.workers) as pool:
+            for user in users:
+                started = time.perf_counter()
+                if user.pin:
+                    pin = user.pin
+                elif user.pin_hash:
+                    pin = recover_pin(pool, user.pin_hash, args.known)
+                else:
+                    pin = None
+                if pin is None:
+                    print(f"✗ {user.name} (ID: {user.id}): no PIN found", file=sys.stderr)
+                    failed += 1
+                    continue
+                user.pin_lookup = pin_lookup(pin)
+                print(f"✓ {user.name} (ID: {user.id}) in {time.perf_counter() - started:.1f}s")
+
+        if args.dry_run:
+            db.rollback()
+        else:
+            db.commit()
+    finally:
+        db.close()
+
+    print(f"\n✅ {len(users) - failed} users {'to index' if args.dry_run else 'indexed'}, {failed} failed")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
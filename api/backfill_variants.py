@@ -0,0 +1,118 @@
+#!/usr/bin/env python
+"""Generate resized photo variants for files uploaded before they existed.
+
+Finds every stored photo (photos.filename, individual_plants.photo_url,
+care_events.photo_filename) whose variants are missing - never generated, or
+files gone from disk (e.g. after a restore) - and builds them in a process pool.
+
+    python backfill_variants.py              # only what is missing
+    python backfill_variants.py --all        # regenerate everything
+    python backfill_variants.py --dry-run    # just count
+"""
+
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+
+from sqlalchemy import select, union_all
+
+from database import engine
+from imaging import make_variants, variant_files
+from models import Photo, IndividualPlant, CareEvent
+from storage import storage
+from uploads import variant_updates
+
+# Results written to the database per transaction
+COMMIT_EVERY = 100
+
+
+def stored_photos():
+    """(filename, variants) for every row that references a photo file."""
+    query = union_all(
+        select(Photo.filename, Photo.variants),
+        select(IndividualPlant.photo_url, IndividualPlant.photo_variants)
+        .where(IndividualPlant.photo_url.isnot(None)),
+        select(CareEvent.photo_filename, CareEvent.photo_variants)
+        .where(CareEvent.photo_filename.isnot(None)),
+    )
+    with engine.connect() as conn:
+        return conn.execute(query).all()
+
+
+def needs_variants(variants) -> bool:
+    names = variant_files(variants)
+    return not names or not all(storage.exists(name) for name in names)
+
+
+def save(results: list[tuple[str, dict]]):
+    with engine.begin() as conn:
+        for filename, variants in results:
+            for statement in variant_updates(filename, variants):
+                conn.execute(statement)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate resized variants for stored photos.")
+    parser.add_argument("--all", action="store_true", help="regenerate variants that already exist")
+    parser.add_argument("--dry-run", action="store_true", help="count photos to process, change nothing")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="processes (default: cpu count)")
+    args = parser.parse_args()
+
+    todo = {}
+    missing = 0
+    for filename, variants in stored_photos():
+        if filename in todo or not (args.all or needs_variants(variants)):
+            continue
+        if not storage.exists(filename):
+            missing += 1
+            continue
+        todo[filename] = True
+
+    print(f"🖼  {len(todo)} photos need variants" + (f" ({missing} originals missing on disk)" if missing else ""))
+    if args.dry_run or not todo:
+        return
+
+    started = time.perf_counter()
+    done = failed = 0
+    results = []
+    filenames = iter(todo)
+
+    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+        # Keep a bounded window of jobs in flight rather than queueing every file up front
+        pending = {}
+        for filename in filenames:
+            pending[pool.submit(make_variants, filename)] = filename
+            if len(pending) >= args.workers * 2:
+                break
+
+        while pending:
+            finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in finished:
+                filename = pending.pop(future)
+                try:
+                    results.append((filename, future.result()))
+                    done += 1
+                except Exception as e:
+                    print(f"✗ {filename}: {e}", file=sys.stderr)
+                    failed += 1
+                next_filename = next(filenames, None)
+                if next_filename is not None:
+                    pending[pool.submit(make_variants, next_filename)] = next_filename
+
+            if len(results) >= COMMIT_EVERY:
+                save(results)
+                results = []
+                print(f"  {done}/{len(todo)}")
+
+    if results:
+        save(results)
+
+    elapsed = time.perf_counter() - started
+    print(f"\n✅ {done} photos processed, {failed} failed in {elapsed:.1f}s "
+          f"({done / elapsed if elapsed > 0 else 0:.1f} photos/s)")
+
+
+if __name__ == "__main__":
+    main()
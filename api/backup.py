@@ -0,0 +1,253 @@
+#!/usr/bin/env python
+"""Full backup: every table plus the photo files, as one streamed zip.
+
+The archive is produced by a generator - rows are read with server-side cursors
+inside a single REPEATABLE READ transaction (a consistent snapshot) and photo
+files are copied in chunks, so nothing is buffered in memory or on disk.
+
+Layout:
+    manifest.json          format version, alembic revision, table order
+    db/<table>.ndjson      one JSON object per row
+    photos/<filename>      every file referenced by photos.filename,
+                           individual_plants.photo_url and care_events.photo_filename
+    summary.json           row counts and missing photo files (written last)
+
+    python backup.py dump -o plantlady-backup.zip
+    python backup.py restore plantlady-backup.zip [--replace]
+
+CLI only - the archive holds PIN hashes and every photo, so it is never served over HTTP.
+"""
+
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+import zipfile
+from datetime import date, datetime
+from pathlib import Path
+from typing import Iterator
+
+from sqlalchemy import Date, DateTime, text, union
+from sqlalchemy.engine import Connection
+
+from database import engine, Base
+from exporter import ZipSink, plain_value
+from models import Photo, IndividualPlant, CareEvent
+from storage import storage
+
+BACKUP_FORMAT = 1
+BACKUP_YIELD_PER = 1000
+BACKUP_CHUNK_BYTES = 256 * 1024
+RESTORE_BATCH_ROWS = 1000
+
+
+def _referenced_photos(conn: Connection):
+    """Every photo filename the snapshot points at."""
+    query = union(
+        Photo.__table__.select().with_only_columns(Photo.filename),
+        IndividualPlant.__table__.select().with_only_columns(IndividualPlant.photo_url)
+        .where(IndividualPlant.photo_url.isnot(None)),
+        CareEvent.__table__.select().with_only_columns(CareEvent.photo_filename)
+        .where(CareEvent.photo_filename.isnot(None)),
+    )
+    return conn.execution_options(yield_per=BACKUP_YIELD_PER).execute(query).scalars()
+
+
+def iter_backup() -> Iterator[bytes]:
+    """Yield the backup zip in chunks (sync generator - run it off the event loop)."""
+    sink = ZipSink()
+    counts = {}
+    missing = []
+
+    with engine.connect() as conn:
+        conn = conn.execution_options(isolation_level="REPEATABLE READ")
+        with conn.begin(), zipfile.ZipFile(sink, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+            revision = conn.execute(text("SELECT version_num FROM alembic_version")).scalar()
+            archive.writestr("manifest.json", json.dumps({
+                "format": BACKUP_FORMAT,
+                "created_at": datetime.utcnow().isoformat(),
+                "alembic_revision": revision,
+                "tables": [table.name for table in Base.metadata.sorted_tables],
+            }, indent=2))
+            yield sink.drain()
+
+            for table in Base.metadata.sorted_tables:
+                rows = conn.execution_options(yield_per=BACKUP_YIELD_PER).execute(
+                    table.select().order_by(*table.primary_key.columns)
+                )
+                counts[table.name] = 0
+                with archive.open(f"db/{table.name}.ndjson", "w") as part:
+                    for row in rows.mappings():
+                        record = {key: plain_value(value) for key, value in row.items()}
+                        part.write((json.dumps(record, separators=(",", ":")) + "\n").encode())
+                        counts[table.name] += 1
+                        if sink.size >= BACKUP_CHUNK_BYTES:
+                            yield sink.drain()
+                yield sink.drain()
+
+            # Images are already compressed - store them as-is
+            for filename in _referenced_photos(conn):
+                stat = storage.stat(filename)
+                if stat is None:
+                    missing.append(filename)
+                    continue
+                info = zipfile.ZipInfo(f"photos/{filename}", date_time=time.localtime(stat.st_mtime)[:6])
+                info.compress_type = zipfile.ZIP_STORED
+                with storage.open(filename) as src, archive.open(info, "w") as dst:
+                    while chunk := src.read(BACKUP_CHUNK_BYTES):
+                        dst.write(chunk)
+                        yield sink.drain()
+
+            archive.writestr("summary.json", json.dumps({
+                "rows": counts,
+                "photos_missing": missing,
+            }, indent=2))
+    yield sink.drain()
+
+
+# ============================================================================
+# Restore
+# ============================================================================
+
+def _date_columns(table) -> list[tuple[str, type]]:
+    """(column, parser) for the table's date/time columns - the dump writes them as ISO strings."""
+    columns = []
+    for column in table.columns:
+        if isinstance(column.type, DateTime):
+            columns.append((column.name, datetime))
+        elif isinstance(column.type, Date):
+            columns.append((column.name, date))
+    return columns
+
+
+def _coerce(record: dict, date_columns: list[tuple[str, type]]) -> dict:
+    for name, parser in date_columns:
+        value = record.get(name)
+        if isinstance(value, str):
+            record[name] = parser.fromisoformat(value)
+    return record
+
+
+def restore(archive_path: Path, replace: bool = False, restore_photos: bool = True) -> dict:
+    """Bulk-load a backup into a migrated database in one transaction.
+
+    Refuses to run against a database that already has rows unless replace=True,
+    in which case every table is truncated first. User triggers (user_stats
+    counters) are disabled while loading - the backup already has their output.
+    """
+    tables = Base.metadata.sorted_tables
+    counts = {}
+
+    with zipfile.ZipFile(archive_path) as archive:
+        manifest = json.loads(archive.read("manifest.json"))
+        if manifest.get("format") != BACKUP_FORMAT:
+            raise ValueError(f"Unsupported backup format: {manifest.get('format')}")
+
+        with engine.begin() as conn:
+            revision = conn.execute(text("SELECT version_num FROM alembic_version")).scalar()
+            if revision != manifest.get("alembic_revision"):
+                raise ValueError(
+                    f"Backup is from migration {manifest.get('alembic_revision')}, database is at {revision}"
+                )
+
+            names = ", ".join(table.name for table in tables)
+            if replace:
+                conn.execute(text(f"TRUNCATE {names} RESTART IDENTITY CASCADE"))
+            else:
+                for table in tables:
+                    if conn.execute(text(f"SELECT EXISTS (SELECT 1 FROM {table.name})")).scalar():
+                        raise ValueError(f"Table {table.name} is not empty (use --replace)")
+
+            for table in tables:
+                conn.execute(text(f"ALTER TABLE {table.name} DISABLE TRIGGER USER"))
+
+            for table in tables:
+                counts[table.name] = 0
+                member = f"db/{table.name}.ndjson"
+                if member not in archive.namelist():
+                    continue
+                date_columns = _date_columns(table)
+                batch = []
+                with archive.open(member) as lines:
+                    for line in lines:
+                        batch.append(_coerce(json.loads(line), date_columns))
+                        if len(batch) >= RESTORE_BATCH_ROWS:
+                            conn.execute(table.insert(), batch)
+                            counts[table.name] += len(batch)
+                            batch = []
+                if batch:
+                    conn.execute(table.insert(), batch)
+                    counts[table.name] += len(batch)
+
+            for table in tables:
+                conn.execute(text(f"ALTER TABLE {table.name} ENABLE TRIGGER USER"))
+                # Point serial sequences past the restored ids
+                if "id" in table.columns:
+                    conn.execute(text(
+                        f"SELECT setval(pg_get_serial_sequence('{table.name}', 'id'), "
+                        f"COALESCE(max(id), 1), max(id) IS NOT NULL) FROM {table.name}"
+                    ))
+
+        photos = 0
+        if restore_photos:
+            for info in archive.infolist():
+                if not info.filename.startswith("photos/") or info.is_dir():
+                    continue
+                name = Path(info.filename).name
+                stat = storage.stat(name)
+                if stat and stat.st_size == info.file_size:
+                    continue
+                fd, staged = tempfile.mkstemp(dir=storage.temp_dir, prefix=".restore-")
+                with archive.open(info) as src, os.fdopen(fd, "wb") as dst:
+                    shutil.copyfileobj(src, dst, BACKUP_CHUNK_BYTES)
+                storage.put_file(Path(staged), name)
+                photos += 1
+
+    return {"rows": counts, "photos_restored": photos}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Back up or restore the PlantLady database and photos.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    dump = commands.add_parser("dump", help="write a backup zip")
+    dump.add_argument("-o", "--output", default="-", help="output file (default: stdout)")
+
+    load = commands.add_parser("restore", help="load a backup zip into a migrated database")
+    load.add_argument("archive", type=Path)
+    load.add_argument("--replace", action="store_true", help="truncate existing data first")
+    load.add_argument("--skip-photos", action="store_true", help="only restore database rows")
+
+    args = parser.parse_args()
+
+    if args.command == "dump":
+        started = time.perf_counter()
+        out = sys.stdout.buffer if args.output == "-" else open(args.output, "wb")
+        size = 0
+        try:
+            for chunk in iter_backup():
+                out.write(chunk)
+                size += len(chunk)
+        finally:
+            if out is not sys.stdout.buffer:
+                out.close()
+        print(f"✅ Backup written: {size / 1024 / 1024:.1f} MB in {time.perf_counter() - started:.1f}s",
+              file=sys.stderr)
+        return
+
+    try:
+        result = restore(args.archive, replace=args.replace, restore_photos=not args.skip_photos)
+    except ValueError as e:
+        print(f"❌ {e}", file=sys.stderr)
+        sys.exit(1)
+    for table, count in result["rows"].items():
+        print(f"✓ {table}: {count} rows")
+    print(f"✓ photos: {result['photos_restored']} files")
+    print("\n✅ Restore complete")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""Bounded executors for running blocking work off the event loop.
+
+Two pools:
+- io:  threads for blocking I/O (sync SQLAlchemy, file writes, HTTP SDK calls)
+- cpu: processes for CPU-bound work (argon2 PIN verification)
+
+Callers await run_io()/run_cpu(). Each pool caps how much work may be queued;
+callers beyond the cap wait (without blocking the loop) for a free slot.
+"""
+
+import asyncio
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from functools import partial
+
+IO_POOL_WORKERS = int(os.getenv("IO_POOL_WORKERS", "16"))
+IO_POOL_MAX_PENDING = int(os.getenv("IO_POOL_MAX_PENDING", "256"))
+CPU_POOL_WORKERS = int(os.getenv("CPU_POOL_WORKERS", str(min(4, os.cpu_count() or 1))))
+CPU_POOL_MAX_PENDING = int(os.getenv("CPU_POOL_MAX_PENDING", "64"))
+
+
+class BoundedPool:
+    """Lazily created executor that caps in-flight work and tracks queue depth.
+
+    Counters are only touched from the event loop thread, so they need no lock.
+    """
+
+    def __init__(self, name: str, factory, max_workers: int, max_pending: int):
+        self.name = name
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self._factory = factory
+        self._executor = None
+        self._executor_lock = threading.Lock()
+        self._slots = None  # asyncio.Semaphore, created inside the running loop
+        self.in_flight = 0
+        self.waiting = 0
+        self.completed = 0
+        self.failed = 0
+
+    def _get_executor(self):
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = self._factory(self.max_workers)
+            return self._executor
+
+    async def run(self, fn, *args, **kwargs):
+        """Run fn(*args, **kwargs) in the pool and await its result."""
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_pending)
+
+        self.waiting += 1
+        try:
+            await self._slots.acquire()
+        finally:
+            self.waiting -= 1
+
+        self.in_flight += 1
+        try:
+            loop = asyncio.get_running_loop()
+            result = await loop.run_in_executor(self._get_executor(), partial(fn, *args, **kwargs))
+        except Exception:
+            self.failed += 1
+            raise
+        finally:
+            self.in_flight -= 1
+            self._slots.release()
+        self.completed += 1
+        return result
+
+    def stats(self) -> dict:
+        """Current saturation: queued > 0 means every worker is busy."""
+        return {
+            "workers": self.max_workers,
+            "in_flight": self.in_flight,
+            "queued": max(self.in_flight - self.max_workers, 0),
+            "waiting_for_slot": self.waiting,
+            "max_pending": self.max_pending,
+            "completed": self.completed,  # returned normally
+            "failed": self.failed,  # raised
+        }
+
+    def shutdown(self):
+        with self._executor_lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+
+
+io_pool = BoundedPool(
+    "io",
+    lambda n: ThreadPoolExecutor(max_workers=n, thread_name_prefix="plantlady-io"),
+    IO_POOL_WORKERS,
+    IO_POOL_MAX_PENDING,
+)
+
+# spawn rather than fork: forking a process that already runs uvicorn's threads is unsafe.
+# Functions sent here must be importable module-level callables with picklable arguments.
+cpu_pool = BoundedPool(
+    "cpu",
+    lambda n: ProcessPoolExecutor(max_workers=n, mp_context=multiprocessing.get_context("spawn")),
+    CPU_POOL_WORKERS,
+    CPU_POOL_MAX_PENDING,
+)
+
+
+async def run_io(fn, *args, **kwargs):
+    """Run blocking I/O in the thread pool."""
+    return await io_pool.run(fn, *args, **kwargs)
+
+
+async def run_cpu(fn, *args, **kwargs):
+    """Run CPU-bound work in the process pool."""
+    return await cpu_pool.run(fn, *args, **kwargs)
+
+
+def get_executor_stats() -> dict:
+    """Per-pool queue depth and throughput counters."""
+    return {pool.name: pool.stats() for pool in (io_pool, cpu_pool)}
+
+
+def shutdown_executors():
+    """Stop both pools (called on app shutdown)."""
+    io_pool.shutdown()
+    cpu_pool.shutdown()
@@ -0,0 +1,310 @@
+"""Streaming season export (CSV, NDJSON, XLSX).
+
+Each record type is read with a server-side cursor (yield_per) and encoded as it
+arrives, so memory stays flat and the first bytes go out before the last row is
+read. XLSX is written by hand as a zip of sheet XML parts streamed into a
+non-seekable sink - openpyxl's write-only mode still builds the file on disk.
+"""
+
+import csv
+import enum
+import io
+import json
+import re
+import zipfile
+from datetime import date, datetime
+from decimal import Decimal
+from typing import AsyncIterator
+from xml.sax.saxutils import escape
+
+from sqlalchemy import Select, select
+
+from database import AsyncSessionLocal
+from models import PlantBatch, PlantVariety, Event, CareEvent, SeasonCost, Distribution
+
+# Rows fetched per server-side cursor round trip
+EXPORT_YIELD_PER = 1000
+# Bytes buffered before handing a chunk to the response
+EXPORT_CHUNK_BYTES = 64 * 1024
+
+MEDIA_TYPES = {
+    "csv": "text/csv",
+    "ndjson": "application/x-ndjson",
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+}
+
+
+def _batches(season_id: int) -> Select:
+    return (
+        select(
+            PlantBatch.id, PlantBatch.user_id,
+            PlantVariety.common_name.label("variety"), PlantVariety.scientific_name, PlantVariety.category,
+            PlantBatch.seeds_count, PlantBatch.packets, PlantBatch.source, PlantBatch.location,
+            PlantBatch.start_date, PlantBatch.transplant_date, PlantBatch.repeat_next_year,
+            PlantBatch.outcome_notes, PlantBatch.created_at,
+        )
+        .join(PlantVariety, PlantBatch.variety_id == PlantVariety.id)
+        .where(PlantBatch.season_id == season_id)
+        .order_by(PlantBatch.id)
+    )
+
+
+def _events(season_id: int) -> Select:
+    return (
+        select(
+            Event.id, Event.batch_id, PlantVariety.common_name.label("variety"), Event.user_id,
+            Event.event_type, Event.event_date, Event.notes, Event.created_at,
+        )
+        .join(PlantBatch, Event.batch_id == PlantBatch.id)
+        .join(PlantVariety, PlantBatch.variety_id == PlantVariety.id)
+        .where(PlantBatch.season_id == season_id)
+        .order_by(Event.batch_id, Event.event_date, Event.id)
+    )
+
+
+def _care_events(season_id: int) -> Select:
+    return (
+        select(
+            CareEvent.id, CareEvent.batch_id, PlantVariety.common_name.label("variety"), CareEvent.user_id,
+            CareEvent.care_type, CareEvent.event_date, CareEvent.milestone_label, CareEvent.notes,
+            CareEvent.created_at,
+        )
+        .join(PlantBatch, CareEvent.batch_id == PlantBatch.id)
+        .join(PlantVariety, PlantBatch.variety_id == PlantVariety.id)
+        .where(PlantBatch.season_id == season_id)
+        .order_by(CareEvent.batch_id, CareEvent.event_date, CareEvent.id)
+    )
+
+
+def _costs(season_id: int) -> Select:
+    return (
+        select(
+            SeasonCost.id, SeasonCost.user_id, SeasonCost.item_name, SeasonCost.category,
+            SeasonCost.cost, SeasonCost.quantity, SeasonCost.is_one_time, SeasonCost.notes,
+            SeasonCost.created_at,
+        )
+        .where(SeasonCost.season_id == season_id)
+        .order_by(SeasonCost.id)
+    )
+
+
+def _distributions(season_id: int) -> Select:
+    return (
+        select(
+            Distribution.id, Distribution.batch_id, PlantVariety.common_name.label("variety"),
+            Distribution.user_id, Distribution.type, Distribution.recipient, Distribution.quantity,
+            Distribution.date, Distribution.notes, Distribution.created_at,
+        )
+        .join(PlantBatch, Distribution.batch_id == PlantBatch.id)
+        .join(PlantVariety, PlantBatch.variety_id == PlantVariety.id)
+        .where(PlantBatch.season_id == season_id)
+        .order_by(Distribution.batch_id, Distribution.date, Distribution.id)
+    )
+
+
+# (record type, query builder) - also the XLSX sheet order
+RECORD_TYPES = [
+    ("batches", _batches),
+    ("events", _events),
+    ("care_events", _care_events),
+    ("costs", _costs),
+    ("distributions", _distributions),
+]
+
+
+def plain_value(value):
+    """A DB value as a JSON/CSV-friendly scalar."""
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, enum.Enum):
+        return value.value
+    return value
+
+
+async def _records(season_id: int) -> AsyncIterator[tuple[str, list[str], AsyncIterator]]:
+    """(record type, columns, async row iterator) for each record type, on one session."""
+    async with AsyncSessionLocal() as session:
+        for record_type, build in RECORD_TYPES:
+            stmt = build(season_id).execution_options(yield_per=EXPORT_YIELD_PER)
+            result = await session.stream(stmt)
+            try:
+                yield record_type, list(stmt.selected_columns.keys()), result
+            finally:
+                await result.close()
+
+
+# ============================================================================
+# CSV / NDJSON
+# ============================================================================
+
+def csv_columns() -> list[str]:
+    """Union of every record type's columns, led by record_type."""
+    columns = ["record_type"]
+    for _record_type, build in RECORD_TYPES:
+        for column in build(0).selected_columns.keys():
+            if column not in columns:
+                columns.append(column)
+    return columns
+
+
+async def stream_csv(season_id: int) -> AsyncIterator[bytes]:
+    """One CSV with a record_type column; columns a record type doesn't have are empty."""
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=csv_columns(), extrasaction="ignore")
+    writer.writeheader()
+    async for record_type, columns, rows in _records(season_id):
+        async for row in rows:
+            record = {column: plain_value(value) for column, value in zip(columns, row)}
+            record["record_type"] = record_type
+            writer.writerow(record)
+            if buffer.tell() >= EXPORT_CHUNK_BYTES:
+                yield buffer.getvalue().encode()
+                buffer.seek(0)
+                buffer.truncate()
+    yield buffer.getvalue().encode()
+
+
+async def stream_ndjson(season_id: int) -> AsyncIterator[bytes]:
+    """One JSON object per line, tagged with "record"."""
+    chunk = []
+    size = 0
+    async for record_type, columns, rows in _records(season_id):
+        async for row in rows:
+            record = {"record": record_type}
+            record.update((column, plain_value(value)) for column, value in zip(columns, row))
+            line = json.dumps(record, separators=(",", ":")) + "\n"
+            chunk.append(line)
+            size += len(line)
+            if size >= EXPORT_CHUNK_BYTES:
+                yield "".join(chunk).encode()
+                chunk = []
+                size = 0
+    yield "".join(chunk).encode()
+
+
+# ============================================================================
+# XLSX
+# ============================================================================
+
+# Characters XML 1.0 can't carry even escaped
+_XML_ILLEGAL = re.compile("[\x00-\x08\x0b\x0c\x0e-\x1f]")
+
+_CONTENT_TYPES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/xl/workbook.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+    '{sheets}</Types>'
+)
+_ROOT_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+    'Target="xl/workbook.xml"/></Relationships>'
+)
+_WORKBOOK = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+    'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+    '<sheets>{sheets}</sheets></workbook>'
+)
+_WORKBOOK_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '{sheets}</Relationships>'
+)
+_SHEET_HEAD = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"><sheetData>'
+)
+_SHEET_TAIL = '</sheetData></worksheet>'
+
+
+class ZipSink:
+    """Write-only, non-seekable file object that collects zip output for the response.
+
+    zipfile detects the missing tell()/seek() and writes data descriptors instead
+    of seeking back to patch local headers.
+    """
+
+    def __init__(self):
+        self._chunks = []
+        self.size = 0
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        self.size += len(data)
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks = []
+        self.size = 0
+        return data
+
+
+def _xlsx_cell(value) -> str:
+    value = plain_value(value)
+    if value is None:
+        return "<c/>"
+    if isinstance(value, bool):
+        return f'<c t="b"><v>{int(value)}</v></c>'
+    if isinstance(value, (int, float)):
+        return f"<c><v>{value}</v></c>"
+    text = escape(_XML_ILLEGAL.sub("", str(value)))
+    return f'<c t="inlineStr"><is><t xml:space="preserve">{text}</t></is></c>'
+
+
+def _xlsx_row(values) -> str:
+    return "<row>" + "".join(_xlsx_cell(value) for value in values) + "</row>"
+
+
+async def stream_xlsx(season_id: int) -> AsyncIterator[bytes]:
+    """A workbook with one sheet per record type, streamed part by part."""
+    names = [record_type for record_type, _build in RECORD_TYPES]
+    sink = ZipSink()
+    with zipfile.ZipFile(sink, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr("[Content_Types].xml", _CONTENT_TYPES.format(sheets="".join(
+            f'<Override PartName="/xl/worksheets/sheet{i}.xml" '
+            f'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+            for i in range(1, len(names) + 1)
+        )))
+        archive.writestr("_rels/.rels", _ROOT_RELS)
+        archive.writestr("xl/workbook.xml", _WORKBOOK.format(sheets="".join(
+            f'<sheet name="{name}" sheetId="{i}" r:id="rId{i}"/>' for i, name in enumerate(names, start=1)
+        )))
+        archive.writestr("xl/_rels/workbook.xml.rels", _WORKBOOK_RELS.format(sheets="".join(
+            f'<Relationship Id="rId{i}" '
+            f'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" '
+            f'Target="worksheets/sheet{i}.xml"/>'
+            for i in range(1, len(names) + 1)
+        )))
+        yield sink.drain()
+
+        sheet_number = 0
+        async for _record_type, columns, rows in _records(season_id):
+            sheet_number += 1
+            with archive.open(f"xl/worksheets/sheet{sheet_number}.xml", "w") as part:
+                part.write((_SHEET_HEAD + _xlsx_row(columns)).encode())
+                async for row in rows:
+                    part.write(_xlsx_row(row).encode())
+                    if sink.size >= EXPORT_CHUNK_BYTES:
+                        yield sink.drain()
+                part.write(_SHEET_TAIL.encode())
+            yield sink.drain()
+    yield sink.drain()
+
+
+STREAMS = {
+    "csv": stream_csv,
+    "ndjson": stream_ndjson,
+    "xlsx": stream_xlsx,
+}
@@ -0,0 +1,163 @@
+"""Cache-friendly responses for stored files.
+
+Starlette 0.27's FileResponse only sends whole files and needs a local path.
+stored_file_response() works on any storage backend and adds what a photo
+gallery needs to be cheap on repeat visits:
+
+- 304 for a matching If-None-Match (or If-Modified-Since) - the file isn't opened
+- 206 for a single byte range (with If-Range), 416 for an unsatisfiable one
+- HEAD without a body
+
+The body is handed to the server as a file descriptor when it supports the ASGI
+zerocopy extension (sendfile); otherwise it is read in chunks on the io pool.
+"""
+
+import re
+from email.utils import formatdate, parsedate_to_datetime
+from typing import Optional
+
+from starlette.requests import Request
+from starlette.responses import Response
+from starlette.types import Receive, Scope, Send
+
+from executors import run_io
+from storage import storage
+
+STREAM_CHUNK_SIZE = 256 * 1024
+
+# Cache-Control for names whose content can never change, and for everything else
+CACHE_IMMUTABLE = "public, max-age=31536000, immutable"
+CACHE_REVALIDATE = "no-cache"
+
+_RANGE = re.compile(r"bytes=(\d*)-(\d*)")
+
+
+class StoredFileResponse(Response):
+    """Body of a stored file (or one byte range of it), read from storage as it's sent."""
+
+    def __init__(self, name: str, start: int, length: int, status_code: int, headers: dict, send_body: bool = True):
+        super().__init__(status_code=status_code, headers=headers)
+        self.name = name
+        self.start = start
+        self.length = length
+        self.send_body = send_body
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        await send({"type": "http.response.start", "status": self.status_code, "headers": self.raw_headers})
+        if not self.send_body or self.length == 0:
+            await send({"type": "http.response.body", "body": b""})
+            return
+
+        file = await run_io(storage.open, self.name)
+        try:
+            if "http.response.zerocopy" in scope.get("extensions", {}):
+                await send({"type": "http.response.zerocopy", "file": file, "offset": self.start, "count": self.length})
+                return
+
+            await run_io(file.seek, self.start)
+            remaining = self.length
+            while remaining:
+                chunk = await run_io(file.read, min(STREAM_CHUNK_SIZE, remaining))
+                if not chunk:
+                    raise OSError(f"{self.name} shrank while being sent")
+                remaining -= len(chunk)
+                await send({"type": "http.response.body", "body": chunk, "more_body": remaining > 0})
+        finally:
+            await run_io(file.close)
+
+
+def _etag_matches(header: str, etag: str) -> bool:
+    """Weak comparison, as If-None-Match uses."""
+    if header.strip() == "*":
+        return True
+    return any(tag.strip().removeprefix("W/") == etag for tag in header.split(","))
+
+
+def _not_modified(request: Request, etag: str, mtime: float) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        # When both are sent, If-None-Match wins (RFC 9110 13.2.2)
+        return _etag_matches(if_none_match, etag)
+    since = request.headers.get("if-modified-since")
+    if since:
+        try:
+            return int(mtime) <= parsedate_to_datetime(since).timestamp()
+        except (TypeError, ValueError):
+            return False
+    return False
+
+
+def _byte_range(request: Request, size: int, etag: str, last_modified: str) -> Optional[tuple[int, int]]:
+    """(start, end) inclusive for a usable single range, None to send the whole file.
+
+    Raises ValueError for a range that can't be satisfied. Multiple ranges are
+    answered with the whole file, which the spec allows.
+    """
+    header = request.headers.get("range")
+    if not header:
+        return None
+    if_range = request.headers.get("if-range")
+    if if_range and if_range not in (etag, last_modified):
+        return None
+
+    match = _RANGE.fullmatch(header.strip())
+    if not match or match[0] == "bytes=-":
+        return None
+    first, last = match.groups()
+    if not first:
+        # Suffix range: the last N bytes
+        if int(last) == 0:
+            raise ValueError(header)
+        return max(size - int(last), 0), size - 1
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size:
+        raise ValueError(header)
+    if end < start:
+        return None
+    return start, end
+
+
+def stored_file_response(
+    request: Request,
+    name: str,
+    stat,
+    media_type: str,
+    etag: str,
+    cache_control: str = CACHE_REVALIDATE,
+    modified: Optional[float] = None,
+) -> Response:
+    """Conditional, range-aware response for one stored file (stat from storage.stat).
+
+    modified is the Last-Modified timestamp, the file's mtime by default. Pass it
+    for shared content-addressed files, whose mtime storage.touch bumps on reuse.
+    """
+    if modified is None:
+        modified = stat.st_mtime
+    last_modified = formatdate(modified, usegmt=True)
+    headers = {
+        "etag": etag,
+        "last-modified": last_modified,
+        "cache-control": cache_control,
+        "accept-ranges": "bytes",
+    }
+    if _not_modified(request, etag, modified):
+        return Response(status_code=304, headers=headers)
+
+    size = stat.st_size
+    try:
+        byte_range = _byte_range(request, size, etag, last_modified)
+    except ValueError:
+        headers["content-range"] = f"bytes */{size}"
+        return Response(status_code=416, headers=headers)
+
+    headers["content-type"] = media_type
+    send_body = request.method != "HEAD"
+    if byte_range is None:
+        headers["content-length"] = str(size)
+        return StoredFileResponse(name, 0, size, 200, headers, send_body)
+
+    start, end = byte_range
+    headers["content-range"] = f"bytes {start}-{end}/{size}"
+    headers["content-length"] = str(end - start + 1)
+    return StoredFileResponse(name, start, end - start + 1, 206, headers, send_body)
@@ -0,0 +1,101 @@
+"""Persistent cache for plant identifications.
+
+An upload whose bytes were identified before is answered by its sha256. Otherwise
+entries are matched by a 64-bit perceptual hash of the image
+(imaging.perceptual_hash): the closest unexpired entry within
+IDENTIFY_CACHE_MAX_DISTANCE differing bits is reused, so the same plant photo
+re-saved, re-compressed or resized skips the upstream vision call entirely.
+
+The hash is also stored as PHASH_BANDS 16-bit bands under a GIN index. Two hashes
+fewer than PHASH_BANDS bits apart agree on at least one whole band, so the
+Hamming-distance check (bit_count of the XOR) only runs on rows sharing a band
+instead of the whole table. Expired rows are purged whenever a new entry is stored.
+
+The identify response says which path it took in X-Identify-Cache: hit / miss.
+"""
+
+import os
+from datetime import datetime, timedelta
+from typing import Optional
+
+from sqlalchemy import cast, delete, func, select, update
+from sqlalchemy.dialects.postgresql import BIT
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from models import IdentifyCacheEntry
+
+IDENTIFY_CACHE_HEADER = "X-Identify-Cache"
+
+IDENTIFY_CACHE_TTL_DAYS = int(os.getenv("IDENTIFY_CACHE_TTL_DAYS", "30"))
+
+PHASH_BANDS = 4
+_BAND_BITS = 64 // PHASH_BANDS
+
+# Out of 64 bits; recompression flips 0-2, a slight crop ~3, unrelated photos ~32.
+# Must stay below PHASH_BANDS for the band index to find every match.
+IDENTIFY_CACHE_MAX_DISTANCE = int(os.getenv("IDENTIFY_CACHE_MAX_DISTANCE", "3"))
+if not 0 <= IDENTIFY_CACHE_MAX_DISTANCE < PHASH_BANDS:
+    raise ValueError(f"IDENTIFY_CACHE_MAX_DISTANCE must be 0-{PHASH_BANDS - 1}: {IDENTIFY_CACHE_MAX_DISTANCE}")
+
+
+def _signed(image_hash: int) -> int:
+    """The unsigned 64-bit hash as a Postgres BIGINT."""
+    return image_hash - (1 << 64) if image_hash >= 1 << 63 else image_hash
+
+
+def phash_bands(image_hash: int) -> list[int]:
+    """Each 16-bit band of the hash, tagged with its position so bands only match in place."""
+    mask = (1 << _BAND_BITS) - 1
+    return [(band << _BAND_BITS) | ((image_hash >> (band * _BAND_BITS)) & mask) for band in range(PHASH_BANDS)]
+
+
+def _cutoff() -> datetime:
+    return datetime.utcnow() - timedelta(days=IDENTIFY_CACHE_TTL_DAYS)
+
+
+async def _hit(db: AsyncSession, row) -> Optional[dict]:
+    """Count a hit on row (if any) and end the transaction, so no connection is held upstream."""
+    if row is not None:
+        await db.execute(
+            update(IdentifyCacheEntry)
+            .where(IdentifyCacheEntry.id == row.id)
+            .values(hit_count=IdentifyCacheEntry.hit_count + 1, last_hit_at=datetime.utcnow())
+        )
+    await db.commit()
+    return row.result if row is not None else None
+
+
+async def lookup_exact(db: AsyncSession, sha256: str) -> Optional[dict]:
+    """Cached result for an upload with exactly these bytes; None on a miss."""
+    row = (await db.execute(
+        select(IdentifyCacheEntry.id, IdentifyCacheEntry.result)
+        .where(IdentifyCacheEntry.sha256 == sha256, IdentifyCacheEntry.created_at >= _cutoff())
+        .order_by(IdentifyCacheEntry.created_at.desc())
+        .limit(1)
+    )).first()
+    return await _hit(db, row)
+
+
+async def lookup_similar(db: AsyncSession, image_hash: int) -> Optional[dict]:
+    """Cached result for the nearest matching image, counting the hit; None on a miss."""
+    distance = func.bit_count(cast(IdentifyCacheEntry.phash.op("#")(_signed(image_hash)), BIT(64)))
+    row = (await db.execute(
+        select(IdentifyCacheEntry.id, IdentifyCacheEntry.result)
+        .where(
+            IdentifyCacheEntry.phash_bands.overlap(phash_bands(image_hash)),
+            IdentifyCacheEntry.created_at >= _cutoff(),
+            distance <= IDENTIFY_CACHE_MAX_DISTANCE,
+        )
+        .order_by(distance, IdentifyCacheEntry.created_at.desc())
+        .limit(1)
+    )).first()
+    return await _hit(db, row)
+
+
+async def store(db: AsyncSession, sha256: str, image_hash: int, result: dict) -> None:
+    """Remember an identification, dropping expired entries while we're here."""
+    await db.execute(delete(IdentifyCacheEntry).where(IdentifyCacheEntry.created_at < _cutoff()))
+    db.add(IdentifyCacheEntry(
+        sha256=sha256, phash=_signed(image_hash), phash_bands=phash_bands(image_hash), result=result
+    ))
+    await db.commit()
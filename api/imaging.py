@@ -0,0 +1,186 @@
+"""Pillow work for stored photos, run in the cpu process pool.
+
+Only stdlib, Pillow and storage are imported here - spawned pool workers import
+this module, so it must not pull in the app, database or FastAPI.
+
+Uploads are normalized once at ingest (normalize_upload): rotated upright per
+the EXIF orientation and re-saved without EXIF except the capture time, which
+is kept so read_metadata can recover it from a stored file later.
+
+Derivatives are stored beside the original as <stem>_<size>.<ext> (same shard,
+since the name prefix is the same) and described by a variants mapping stored
+on the owning row:
+
+    {"thumb": {"webp": "abc_thumb.webp", "jpg": "abc_thumb.jpg"}, "medium": {...}, "full": {...}}
+
+perceptual_hash fingerprints an image for the plant identification cache, and
+downscale_for_upload shrinks one before it is sent to the vision API.
+"""
+
+import io
+import os
+import tempfile
+from datetime import datetime
+from pathlib import Path
+from typing import Optional
+
+from PIL import ExifTags, Image, ImageOps
+
+from storage import storage
+
+# Longest edge in pixels, largest first - each size is resized from the previous one
+VARIANT_SIZES = {"full": 2048, "medium": 1024, "thumb": 320}
+
+# Extension -> (Pillow format, save options)
+VARIANT_FORMATS = {
+    "webp": ("WEBP", {"quality": 80, "method": 4}),
+    "jpg": ("JPEG", {"quality": 82, "optimize": True, "progressive": True}),
+}
+
+
+# Re-encoding quality for normalized originals - high, they are the archive copy
+NORMALIZE_QUALITY = 95
+
+_EXIF_DATETIME_FORMAT = "%Y:%m:%d %H:%M:%S"
+
+
+def _capture_time(exif: Image.Exif) -> Optional[datetime]:
+    """DateTimeOriginal (or DateTime) from EXIF, None if absent or unparseable."""
+    raw = exif.get_ifd(ExifTags.IFD.Exif).get(ExifTags.Base.DateTimeOriginal) or exif.get(ExifTags.Base.DateTime)
+    try:
+        return datetime.strptime(str(raw).strip("\x00 "), _EXIF_DATETIME_FORMAT)
+    except ValueError:
+        return None
+
+
+def _metadata(image: Image.Image, taken_at: Optional[datetime], path: Path) -> dict:
+    width, height = image.size
+    return {"width": width, "height": height, "byte_size": path.stat().st_size, "taken_at": taken_at}
+
+
+def normalize_upload(source: str, target: str) -> dict:
+    """Write an upright, EXIF-stripped copy of an uploaded image to target and return its metadata.
+
+    Multi-picture JPEGs (MPO, as many phones save) are normalized like any JPEG
+    from their first frame. Animated images keep every frame, unrotated, and lose
+    their EXIF all the same. Raises if source isn't a readable image.
+    """
+    source, target = Path(source), Path(target)
+    with Image.open(source) as image:
+        taken_at = _capture_time(image.getexif())
+        pil_format = "JPEG" if image.format == "MPO" else image.format
+        options = {}
+        if pil_format in ("JPEG", "WEBP"):
+            options["quality"] = NORMALIZE_QUALITY
+        if "icc_profile" in image.info:
+            options["icc_profile"] = image.info["icc_profile"]
+        if taken_at:
+            kept = Image.Exif()
+            kept[ExifTags.Base.DateTime] = taken_at.strftime(_EXIF_DATETIME_FORMAT)
+            options["exif"] = kept.tobytes()
+
+        if getattr(image, "is_animated", False) and pil_format != "JPEG":
+            image.save(target, pil_format, save_all=True, **options)
+            return _metadata(image, taken_at, target)
+
+        upright = ImageOps.exif_transpose(image)
+        upright.save(target, pil_format, **options)
+        return _metadata(upright, taken_at, target)
+
+
+def read_metadata(filename: str) -> dict:
+    """Dimensions, byte size and capture time of an already stored (normalized) photo."""
+    with storage.local_path(filename) as path, Image.open(path) as image:
+        return _metadata(image, _capture_time(image.getexif()), path)
+
+
+def variant_name(filename: str, size: str, extension: str) -> str:
+    return f"{Path(filename).stem}_{size}.{extension}"
+
+
+def variant_files(variants: dict | None) -> list[str]:
+    """Every filename in a variants mapping."""
+    if not variants:
+        return []
+    return [name for formats in variants.values() for name in formats.values()]
+
+
+def _flatten(image: Image.Image) -> Image.Image:
+    """RGB copy of the image, with any transparency composited onto white."""
+    if image.mode in ("RGBA", "LA") or (image.mode == "P" and "transparency" in image.info):
+        image = image.convert("RGBA")
+        background = Image.new("RGB", image.size, (255, 255, 255))
+        background.paste(image, mask=image.getchannel("A"))
+        return background
+    return image.convert("RGB")
+
+
+def make_variants(filename: str) -> dict:
+    """Store every size/format derivative of one stored photo and return its variants mapping."""
+    variants = {}
+    with storage.local_path(filename) as path, Image.open(path) as source:
+        # Let the JPEG decoder scale down by 1/2..1/8 while decoding when it can
+        largest = max(VARIANT_SIZES.values())
+        source.draft("RGB", (largest, largest))
+        image = _flatten(ImageOps.exif_transpose(source))
+
+    with tempfile.TemporaryDirectory(dir=storage.temp_dir) as staging:
+        for size, pixels in VARIANT_SIZES.items():
+            image.thumbnail((pixels, pixels), Image.Resampling.LANCZOS)
+            variants[size] = {}
+            for extension, (pil_format, options) in VARIANT_FORMATS.items():
+                name = variant_name(filename, size, extension)
+                staged = Path(staging) / name
+                image.save(staged, pil_format, **options)
+                storage.put_file(staged, name)
+                variants[size][extension] = name
+
+    return variants
+
+
+# dHash compares each pixel of a (n+1) x n grayscale thumbnail with its right neighbour
+_DHASH_SIZE = 8
+
+
+def perceptual_hash(source: str) -> int:
+    """64-bit difference hash (dHash) of an image, as an unsigned int.
+
+    Re-saved, re-compressed, resized or lightly cropped copies of a picture differ
+    from it in only a few bits. Raises if source isn't a readable image.
+    """
+    with Image.open(source) as image:
+        # Decoding a JPEG at 1/8 scale is plenty for a 9x8 thumbnail
+        image.draft("L", (_DHASH_SIZE * 8, _DHASH_SIZE * 8))
+        small = ImageOps.exif_transpose(image).convert("L").resize(
+            (_DHASH_SIZE + 1, _DHASH_SIZE), Image.Resampling.LANCZOS
+        )
+    pixels = list(small.getdata())
+    bits = 0
+    for row in range(_DHASH_SIZE):
+        for col in range(_DHASH_SIZE):
+            left = pixels[row * (_DHASH_SIZE + 1) + col]
+            bits = (bits << 1) | (left > pixels[row * (_DHASH_SIZE + 1) + col + 1])
+    return bits
+
+
+# Pillow format and media type for each downscale_for_upload output format
+UPLOAD_FORMATS = {"jpeg": ("JPEG", "image/jpeg"), "webp": ("WEBP", "image/webp")}
+
+
+def downscale_for_upload(source: str, max_edge: int, output_format: str, quality: int) -> tuple[bytes, str, dict]:
+    """Upright RGB copy of an image, no larger than max_edge, re-encoded for sending upstream.
+
+    Returns (bytes, media type, info), info holding the source and output sizes.
+    Animated images contribute their first frame. Raises if source isn't a readable image.
+    """
+    pil_format, media_type = UPLOAD_FORMATS[output_format]
+    with Image.open(source) as image:
+        source_size = image.size
+        image.draft("RGB", (max_edge, max_edge))
+        upright = _flatten(ImageOps.exif_transpose(image))
+    upright.thumbnail((max_edge, max_edge), Image.Resampling.LANCZOS)
+
+    encoded = io.BytesIO()
+    upright.save(encoded, pil_format, quality=quality)
+    info = {"source_size": source_size, "size": upright.size, "source_bytes": os.path.getsize(source), "bytes": encoded.tell()}
+    return encoded.getvalue(), media_type, info
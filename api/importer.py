@@ -0,0 +1,461 @@
+"""Spreadsheet import: column mapping and set-based apply.
+
+Shared by seed_data.py and the POST /imports endpoints. Rows are read one at a
+time (csv.DictReader over a text wrapper, or openpyxl in read-only mode), mapped
+to column dicts, and written in chunks to a temporary staging table. Each kind of
+record is then applied with a few set-based statements, so memory stays flat no
+matter how large the sheet is.
+"""
+
+import csv
+import io
+import re
+from datetime import datetime
+from pathlib import Path
+from typing import BinaryIO, Iterable, Iterator, Optional
+
+from openpyxl import load_workbook
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+# Staged rows per executemany round trip
+STAGE_CHUNK_ROWS = 1000
+
+REPEAT_CHOICES = ("yes", "no", "maybe")
+
+
+# ============================================================================
+# Cell parsing
+# ============================================================================
+
+# m/d, m/d/yy or m/d/yyyy, optionally the start of a range like "2/26 - 3/18"
+_US_DATE = re.compile(r"(\d{1,2})/(\d{1,2})(?:/(\d{4}|\d{2})| - .*)?")
+_ISO_DATE = re.compile(r"(\d{4})-(\d{2})-(\d{2})")
+
+
+def _parse_date_slow(date_str: str) -> datetime | None:
+    """strptime over every supported format - only for cells the regexes don't match."""
+    formats = [
+        "%m/%d/%Y",
+        "%m/%d/%y",
+        "%Y-%m-%d",
+        "%m/%d",  # Will assume current year
+    ]
+
+    for fmt in formats:
+        try:
+            return datetime.strptime(date_str, fmt)
+        except ValueError:
+            continue
+
+    # Try extracting first date from range like "2/26 - 3/18"
+    if " - " in date_str:
+        try:
+            return datetime.strptime(date_str.split(" - ")[0].strip(), "%m/%d")
+        except ValueError:
+            pass
+
+    return None
+
+
+def parse_date(date_str: str) -> datetime | None:
+    """Parse various date formats from CSV.
+
+    The common shapes are matched with precompiled regexes and built directly;
+    results are the same as the strptime formats in _parse_date_slow (a bare
+    m/d gets strptime's default year, 1900).
+    """
+    if not date_str or date_str.strip() == "":
+        return None
+
+    date_str = date_str.strip()
+    match = _US_DATE.fullmatch(date_str)
+    if match:
+        month, day, year = match.groups()
+        if year is None:
+            year = 1900
+        elif len(year) == 2:
+            # Same pivot as %y: 69-99 -> 1900s, 00-68 -> 2000s
+            year = int(year) + (1900 if int(year) >= 69 else 2000)
+        try:
+            return datetime(int(year), int(month), int(day))
+        except ValueError:
+            return None
+
+    match = _ISO_DATE.fullmatch(date_str)
+    if match:
+        try:
+            return datetime(*map(int, match.groups()))
+        except ValueError:
+            return None
+
+    return _parse_date_slow(date_str)
+
+
+def parse_int_range(value: str) -> int | None:
+    """Parse integer or range like '14-21' and return first value."""
+    if not value or value.strip() == "":
+        return None
+
+    value = value.strip()
+    try:
+        return int(value.split("-")[0])
+    except (ValueError, IndexError):
+        return None
+
+
+def normalize_repeat(value: str) -> tuple[str | None, str | None]:
+    """Split a "Repeat?" cell into yes/no/maybe plus any free text that doesn't fit the column."""
+    value = value.strip()
+    if not value:
+        return None, None
+    word = value.lower().split()[0].strip(",.;:-")
+    if word in REPEAT_CHOICES:
+        return word, (value if value.lower() != word else None)
+    return None, value
+
+
+def cell_text(value) -> str:
+    """An xlsx cell as the string the CSV export would contain."""
+    if value is None:
+        return ""
+    if isinstance(value, datetime):
+        return value.strftime("%m/%d/%Y")
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value)
+
+
+def _text(row: dict, column: str) -> str:
+    # csv.DictReader fills short rows with None
+    return (row.get(column) or "").strip()
+
+
+# ============================================================================
+# Row mapping (same columns as the original seed_data importers)
+# ============================================================================
+
+def map_plant_row(row: dict) -> Optional[dict]:
+    """Variety and batch columns from a "Seed Starting Information" row; None for blank rows."""
+    plant_name = _text(row, "Plant Name")
+    if not plant_name:
+        return None
+
+    repeat, repeat_note = normalize_repeat(_text(row, "Repeat?"))
+    outcome = _text(row, "Outcome") or None
+    if repeat_note:
+        # repeat_next_year is VARCHAR(10) - keep longer answers with the outcome
+        outcome = f"{outcome}\nRepeat? {repeat_note}" if outcome else f"Repeat? {repeat_note}"
+
+    return {
+        "common_name": plant_name[:100],
+        "flowering_season": _text(row, "Flowering Season")[:50] or None,
+        "days_to_germinate": parse_int_range(_text(row, "Days to Germinate")),
+        "variety_notes": _text(row, "Notes") or None,
+        "seeds_count": parse_int_range(_text(row, "Seeds")),
+        "packets": parse_int_range(_text(row, "Packets")),
+        "start_date": parse_date(_text(row, "Date Planted")),
+        "transplant_date": parse_date(_text(row, "Transplant Outside")),
+        "repeat_next_year": repeat,
+        "outcome_notes": outcome,
+    }
+
+
+def map_cost_row(row: dict) -> Optional[dict]:
+    """Material cost columns from a "Season Costs" row; None if there is no priced material."""
+    item_name = _text(row, "Material")
+    cost_str = _text(row, "Cost")
+    quantity_str = _text(row, "Quantity")
+
+    if not item_name or not cost_str or cost_str == "$0.00":
+        return None
+
+    try:
+        cost_value = float(cost_str.replace("$", "").replace(",", ""))
+    except ValueError:
+        return None
+    if cost_value == 0:
+        return None
+
+    return {
+        "item_name": item_name[:100],
+        "cost": cost_value,
+        "quantity": int(quantity_str) if quantity_str.isdigit() else 1,
+    }
+
+
+# ============================================================================
+# Readers
+# ============================================================================
+
+def iter_csv_rows(stream: BinaryIO) -> Iterator[dict]:
+    """Rows of a CSV upload, decoded on the fly."""
+    text_stream = io.TextIOWrapper(stream, encoding="utf-8-sig", newline="")
+    try:
+        yield from csv.DictReader(text_stream)
+    finally:
+        text_stream.detach()  # leave the underlying upload open for its owner
+
+
+def iter_xlsx_rows(stream: BinaryIO, sheet: Optional[str] = None) -> Iterator[dict]:
+    """Rows of one worksheet (first by default), keyed by the header row like csv.DictReader."""
+    workbook = load_workbook(stream, read_only=True, data_only=True)
+    try:
+        if sheet and sheet not in workbook.sheetnames:
+            raise ValueError(f"Sheet not found: {sheet}")
+        worksheet = workbook[sheet] if sheet else workbook.worksheets[0]
+        rows = worksheet.iter_rows(values_only=True)
+        header = next(rows, None)
+        if header is None:
+            return
+        keys = [cell_text(value).strip() for value in header]
+        for values in rows:
+            yield dict(zip(keys, (cell_text(value) for value in values)))
+    finally:
+        workbook.close()
+
+
+def iter_rows(stream: BinaryIO, filename: str, sheet: Optional[str] = None) -> Iterator[dict]:
+    """Pick the reader from the file extension."""
+    suffix = Path(filename).suffix.lower()
+    if suffix == ".csv":
+        return iter_csv_rows(stream)
+    if suffix == ".xlsx":
+        return iter_xlsx_rows(stream, sheet)
+    raise ValueError("File type not allowed. Must be: .csv, .xlsx")
+
+
+# ============================================================================
+# Staging + set-based apply
+# ============================================================================
+
+_INT4_MAX = 2 ** 31 - 1
+# Costs are NUMERIC(10, 2)
+_COST_LIMIT = 10 ** 8
+
+
+def _unstorable(mapped: dict) -> Optional[str]:
+    """Why a mapped row can't be written to its columns, or None if it can."""
+    for column, value in mapped.items():
+        if isinstance(value, int) and not -_INT4_MAX - 1 <= value <= _INT4_MAX:
+            return f"{column} out of range: {value}"
+        if isinstance(value, float) and not abs(value) < _COST_LIMIT:
+            return f"{column} out of range: {value}"
+    return None
+
+
+class _Mapped:
+    """Iterate mapped rows (numbered, blanks dropped) while counting rows read.
+
+    Rows whose values don't fit their columns are dropped and listed in errors.
+    """
+
+    def __init__(self, rows: Iterable[dict], mapper):
+        self.rows = rows
+        self.mapper = mapper
+        self.rows_read = 0
+        self.errors = []
+
+    def __iter__(self):
+        for row in self.rows:
+            self.rows_read += 1
+            mapped = self.mapper(row)
+            if mapped is None:
+                continue
+            error = _unstorable(mapped)
+            if error:
+                # +1 for the header, so this is the row number the spreadsheet shows
+                self.errors.append({"row": self.rows_read + 1, "error": error})
+                continue
+            mapped["row_no"] = self.rows_read
+            yield mapped
+
+
+def _stage(conn: Connection, table: str, columns: tuple[str, ...], rows: Iterable[dict]) -> int:
+    """Insert rows into a staging table in fixed-size executemany chunks."""
+    insert = text(
+        f"INSERT INTO {table} ({', '.join(columns)}) "
+        f"VALUES ({', '.join(':' + column for column in columns)})"
+    )
+    staged = 0
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= STAGE_CHUNK_ROWS:
+            conn.execute(insert, chunk)
+            staged += len(chunk)
+            chunk = []
+    if chunk:
+        conn.execute(insert, chunk)
+        staged += len(chunk)
+    return staged
+
+
+def _lock_imports(conn: Connection):
+    # Batches and costs have no unique key to conflict on, so serialize imports
+    # to keep two concurrent uploads from inserting the same rows twice
+    conn.execute(text("SELECT pg_advisory_xact_lock(hashtext('plantlady-import'))"))
+
+
+PLANT_STAGE_COLUMNS = (
+    "row_no", "common_name", "flowering_season", "days_to_germinate", "variety_notes",
+    "seeds_count", "packets", "start_date", "transplant_date", "repeat_next_year", "outcome_notes",
+)
+
+# First row per plant name, with its variety id (run after the variety upsert)
+_PLANT_SOURCE = """
+    WITH src AS (
+        SELECT DISTINCT ON (s.common_name) v.id AS variety_id, s.*
+        FROM import_plants s JOIN plant_varieties v ON v.common_name = s.common_name
+        ORDER BY s.common_name, s.row_no
+    )
+"""
+
+
+def import_plants(conn: Connection, rows: Iterable[dict], season_id: int, user_id: int) -> dict:
+    """Upsert varieties and the season's batches from "Seed Starting Information" rows.
+
+    Varieties: INSERT ... ON CONFLICT (common_name), only filling in columns that are empty.
+    Batches: one per (variety, season) - updated from the sheet if it exists, inserted otherwise.
+    """
+    _lock_imports(conn)
+    conn.execute(text("""
+        CREATE TEMP TABLE import_plants (
+            row_no INTEGER,
+            common_name VARCHAR(100),
+            flowering_season VARCHAR(50),
+            days_to_germinate INTEGER,
+            variety_notes TEXT,
+            seeds_count INTEGER,
+            packets INTEGER,
+            start_date TIMESTAMP,
+            transplant_date TIMESTAMP,
+            repeat_next_year VARCHAR(10),
+            outcome_notes TEXT
+        ) ON COMMIT DROP
+    """))
+    mapped = _Mapped(rows, map_plant_row)
+    staged = _stage(conn, "import_plants", PLANT_STAGE_COLUMNS, mapped)
+    now = datetime.utcnow()
+
+    # xmax = 0 only for freshly inserted rows; conflicts that change nothing return no row
+    variety_results = conn.execute(text("""
+        INSERT INTO plant_varieties (common_name, category, flowering_season, days_to_germinate, notes, created_at)
+        SELECT DISTINCT ON (common_name)
+               common_name, 'vegetable', flowering_season, days_to_germinate, variety_notes, :now
+        FROM import_plants
+        ORDER BY common_name, row_no
+        ON CONFLICT (common_name) DO UPDATE SET
+            flowering_season = COALESCE(plant_varieties.flowering_season, EXCLUDED.flowering_season),
+            days_to_germinate = COALESCE(plant_varieties.days_to_germinate, EXCLUDED.days_to_germinate),
+            notes = COALESCE(plant_varieties.notes, EXCLUDED.notes)
+        WHERE (plant_varieties.flowering_season IS NULL AND EXCLUDED.flowering_season IS NOT NULL)
+           OR (plant_varieties.days_to_germinate IS NULL AND EXCLUDED.days_to_germinate IS NOT NULL)
+           OR (plant_varieties.notes IS NULL AND EXCLUDED.notes IS NOT NULL)
+        RETURNING (xmax = 0) AS inserted
+    """), {"now": now}).scalars().all()
+    distinct_names = conn.execute(text("SELECT count(DISTINCT common_name) FROM import_plants")).scalar()
+    varieties_inserted = sum(1 for inserted in variety_results if inserted)
+    varieties_updated = len(variety_results) - varieties_inserted
+
+    batches_updated = conn.execute(text(_PLANT_SOURCE + """
+        UPDATE plant_batches b SET
+            seeds_count = COALESCE(src.seeds_count, b.seeds_count),
+            packets = COALESCE(src.packets, b.packets),
+            start_date = COALESCE(src.start_date, b.start_date),
+            transplant_date = COALESCE(src.transplant_date, b.transplant_date),
+            repeat_next_year = COALESCE(src.repeat_next_year, b.repeat_next_year),
+            outcome_notes = COALESCE(src.outcome_notes, b.outcome_notes)
+        FROM src
+        WHERE b.variety_id = src.variety_id AND b.season_id = :season_id
+          AND ROW(COALESCE(src.seeds_count, b.seeds_count), COALESCE(src.packets, b.packets),
+                  COALESCE(src.start_date, b.start_date), COALESCE(src.transplant_date, b.transplant_date),
+                  COALESCE(src.repeat_next_year, b.repeat_next_year), COALESCE(src.outcome_notes, b.outcome_notes))
+              IS DISTINCT FROM
+              ROW(b.seeds_count, b.packets, b.start_date, b.transplant_date, b.repeat_next_year, b.outcome_notes)
+    """), {"season_id": season_id}).rowcount
+
+    batches_inserted = conn.execute(text(_PLANT_SOURCE + """
+        INSERT INTO plant_batches (
+            user_id, variety_id, season_id, seeds_count, packets,
+            start_date, transplant_date, repeat_next_year, outcome_notes, created_at
+        )
+        SELECT :user_id, src.variety_id, :season_id, src.seeds_count, src.packets,
+               src.start_date, src.transplant_date, src.repeat_next_year, src.outcome_notes, :now
+        FROM src
+        WHERE NOT EXISTS (
+            SELECT 1 FROM plant_batches b WHERE b.variety_id = src.variety_id AND b.season_id = :season_id
+        )
+    """), {"user_id": user_id, "season_id": season_id, "now": now}).rowcount
+
+    return {
+        "rows_read": mapped.rows_read,
+        "rows_staged": staged,
+        "errors": mapped.errors,
+        "varieties": {
+            "inserted": varieties_inserted,
+            "updated": varieties_updated,
+            "skipped": distinct_names - varieties_inserted - varieties_updated,
+        },
+        "batches": {
+            "inserted": batches_inserted,
+            "updated": batches_updated,
+            "skipped": max(staged - batches_inserted - batches_updated, 0),
+        },
+    }
+
+
+COST_STAGE_COLUMNS = ("row_no", "item_name", "cost", "quantity")
+
+
+def import_costs(conn: Connection, rows: Iterable[dict], season_id: int, user_id: int) -> dict:
+    """Upsert a season's material costs from "Season Costs" rows, keyed by item name.
+
+    Rows repeating an item name (two purchases of seed trays) are summed into one
+    cost, so the season total matches the sheet's.
+    """
+    _lock_imports(conn)
+    conn.execute(text("""
+        CREATE TEMP TABLE import_costs (
+            row_no INTEGER,
+            item_name VARCHAR(100),
+            cost NUMERIC(10, 2),
+            quantity INTEGER
+        ) ON COMMIT DROP
+    """))
+    mapped = _Mapped(rows, map_cost_row)
+    staged = _stage(conn, "import_costs", COST_STAGE_COLUMNS, mapped)
+
+    source = """
+        WITH src AS (
+            SELECT item_name, sum(cost) AS cost, sum(quantity) AS quantity FROM import_costs GROUP BY item_name
+        )
+    """
+    updated = conn.execute(text(source + """
+        UPDATE season_costs c SET cost = src.cost, quantity = src.quantity
+        FROM src
+        WHERE c.season_id = :season_id AND c.category = 'material' AND c.item_name = src.item_name
+          AND (c.cost, c.quantity) IS DISTINCT FROM (src.cost, src.quantity)
+    """), {"season_id": season_id}).rowcount
+
+    inserted = conn.execute(text(source + """
+        INSERT INTO season_costs (user_id, season_id, item_name, cost, quantity, category, is_one_time, created_at)
+        SELECT :user_id, :season_id, src.item_name, src.cost, src.quantity, 'material', TRUE, :now
+        FROM src
+        WHERE NOT EXISTS (
+            SELECT 1 FROM season_costs c
+            WHERE c.season_id = :season_id AND c.category = 'material' AND c.item_name = src.item_name
+        )
+    """), {"user_id": user_id, "season_id": season_id, "now": datetime.utcnow()}).rowcount
+    distinct_items = conn.execute(text("SELECT count(DISTINCT item_name) FROM import_costs")).scalar()
+
+    return {
+        "rows_read": mapped.rows_read,
+        "rows_staged": staged,
+        "errors": mapped.errors,
+        "costs": {
+            "inserted": inserted,
+            "updated": updated,
+            "skipped": distinct_items - inserted - updated,
+        },
+    }
@@ -0,0 +1,197 @@
+"""Opt-in event-loop lag monitor and blocking-call detector.
+
+A coroutine sleeps for a fixed interval and records how late it wakes up
+(scheduling lag) into a histogram. A watchdog thread watches the coroutine's
+heartbeat; when the loop has been stuck for longer than the threshold it grabs
+the loop thread's current stack, which points at the handler doing blocking work.
+
+Enable with LOOP_MONITOR=true. Results are served by GET /admin/event-loop.
+"""
+
+import asyncio
+import os
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from datetime import datetime
+from pathlib import Path
+
+LOOP_MONITOR_ENABLED = os.getenv("LOOP_MONITOR", "false").lower() == "true"
+LOOP_MONITOR_INTERVAL = float(os.getenv("LOOP_MONITOR_INTERVAL_MS", "50")) / 1000
+LOOP_MONITOR_THRESHOLD = float(os.getenv("LOOP_MONITOR_THRESHOLD_MS", "100")) / 1000
+LOOP_MONITOR_MAX_STALLS = int(os.getenv("LOOP_MONITOR_MAX_STALLS", "50"))
+
+# Histogram bucket upper bounds in milliseconds (last bucket is "more than 5000")
+HISTOGRAM_BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+API_DIR = Path(__file__).resolve().parent
+
+
+def _attribute(stack: traceback.StackSummary) -> str:
+    """Name the innermost frame that belongs to our own code (routers, main, ...)."""
+    for frame in reversed(stack):
+        path = Path(frame.filename).resolve()
+        if path.name == Path(__file__).name or "site-packages" in path.parts:
+            continue
+        if API_DIR in path.parents:
+            module = path.relative_to(API_DIR).with_suffix("").as_posix().replace("/", ".")
+            return f"{module}:{frame.name}"
+    return "<unknown>"
+
+
+class LoopMonitor:
+    """Lag histogram plus captured stacks of loop stalls."""
+
+    def __init__(self, interval: float, threshold: float, max_stalls: int):
+        self.interval = interval
+        self.threshold = threshold
+        self._lock = threading.Lock()
+        self._buckets = [0] * (len(HISTOGRAM_BUCKETS_MS) + 1)
+        self._samples = 0
+        self._total_lag = 0.0
+        self._max_lag = 0.0
+        self._stalls = deque(maxlen=max_stalls)
+        self._by_handler = {}
+        self._pending_stall = None  # stack captured by the watchdog, waiting for its final lag
+        self._heartbeat = time.perf_counter()
+        self._captured_heartbeat = None
+        self._loop_thread_id = None
+        self._task = None
+        self._watchdog = None
+        self._stop = threading.Event()
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------
+
+    def start(self):
+        """Start the ticker on the running loop and the watchdog thread."""
+        self._loop_thread_id = threading.get_ident()
+        self._heartbeat = time.perf_counter()
+        self._stop.clear()
+        self._task = asyncio.get_running_loop().create_task(self._tick())
+        self._watchdog = threading.Thread(target=self._watch, name="loop-monitor", daemon=True)
+        self._watchdog.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    # ------------------------------------------------------------------
+    # Measurement
+    # ------------------------------------------------------------------
+
+    async def _tick(self):
+        while True:
+            start = time.perf_counter()
+            await asyncio.sleep(self.interval)
+            now = time.perf_counter()
+            self._heartbeat = now
+            self._record(max(now - start - self.interval, 0.0))
+
+    def _watch(self):
+        while not self._stop.wait(self.interval):
+            heartbeat = self._heartbeat
+            blocked_for = time.perf_counter() - heartbeat - self.interval
+            if blocked_for < self.threshold or heartbeat == self._captured_heartbeat:
+                continue
+
+            # Loop is stuck right now - whatever is on its stack is the culprit
+            frame = sys._current_frames().get(self._loop_thread_id)
+            if frame is None:
+                continue
+            stack = traceback.extract_stack(frame)
+            del frame
+            self._captured_heartbeat = heartbeat
+            with self._lock:
+                self._pending_stall = {
+                    "detected_at": datetime.utcnow().isoformat(),
+                    "handler": _attribute(stack),
+                    "stack": stack.format(),
+                }
+
+    def _record(self, lag: float):
+        lag_ms = lag * 1000
+        with self._lock:
+            self._samples += 1
+            self._total_lag += lag
+            self._max_lag = max(self._max_lag, lag)
+            for i, bound in enumerate(HISTOGRAM_BUCKETS_MS):
+                if lag_ms <= bound:
+                    self._buckets[i] += 1
+                    break
+            else:
+                self._buckets[-1] += 1
+
+            if lag < self.threshold:
+                return
+
+            # Stall finished - pair it with the stack the watchdog saw (if it was in time)
+            stall = self._pending_stall or {
+                "detected_at": datetime.utcnow().isoformat(),
+                "handler": "<not captured>",
+                "stack": [],
+            }
+            self._pending_stall = None
+            stall["lag_ms"] = round(lag_ms, 1)
+            self._stalls.append(stall)
+
+            totals = self._by_handler.setdefault(
+                stall["handler"], {"count": 0, "total_ms": 0.0, "max_ms": 0.0}
+            )
+            totals["count"] += 1
+            totals["total_ms"] += lag_ms
+            totals["max_ms"] = max(totals["max_ms"], lag_ms)
+
+    # ------------------------------------------------------------------
+    # Reporting
+    # ------------------------------------------------------------------
+
+    def snapshot(self) -> dict:
+        """Histogram, handlers ranked by total stall time, and recent stalls."""
+        with self._lock:
+            labels = [f"<={b}ms" for b in HISTOGRAM_BUCKETS_MS] + [f">{HISTOGRAM_BUCKETS_MS[-1]}ms"]
+            ranking = sorted(self._by_handler.items(), key=lambda item: item[1]["total_ms"], reverse=True)
+            return {
+                "enabled": True,
+                "interval_ms": self.interval * 1000,
+                "threshold_ms": self.threshold * 1000,
+                "samples": self._samples,
+                "avg_lag_ms": round(self._total_lag / self._samples * 1000, 3) if self._samples else 0.0,
+                "max_lag_ms": round(self._max_lag * 1000, 3),
+                "histogram": dict(zip(labels, self._buckets)),
+                "stalls_by_handler": [
+                    {
+                        "handler": handler,
+                        "count": t["count"],
+                        "total_ms": round(t["total_ms"], 1),
+                        "max_ms": round(t["max_ms"], 1),
+                    }
+                    for handler, t in ranking
+                ],
+                "recent_stalls": list(reversed(self._stalls)),
+            }
+
+
+monitor = LoopMonitor(LOOP_MONITOR_INTERVAL, LOOP_MONITOR_THRESHOLD, LOOP_MONITOR_MAX_STALLS)
+
+
+def start_loop_monitor():
+    """Start monitoring if LOOP_MONITOR=true (must be called from inside the loop)."""
+    if LOOP_MONITOR_ENABLED:
+        monitor.start()
+
+
+def stop_loop_monitor():
+    if LOOP_MONITOR_ENABLED:
+        monitor.stop()
+
+
+def get_loop_stats() -> dict:
+    if not LOOP_MONITOR_ENABLED:
+        return {"enabled": False}
+    return monitor.snapshot()
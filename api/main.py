@@ -1,21 +1,25 @@
 """PlantLady API - FastAPI backend for plant tracking app."""
 
+import hmac
+from datetime import datetime
 from fastapi import FastAPI, HTTPException, Depends, status
 from fastapi.middleware.cors import CORSMiddleware
+from sqlalchemy import exists, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from sqlalchemy import func
 import os
-from passlib.context import CryptContext
 
-from database import engine, Base, SessionLocal, get_db
-from models import User, PlantBatch, Event
+from auth import CurrentUser, create_access_token, user_cache
+from database import engine, Base, SessionLocal, get_db, get_async_db
+from executors import run_io, run_cpu, shutdown_executors
+from identify_cache import IDENTIFY_CACHE_HEADER
+from loop_monitor import start_loop_monitor, stop_loop_monitor
+from models import User, UserStats
+from pagination import NEXT_CURSOR_HEADER, TOTAL_ESTIMATE_HEADER
 from schemas import PINLogin, AuthResponse, UserStatsResponse
-from routers import plants, events, seasons, costs, distributions, photos, individual_plants, identify
-
-# Password context for hashing (argon2 only for hashing, but supports bcrypt verification)
-# Using only argon2 for hashing to avoid bcrypt compatibility issues
-pwd_context = CryptContext(schemes=["argon2"], deprecated="auto")
-# For verification, we'll manually handle bcrypt if needed (see login endpoint)
+from security import pin_lookup, verify_and_update_pin
+from uploads import UploadSizeLimit
+from routers import plants, events, seasons, costs, distributions, photos, individual_plants, identify, imports, export, admin
 
 # Schema managed by Alembic migrations
 # Base.metadata.create_all(bind=engine)
@@ -26,6 +30,10 @@ app = FastAPI(
     version="0.1.0"
 )
 
+# Cut off oversized photo and spreadsheet uploads while they are still being received
+app.add_middleware(UploadSizeLimit, path_prefixes=("/photos", "/individual-plants", "/identify"))
+app.add_middleware(UploadSizeLimit, path_prefixes=("/imports",), max_size=imports.MAX_IMPORT_SIZE)
+
 # CORS middleware for React frontend
 app.add_middleware(
     CORSMiddleware,
@@ -38,6 +46,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER, TOTAL_ESTIMATE_HEADER, IDENTIFY_CACHE_HEADER],
 )
 
 # Include routers
@@ -49,6 +58,22 @@ app.include_router(distributions.router)
 app.include_router(photos.router)
 app.include_router(individual_plants.router)
 app.include_router(identify.router)
+app.include_router(imports.router)
+app.include_router(export.router)
+app.include_router(admin.router)
+
+
+@app.on_event("startup")
+async def start_background_monitors():
+    """Start the event-loop lag monitor (no-op unless LOOP_MONITOR=true)."""
+    start_loop_monitor()
+
+
+@app.on_event("shutdown")
+async def stop_background_workers():
+    """Stop the loop monitor and release the I/O thread pool and argon2 process pool."""
+    stop_loop_monitor()
+    shutdown_executors()
 
 
 # ============================================================================
@@ -76,11 +101,15 @@ async def root():
 # ============================================================================
 
 @app.post("/auth/login", response_model=AuthResponse)
-async def login(request: PINLogin, db: Session = Depends(get_db)):
+async def login(request: PINLogin, db: AsyncSession = Depends(get_async_db)):
     """
     Verify PIN and return the matching user.
 
-    Validates the PIN against bcrypt-hashed pin_hash in the database.
+    At most one argon2 verify runs per attempt: the candidate user comes from
+    request.user_id when given, otherwise from the keyed-HMAC users.pin_lookup index.
+    When that can't name exactly one user - the PIN is shared, or some users have no
+    index entry yet (see backfill_pin_lookup.py) - the response is 409 and the client
+    must send user_id.
     """
     pin = request.pin.strip()
 
@@ -90,19 +119,38 @@ async def login(request: PINLogin, db: Session = Depends(get_db)):
             detail="PIN must be 4 digits"
         )
 
-    # Find user by PIN (check plaintext first for compatibility, then bcrypt hash)
-    user = db.query(User).filter(User.pin == pin).first()
-
-    # If not found by plaintext, try bcrypt hash
-    if not user:
-        users = db.query(User).all()
-        for u in users:
-            try:
-                if u.pin_hash and pwd_context.verify(pin, u.pin_hash):
-                    user = u
-                    break
-            except Exception:
-                pass  # Hash verification failed, continue
+    lookup = pin_lookup(pin)
+
+    if request.user_id is not None:
+        candidate = await db.get(User, request.user_id)
+    else:
+        # Plaintext PIN (pre-migration rows) or the index
+        matches = (await db.scalars(
+            select(User).where(or_(User.pin == pin, User.pin_lookup == lookup)).limit(2)
+        )).all()
+        # An unindexed user could share the PIN of the one match, so nobody is found
+        # by PIN alone until every user is indexed
+        ambiguous = len(matches) > 1 or await db.scalar(
+            select(exists().where(User.pin_lookup.is_(None), User.pin.is_(None)))
+        )
+        if ambiguous:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="Select your user to log in with this PIN"
+            )
+        candidate = matches[0] if matches else None
+
+    user = None
+    if candidate is not None:
+        if candidate.pin is not None:
+            if hmac.compare_digest(candidate.pin, pin):
+                user = candidate
+        elif candidate.pin_hash:
+            ok, new_hash = await run_cpu(verify_and_update_pin, pin, candidate.pin_hash)
+            if ok:
+                user = candidate
+                if new_hash:
+                    user.pin_hash = new_hash
 
     if not user:
         raise HTTPException(
@@ -110,18 +158,26 @@ async def login(request: PINLogin, db: Session = Depends(get_db)):
             detail="Invalid PIN"
         )
 
+    if user.pin_lookup != lookup:
+        user.pin_lookup = lookup
+    if db.is_modified(user):
+        await db.commit()
+
+    user_cache.put(CurrentUser(id=user.id, name=user.name, display_color=user.display_color))
+
     return AuthResponse(
         id=user.id,
         name=user.name,
         display_color=user.display_color,
-        created_at=user.created_at
+        created_at=user.created_at,
+        access_token=create_access_token(user)
     )
 
 
 @app.get("/users")
 async def get_users(db: Session = Depends(get_db)):
     """Get list of available users."""
-    users = db.query(User).all()
+    users = await run_io(db.query(User).all)
     return [
         {
             "id": user.id,
@@ -133,42 +189,24 @@ async def get_users(db: Session = Depends(get_db)):
 
 
 @app.get("/users/{user_id}/stats", response_model=UserStatsResponse)
-async def get_user_stats(user_id: int, db: Session = Depends(get_db)):
-    """Get user statistics (plants, events, streak)."""
-    from datetime import datetime, timedelta
-
-    # Count plant batches
-    batch_count = db.query(func.count(PlantBatch.id)).filter(
-        PlantBatch.user_id == user_id
-    ).scalar() or 0
-
-    # Count events
-    event_count = db.query(func.count(Event.id)).filter(
-        Event.user_id == user_id
-    ).scalar() or 0
-
-    # Calculate streak: count consecutive days ending today
-    streak = 0
-    today = datetime.utcnow().date()
-
-    # Get all distinct event dates for this user, ordered descending
-    events = db.query(Event).filter(Event.user_id == user_id).order_by(Event.event_date.desc()).all()
+async def get_user_stats(user_id: int, db: AsyncSession = Depends(get_async_db)):
+    """
+    Get user statistics (plants, events, streak).
 
-    if events:
-        event_dates = sorted(set(e.event_date.date() for e in events), reverse=True)
+    Single-row read: counts and the latest run of active days are kept up to
+    date by triggers on events/plant_batches (see migration 006).
+    """
+    stats = await db.get(UserStats, user_id)
+    if not stats:
+        return UserStatsResponse(batch_count=0, event_count=0, streak=0)
 
-        # Count consecutive days from today backwards
-        current_date = today
-        for event_date in event_dates:
-            if event_date == current_date:
-                streak += 1
-                current_date -= timedelta(days=1)
-            else:
-                break
+    # Streak counts consecutive days ending today - a run that ended earlier is broken
+    today = datetime.utcnow().date()
+    streak = stats.current_streak if stats.last_active_day == today else 0
 
     return UserStatsResponse(
-        batch_count=batch_count,
-        event_count=event_count,
+        batch_count=stats.batch_count,
+        event_count=stats.event_count,
         streak=streak
     )
 
@@ -0,0 +1,83 @@
+#!/usr/bin/env python
+"""Move stored photos into the sharded layout, or copy them to another backend.
+
+Safe to run while the API and nginx are serving: both look in the shard first
+and fall back to the old flat path, and each file is linked into its shard
+before the flat name is removed. Re-running skips what is already done.
+
+    python migrate_photos.py                 # flat PHOTOS_DIR -> ab/cd/ shards
+    python migrate_photos.py --to object     # copy local files into PHOTO_OBJECT_DIR
+    python migrate_photos.py --dry-run
+"""
+
+import argparse
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from storage import LocalStorage, PHOTOS_DIR, create_storage
+
+
+def shard_local(local: LocalStorage, dry_run: bool) -> tuple[int, int]:
+    moved = failed = 0
+    for name in local.legacy_names():
+        if dry_run:
+            moved += 1
+            continue
+        try:
+            local.shard_in_place(name)
+            moved += 1
+        except OSError as e:
+            print(f"✗ {name}: {e}", file=sys.stderr)
+            failed += 1
+    return moved, failed
+
+
+def copy_to(local: LocalStorage, target, dry_run: bool) -> tuple[int, int]:
+    """Copy every local file the target doesn't have yet (the local copies stay)."""
+    copied = failed = 0
+    for name in local.names():
+        stat = target.stat(name)
+        if stat and stat.st_size == local.stat(name).st_size:
+            continue
+        if dry_run:
+            copied += 1
+            continue
+        try:
+            with local.open(name) as src, tempfile.NamedTemporaryFile(dir=target.temp_dir, delete=False) as dst:
+                shutil.copyfileobj(src, dst)
+            target.put_file(Path(dst.name), name)
+            copied += 1
+        except OSError as e:
+            print(f"✗ {name}: {e}", file=sys.stderr)
+            failed += 1
+    return copied, failed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Migrate stored photo files between layouts/backends.")
+    parser.add_argument("--to", choices=["local", "object"], default="local",
+                        help="local: shard the flat directory in place; object: copy into the object store")
+    parser.add_argument("--dry-run", action="store_true", help="count files, change nothing")
+    args = parser.parse_args()
+
+    print(f"📦 Migrating photos in {PHOTOS_DIR} → {args.to}" + (" (dry run)" if args.dry_run else ""))
+    started = time.perf_counter()
+
+    local = LocalStorage(PHOTOS_DIR)
+    if args.to == "local":
+        done, failed = shard_local(local, args.dry_run)
+    else:
+        done, failed = copy_to(local, create_storage("object"), args.dry_run)
+
+    print(f"\n✅ {done} files {'to migrate' if args.dry_run else 'migrated'}, {failed} failed "
+          f"in {time.perf_counter() - started:.1f}s")
+    if args.to == "object" and not args.dry_run:
+        print("Set PHOTO_STORAGE=object and restart the API, then re-run to pick up files uploaded meanwhile.")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
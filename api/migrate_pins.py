@@ -4,6 +4,7 @@
 from passlib.context import CryptContext
 from database import SessionLocal
 from models import User
+from security import pin_lookup
 
 try:
     pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
@@ -23,6 +24,7 @@ def migrate_pins():
                 # Hash the PIN
                 hashed = pwd_context.hash(user.pin)
                 user.pin_hash = hashed
+                user.pin_lookup = pin_lookup(user.pin)
                 user.pin = None  # Clear plaintext PIN
                 migrated_count += 1
                 print(f"✓ Migrated {user.name} (ID: {user.id})")
@@ -1,7 +1,8 @@
 """SQLAlchemy ORM models for PlantLady."""
 
 from datetime import datetime
-from sqlalchemy import Column, Integer, String, Text, DateTime, Date, Boolean, ForeignKey, Enum, Numeric
+from sqlalchemy import BigInteger, Column, Integer, String, Text, DateTime, Date, Boolean, ForeignKey, Enum, Numeric, JSON
+from sqlalchemy.dialects.postgresql import ARRAY
 from sqlalchemy.orm import relationship
 import enum
 
@@ -17,6 +18,7 @@ class User(Base):
     display_color = Column(String(7), default="#648655")  # Hex color
     pin_hash = Column(String(255), nullable=False)  # Hashed PIN
     pin = Column(String(4), nullable=True)  # 4-digit PIN for login
+    pin_lookup = Column(String(64), nullable=True, index=True)  # HMAC of PIN (see security.pin_lookup)
     created_at = Column(DateTime, default=datetime.utcnow)
 
     # Relationships
@@ -48,7 +50,7 @@ class PlantVariety(Base):
     __tablename__ = "plant_varieties"
 
     id = Column(Integer, primary_key=True)
-    common_name = Column(String(100), nullable=False)
+    common_name = Column(String(100), nullable=False, unique=True)
     scientific_name = Column(String(150))
     category = Column(String(50), nullable=False)  # vegetable, ornamental, houseplant
     flowering_season = Column(String(50))
@@ -88,6 +90,7 @@ class PlantBatch(Base):
     events = relationship("Event", back_populates="batch")
     photos = relationship("Photo", back_populates="batch")
     distributions = relationship("Distribution", back_populates="batch")
+    care_events = relationship("CareEvent", back_populates="batch")
 
 
 class EventType(str, enum.Enum):
@@ -131,9 +134,13 @@ class Photo(Base):
     event_id = Column(Integer, ForeignKey("events.id"))  # Optional: specific event
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
 
-    filename = Column(String(255), unique=True, nullable=False)  # Stored in volume
+    filename = Column(String(255), nullable=False, index=True)  # <sha256><ext> in the volume, may be shared
+    variants = Column(JSON, nullable=True)  # resized derivatives (see imaging.make_variants)
     caption = Column(Text)
-    taken_at = Column(DateTime)
+    taken_at = Column(DateTime)  # from the upload, else EXIF capture time
+    width = Column(Integer)  # pixels, after orientation normalization
+    height = Column(Integer)
+    byte_size = Column(Integer)  # size of the stored file
     created_at = Column(DateTime, default=datetime.utcnow)
 
     # Relationships
@@ -183,6 +190,22 @@ class SeasonCost(Base):
     season = relationship("Season", back_populates="season_costs")
 
 
+class UserStats(Base):
+    """Per-user dashboard counters.
+
+    Maintained by database triggers on events and plant_batches (migration 006),
+    so the API only ever reads this table.
+    """
+    __tablename__ = "user_stats"
+
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    batch_count = Column(Integer, nullable=False, default=0)
+    event_count = Column(Integer, nullable=False, default=0)
+    last_active_day = Column(Date)  # most recent day with an event
+    current_streak = Column(Integer, nullable=False, default=0)  # consecutive days ending last_active_day
+    updated_at = Column(DateTime, default=datetime.utcnow)
+
+
 class IndividualPlant(Base):
     """Individual houseplant (my plants collection)."""
     __tablename__ = "individual_plants"
@@ -192,7 +215,8 @@ class IndividualPlant(Base):
     common_name = Column(String(100), nullable=False)
     scientific_name = Column(String(150), nullable=True)
     location = Column(String(100), nullable=True)
-    photo_url = Column(String(500), nullable=True)  # stored filename
+    photo_url = Column(String(500), nullable=True, index=True)  # stored filename
+    photo_variants = Column(JSON, nullable=True)  # resized derivatives of photo_url
     notes = Column(Text, nullable=True)
     acquired_date = Column(Date, nullable=True)  # when the user got this plant
     created_at = Column(DateTime, default=datetime.utcnow)
@@ -216,9 +240,25 @@ class CareEvent(Base):
     event_date = Column(DateTime, nullable=False)
     notes = Column(Text, nullable=True)
     milestone_label = Column(String(100), nullable=True)  # only for MILESTONE type
-    photo_filename = Column(String(255), nullable=True)  # optional photo
+    photo_filename = Column(String(255), nullable=True, index=True)  # optional photo
+    photo_variants = Column(JSON, nullable=True)  # resized derivatives of photo_filename
     created_at = Column(DateTime, default=datetime.utcnow)
 
     # Relationships
     plant = relationship("IndividualPlant", back_populates="care_events")
+    batch = relationship("PlantBatch", back_populates="care_events")
     user = relationship("User", back_populates="care_events")
+
+
+class IdentifyCacheEntry(Base):
+    """Cached plant identification, looked up by sha256 or perceptual hash (see identify_cache.py)."""
+    __tablename__ = "identify_cache"
+
+    id = Column(Integer, primary_key=True)
+    sha256 = Column(String(64), nullable=False, index=True)  # of the uploaded bytes
+    phash = Column(BigInteger, nullable=False)  # 64-bit dHash of the image, stored signed
+    phash_bands = Column(ARRAY(Integer), nullable=False)  # identify_cache.phash_bands, GIN-indexed in migration 013
+    result = Column(JSON, nullable=False)  # IdentifyResponse fields
+    hit_count = Column(Integer, nullable=False, default=0)
+    created_at = Column(DateTime, default=datetime.utcnow, index=True)  # entries expire IDENTIFY_CACHE_TTL_DAYS after this
+    last_hit_at = Column(DateTime, nullable=True)
@@ -0,0 +1,134 @@
+"""Keyset (cursor) pagination for list endpoints.
+
+Pages are keyed on (sort column, id) instead of OFFSET, so page N costs the
+same as page 1. The cursor handed to clients is an opaque token encoding the
+last row's sort value and id; it comes back as ?cursor= for the next page.
+
+Response headers:
+- X-Next-Cursor:    token for the next page (absent on the last page)
+- X-Total-Estimate: planner row estimate for the filtered query (?include_total=true)
+"""
+
+import base64
+import json
+from datetime import date, datetime
+from typing import Optional
+
+from fastapi import HTTPException, Response, status
+from sqlalchemy import Select, and_, or_, text, tuple_
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.ext.asyncio import AsyncSession
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+TOTAL_ESTIMATE_HEADER = "X-Total-Estimate"
+
+
+def encode_cursor(sort_value, row_id: int) -> str:
+    """Opaque, URL-safe token for the row a page ended on."""
+    if isinstance(sort_value, (datetime, date)):
+        sort_value = sort_value.isoformat()
+    raw = json.dumps([sort_value, row_id], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(token: str, sort_col) -> tuple:
+    """Inverse of encode_cursor; 400 on anything malformed."""
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        sort_value, row_id = json.loads(raw)
+        python_type = sort_col.property.columns[0].type.python_type
+        if sort_value is not None and python_type in (datetime, date):
+            sort_value = python_type.fromisoformat(sort_value)
+        return sort_value, int(row_id)
+    except (ValueError, TypeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
+
+
+def _after(sort_col, id_col, sort_value, row_id: int, descending: bool):
+    """WHERE clause selecting rows strictly after (sort_value, row_id) in page order.
+
+    Postgres sorts NULLs first for DESC and last for ASC, so nullable sort
+    columns need the NULL block handled explicitly.
+    """
+    if not sort_col.property.columns[0].nullable:
+        if descending:
+            return tuple_(sort_col, id_col) < tuple_(sort_value, row_id)
+        return tuple_(sort_col, id_col) > tuple_(sort_value, row_id)
+
+    if descending:
+        if sort_value is None:
+            return or_(and_(sort_col.is_(None), id_col < row_id), sort_col.isnot(None))
+        return or_(sort_col < sort_value, and_(sort_col == sort_value, id_col < row_id))
+
+    if sort_value is None:
+        return and_(sort_col.is_(None), id_col > row_id)
+    return or_(
+        sort_col > sort_value,
+        and_(sort_col == sort_value, id_col > row_id),
+        sort_col.is_(None),
+    )
+
+
+async def estimate_count(db: AsyncSession, query: Select) -> int:
+    """Planner row estimate for a query - constant time, unlike COUNT(*)."""
+    base = query.order_by(None).limit(None).offset(None)
+    sql = base.compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True})
+    plan = (await db.execute(text(f"EXPLAIN (FORMAT JSON) {sql}"))).scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+async def paginate(
+    db: AsyncSession,
+    query: Select,
+    response: Response,
+    sort_col,
+    id_col,
+    *,
+    cursor: Optional[str] = None,
+    skip: int = 0,
+    limit: int = 100,
+    descending: bool = True,
+    include_total: bool = False,
+) -> list:
+    """Run one page of `query` ordered by (sort_col, id_col) and set the cursor headers.
+
+    Without a cursor the legacy ?skip= offset still applies, so existing
+    clients keep working; any page can switch to cursors via X-Next-Cursor.
+    """
+    if limit < 0:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="limit must not be negative"
+        )
+
+    if include_total:
+        response.headers[TOTAL_ESTIMATE_HEADER] = str(await estimate_count(db, query))
+    if limit == 0:
+        return []
+
+    if descending:
+        page_query = query.order_by(sort_col.desc(), id_col.desc())
+    else:
+        page_query = query.order_by(sort_col.asc(), id_col.asc())
+
+    if cursor:
+        sort_value, row_id = decode_cursor(cursor, sort_col)
+        page_query = page_query.where(_after(sort_col, id_col, sort_value, row_id, descending))
+    elif skip:
+        page_query = page_query.offset(skip)
+
+    # One extra row tells us whether there is a next page
+    rows = (await db.scalars(page_query.limit(limit + 1))).all()
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(
+            getattr(last, sort_col.key), getattr(last, id_col.key)
+        )
+
+    return rows
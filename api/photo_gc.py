@@ -0,0 +1,200 @@
+#!/usr/bin/env python
+"""Delete stored photo files that no row references any more.
+
+Walks the photo store in sorted key order and checks each batch of names
+against photos.filename, individual_plants.photo_url and
+care_events.photo_filename with one set lookup per batch. Variant files
+(<stem>_<size>.<ext>) live as long as their original is referenced.
+
+Orphans younger than the grace period are left alone (an upload may not have
+committed its row yet). Before a file is deleted it is re-checked under the same
+advisory lock release_photo takes. Progress is checkpointed after every batch,
+so an interrupted run picks up where it stopped; memory stays at one batch plus
+one directory listing.
+
+    python photo_gc.py --dry-run          # report reclaimable bytes only
+    python photo_gc.py                    # delete orphans older than 24h
+    python photo_gc.py --grace-hours 1 --restart
+"""
+
+import argparse
+import json
+import re
+import time
+
+from sqlalchemy import text
+
+from database import engine
+from imaging import VARIANT_FORMATS, VARIANT_SIZES
+from storage import PHOTOS_DIR, storage
+
+GC_BATCH_SIZE = 2000
+CHECKPOINT_PATH = PHOTOS_DIR / ".gc-checkpoint.json"
+
+_VARIANT = re.compile(
+    rf"^(?P<stem>.+)_(?:{'|'.join(VARIANT_SIZES)})\.(?:{'|'.join(VARIANT_FORMATS)})$"
+)
+
+_REFERENCED = text("""
+    SELECT filename FROM photos WHERE filename = ANY(:names)
+    UNION SELECT photo_url FROM individual_plants WHERE photo_url = ANY(:names)
+    UNION SELECT photo_filename FROM care_events WHERE photo_filename = ANY(:names)
+""")
+
+# Every extension a referenced name uses - a variant's original is <stem> plus one of these
+_EXTENSIONS = text(r"""
+    SELECT DISTINCT substring(name from '\.[^./]*$') FROM (
+        SELECT filename AS name FROM photos
+        UNION ALL SELECT photo_url FROM individual_plants WHERE photo_url IS NOT NULL
+        UNION ALL SELECT photo_filename FROM care_events WHERE photo_filename IS NOT NULL
+    ) refs
+""")
+
+
+class Stats:
+    """Running totals, persisted with the checkpoint."""
+
+    FIELDS = ("scanned", "referenced", "orphaned", "in_grace", "deleted", "reclaimable_bytes", "deleted_bytes")
+
+    def __init__(self, values: dict = None):
+        for field in self.FIELDS:
+            setattr(self, field, (values or {}).get(field, 0))
+
+    def as_dict(self) -> dict:
+        return {field: getattr(self, field) for field in self.FIELDS}
+
+
+def _candidates(name: str, extensions: list[str]) -> list[str]:
+    """Names that keep this file alive: itself, or for a variant its possible originals."""
+    match = _VARIANT.match(name)
+    if match:
+        return [match["stem"] + extension for extension in extensions]
+    return [name]
+
+
+def _referenced(conn, names: set[str]) -> set[str]:
+    return set(conn.execute(_REFERENCED, {"names": list(names)}).scalars())
+
+
+def _delete_orphans(orphans: dict[str, list[str]], grace_seconds: float) -> list[str]:
+    """Re-check under the release_photo locks and delete; returns the names deleted.
+
+    save_upload holds the same lock until its row is committed, and touches a reused
+    file, so a fresh mtime here means the file was just claimed again.
+    """
+    deleted = []
+    with engine.begin() as conn:
+        candidates = sorted({c for names in orphans.values() for c in names})
+        for candidate in candidates:  # sorted, so concurrent runs lock in the same order
+            conn.execute(text("SELECT pg_advisory_xact_lock(hashtext(:name))"), {"name": candidate})
+        still_referenced = _referenced(conn, set(candidates))
+        for name, names in orphans.items():
+            stat = storage.stat(name)
+            if still_referenced.intersection(names) or stat is None or time.time() - stat.st_mtime < grace_seconds:
+                continue
+            storage.delete(name)
+            deleted.append(name)
+    return deleted
+
+
+def _process(batch: list[str], extensions: list[str], grace_seconds: float, dry_run: bool, stats: Stats):
+    candidates = {name: _candidates(name, extensions) for name in batch}
+    with engine.connect() as conn:
+        referenced = _referenced(conn, {c for names in candidates.values() for c in names})
+
+    now = time.time()
+    orphans = {}
+    sizes = {}
+    for name, names in candidates.items():
+        stats.scanned += 1
+        if referenced.intersection(names):
+            stats.referenced += 1
+            continue
+        stat = storage.stat(name)
+        if stat is None:
+            continue  # removed while we were looking
+        stats.orphaned += 1
+        stats.reclaimable_bytes += stat.st_size
+        if now - stat.st_mtime < grace_seconds:
+            stats.in_grace += 1
+            continue
+        orphans[name] = names
+        sizes[name] = stat.st_size
+
+    if orphans and not dry_run:
+        for name in _delete_orphans(orphans, grace_seconds):
+            stats.deleted += 1
+            stats.deleted_bytes += sizes[name]
+
+
+def _sweep_staging(grace_seconds: float, dry_run: bool) -> int:
+    """Remove upload/variant temp files left behind by a crash."""
+    removed = 0
+    for path in storage.temp_dir.rglob("*"):
+        if path.is_file() and time.time() - path.stat().st_mtime >= grace_seconds:
+            if not dry_run:
+                path.unlink(missing_ok=True)
+            removed += 1
+    return removed
+
+
+def _load_checkpoint(restart: bool) -> tuple[str, Stats]:
+    if restart or not CHECKPOINT_PATH.exists():
+        return None, Stats()
+    checkpoint = json.loads(CHECKPOINT_PATH.read_text())
+    return checkpoint["after"], Stats(checkpoint["stats"])
+
+
+def _save_checkpoint(after: str, stats: Stats):
+    partial = CHECKPOINT_PATH.with_suffix(".part")
+    partial.write_text(json.dumps({"after": after, "stats": stats.as_dict()}))
+    partial.replace(CHECKPOINT_PATH)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Delete photo files no longer referenced by any row.")
+    parser.add_argument("--dry-run", action="store_true", help="report orphans and reclaimable bytes only")
+    parser.add_argument("--grace-hours", type=float, default=24, help="keep orphans modified this recently (default 24)")
+    parser.add_argument("--batch-size", type=int, default=GC_BATCH_SIZE, help="names per database lookup")
+    parser.add_argument("--restart", action="store_true", help="ignore a saved checkpoint and start from the top")
+    args = parser.parse_args()
+
+    grace_seconds = args.grace_hours * 3600
+    # Dry runs neither read nor write the checkpoint, so they never disturb a real run
+    after, stats = _load_checkpoint(args.restart or args.dry_run)
+    if after:
+        print(f"↻ Resuming after {after}")
+
+    with engine.connect() as conn:
+        extensions = [e for e in conn.execute(_EXTENSIONS).scalars() if e]
+
+    started = time.perf_counter()
+    batch = []
+    last_key = after
+    for key in storage.keys(after):
+        batch.append(key.rsplit("/", 1)[-1])
+        last_key = key
+        if len(batch) >= args.batch_size:
+            _process(batch, extensions, grace_seconds, args.dry_run, stats)
+            batch = []
+            if not args.dry_run:
+                _save_checkpoint(last_key, stats)
+            print(f"  {stats.scanned} scanned, {stats.orphaned} orphaned")
+    if batch:
+        _process(batch, extensions, grace_seconds, args.dry_run, stats)
+
+    staged = _sweep_staging(grace_seconds, args.dry_run)
+    if not args.dry_run:
+        CHECKPOINT_PATH.unlink(missing_ok=True)
+
+    mb = 1024 * 1024
+    print(f"\n🧹 Photo GC{' (dry run)' if args.dry_run else ''} - {time.perf_counter() - started:.1f}s")
+    print(f"  scanned:     {stats.scanned} files ({stats.referenced} referenced)")
+    print(f"  orphaned:    {stats.orphaned} files, {stats.reclaimable_bytes / mb:.1f} MB reclaimable")
+    print(f"  in grace:    {stats.in_grace} files (younger than {args.grace_hours:g}h)")
+    print(f"  deleted:     {stats.deleted} files, {stats.deleted_bytes / mb:.1f} MB")
+    print(f"  temp files:  {staged} stale {'found' if args.dry_run else 'removed'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,35 @@
+"""Admin / diagnostics endpoints (token of an ADMIN_USER_IDS user required)."""
+
+from fastapi import APIRouter, Depends
+
+from auth import require_admin, user_cache
+from database import get_pool_stats
+from executors import get_executor_stats
+from loop_monitor import get_loop_stats
+
+router = APIRouter(prefix="/admin", tags=["admin"], dependencies=[Depends(require_admin)])
+
+
+@router.get("/db-pool", response_model=dict)
+async def db_pool_stats():
+    """Connection pool usage: checked-out, idle and overflow counts plus checkout wait times."""
+    return get_pool_stats()
+
+
+@router.get("/executors", response_model=dict)
+async def executor_stats():
+    """Per-pool queue depth for the off-loop I/O thread pool and argon2 process pool."""
+    return get_executor_stats()
+
+
+@router.get("/event-loop", response_model=dict)
+async def event_loop_stats():
+    """Loop lag histogram and the handlers that blocked the loop longest (needs LOOP_MONITOR=true)."""
+    return get_loop_stats()
+
+
+@router.get("/user-cache", response_model=dict)
+async def user_cache_stats():
+    """Size and hit rate of the in-process cache behind get_current_user."""
+    return user_cache.stats()
+
@@ -1,11 +1,13 @@
 """Season cost tracking endpoints."""
 
 from typing import Optional
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from sqlalchemy import func
+from fastapi import APIRouter, Depends, HTTPException, Response, status
+from sqlalchemy import select, func, delete
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from database import get_db
+from auth import CurrentUser, get_current_user
+from database import get_async_db
+from pagination import paginate
 from models import SeasonCost, Season
 from schemas import SeasonCostCreate, SeasonCostResponse
 
@@ -14,30 +16,36 @@ router = APIRouter(prefix="/costs", tags=["costs"])
 
 @router.get("/", response_model=list[SeasonCostResponse])
 async def list_costs(
+    response: Response,
     season_id: Optional[int] = None,
     category: Optional[str] = None,
     user_id: Optional[int] = None,
     skip: int = 0,
     limit: int = 100,
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = None,
+    include_total: bool = False,
+    db: AsyncSession = Depends(get_async_db)
 ):
     """List season costs with optional filters."""
-    query = db.query(SeasonCost)
+    query = select(SeasonCost)
 
     if season_id:
-        query = query.filter(SeasonCost.season_id == season_id)
+        query = query.where(SeasonCost.season_id == season_id)
     if category:
-        query = query.filter(SeasonCost.category == category)
+        query = query.where(SeasonCost.category == category)
     if user_id:
-        query = query.filter(SeasonCost.user_id == user_id)
+        query = query.where(SeasonCost.user_id == user_id)
 
-    return query.order_by(SeasonCost.created_at.desc()).offset(skip).limit(limit).all()
+    return await paginate(
+        db, query, response, SeasonCost.created_at, SeasonCost.id,
+        cursor=cursor, skip=skip, limit=limit, include_total=include_total,
+    )
 
 
 @router.get("/{cost_id}", response_model=SeasonCostResponse)
-async def get_cost(cost_id: int, db: Session = Depends(get_db)):
+async def get_cost(cost_id: int, db: AsyncSession = Depends(get_async_db)):
     """Get a specific cost entry."""
-    cost = db.query(SeasonCost).filter(SeasonCost.id == cost_id).first()
+    cost = await db.get(SeasonCost, cost_id)
 
     if not cost:
         raise HTTPException(
@@ -51,22 +59,22 @@ async def get_cost(cost_id: int, db: Session = Depends(get_db)):
 @router.post("/", response_model=SeasonCostResponse, status_code=status.HTTP_201_CREATED)
 async def create_cost(
     cost: SeasonCostCreate,
-    user_id: int,  # Injected from frontend session
-    db: Session = Depends(get_db)
+    current_user: CurrentUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Add a new cost to a season."""
     # Validate season exists
-    season = db.query(Season).filter(Season.id == cost.season_id).first()
+    season = await db.get(Season, cost.season_id)
     if not season:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Season not found"
         )
 
-    db_cost = SeasonCost(**cost.model_dump(), user_id=user_id)
+    db_cost = SeasonCost(**cost.model_dump(), user_id=current_user.id)
     db.add(db_cost)
-    db.commit()
-    db.refresh(db_cost)
+    await db.commit()
+    await db.refresh(db_cost)
 
     return db_cost
 
@@ -75,10 +83,10 @@ async def create_cost(
 async def update_cost(
     cost_id: int,
     cost_update: SeasonCostCreate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Update a cost entry."""
-    db_cost = db.query(SeasonCost).filter(SeasonCost.id == cost_id).first()
+    db_cost = await db.get(SeasonCost, cost_id)
 
     if not db_cost:
         raise HTTPException(
@@ -89,16 +97,16 @@ async def update_cost(
     for key, value in cost_update.model_dump(exclude_unset=True).items():
         setattr(db_cost, key, value)
 
-    db.commit()
-    db.refresh(db_cost)
+    await db.commit()
+    await db.refresh(db_cost)
 
     return db_cost
 
 
 @router.delete("/{cost_id}", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_cost(cost_id: int, db: Session = Depends(get_db)):
+async def delete_cost(cost_id: int, db: AsyncSession = Depends(get_async_db)):
     """Delete a cost entry."""
-    db_cost = db.query(SeasonCost).filter(SeasonCost.id == cost_id).first()
+    db_cost = await db.get(SeasonCost, cost_id)
 
     if not db_cost:
         raise HTTPException(
@@ -106,15 +114,15 @@ async def delete_cost(cost_id: int, db: Session = Depends(get_db)):
             detail="Cost entry not found"
         )
 
-    db.delete(db_cost)
-    db.commit()
+    await db.delete(db_cost)
+    await db.commit()
 
 
 @router.get("/season/{season_id}/total", response_model=dict)
-async def get_season_total(season_id: int, db: Session = Depends(get_db)):
+async def get_season_total(season_id: int, db: AsyncSession = Depends(get_async_db)):
     """Get total cost for a season, with breakdown by category."""
     # Validate season exists
-    season = db.query(Season).filter(Season.id == season_id).first()
+    season = await db.get(Season, season_id)
     if not season:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -122,17 +130,17 @@ async def get_season_total(season_id: int, db: Session = Depends(get_db)):
         )
 
     # Total cost
-    total = db.query(func.sum(SeasonCost.cost)).filter(
+    total = await db.scalar(select(func.sum(SeasonCost.cost)).where(
         SeasonCost.season_id == season_id
-    ).scalar() or 0.0
+    )) or 0.0
 
     # Breakdown by category
-    breakdown = db.query(
+    breakdown = (await db.execute(select(
         SeasonCost.category,
         func.sum(SeasonCost.cost).label("total")
-    ).filter(
+    ).where(
         SeasonCost.season_id == season_id
-    ).group_by(SeasonCost.category).all()
+    ).group_by(SeasonCost.category))).all()
 
     return {
         "season_id": season_id,
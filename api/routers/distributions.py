@@ -1,10 +1,13 @@
 """Distribution endpoints (gifting and trading)."""
 
 from typing import Optional
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Response, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from database import get_db
+from auth import CurrentUser, get_current_user
+from database import get_async_db
+from pagination import paginate
 from models import Distribution, PlantBatch
 from schemas import DistributionCreate, DistributionResponse
 
@@ -13,35 +16,41 @@ router = APIRouter(prefix="/distributions", tags=["distributions"])
 
 @router.get("/", response_model=list[DistributionResponse])
 async def list_distributions(
+    response: Response,
     batch_id: Optional[int] = None,
     dist_type: Optional[str] = None,
     user_id: Optional[int] = None,
     skip: int = 0,
     limit: int = 100,
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = None,
+    include_total: bool = False,
+    db: AsyncSession = Depends(get_async_db)
 ):
     """List distributions (gifts/trades) with optional filters."""
-    query = db.query(Distribution)
+    query = select(Distribution)
 
     if batch_id:
-        query = query.filter(Distribution.batch_id == batch_id)
+        query = query.where(Distribution.batch_id == batch_id)
     if dist_type:
         if dist_type not in ["gift", "trade"]:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Type must be 'gift' or 'trade'"
             )
-        query = query.filter(Distribution.type == dist_type)
+        query = query.where(Distribution.type == dist_type)
     if user_id:
-        query = query.filter(Distribution.user_id == user_id)
+        query = query.where(Distribution.user_id == user_id)
 
-    return query.order_by(Distribution.date.desc()).offset(skip).limit(limit).all()
+    return await paginate(
+        db, query, response, Distribution.date, Distribution.id,
+        cursor=cursor, skip=skip, limit=limit, include_total=include_total,
+    )
 
 
 @router.get("/{distribution_id}", response_model=DistributionResponse)
-async def get_distribution(distribution_id: int, db: Session = Depends(get_db)):
+async def get_distribution(distribution_id: int, db: AsyncSession = Depends(get_async_db)):
     """Get a specific distribution record."""
-    dist = db.query(Distribution).filter(Distribution.id == distribution_id).first()
+    dist = await db.get(Distribution, distribution_id)
 
     if not dist:
         raise HTTPException(
@@ -55,12 +64,12 @@ async def get_distribution(distribution_id: int, db: Session = Depends(get_db)):
 @router.post("/", response_model=DistributionResponse, status_code=status.HTTP_201_CREATED)
 async def create_distribution(
     distribution: DistributionCreate,
-    user_id: int,  # Injected from frontend session
-    db: Session = Depends(get_db)
+    current_user: CurrentUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Log a new gift or trade."""
     # Validate batch exists
-    batch = db.query(PlantBatch).filter(PlantBatch.id == distribution.batch_id).first()
+    batch = await db.get(PlantBatch, distribution.batch_id)
     if not batch:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -74,10 +83,10 @@ async def create_distribution(
             detail="Type must be 'gift' or 'trade'"
         )
 
-    db_dist = Distribution(**distribution.model_dump(), user_id=user_id)
+    db_dist = Distribution(**distribution.model_dump(), user_id=current_user.id)
     db.add(db_dist)
-    db.commit()
-    db.refresh(db_dist)
+    await db.commit()
+    await db.refresh(db_dist)
 
     return db_dist
 
@@ -86,10 +95,10 @@ async def create_distribution(
 async def update_distribution(
     distribution_id: int,
     dist_update: DistributionCreate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Update a distribution record."""
-    db_dist = db.query(Distribution).filter(Distribution.id == distribution_id).first()
+    db_dist = await db.get(Distribution, distribution_id)
 
     if not db_dist:
         raise HTTPException(
@@ -106,16 +115,16 @@ async def update_distribution(
     for key, value in dist_update.model_dump(exclude_unset=True).items():
         setattr(db_dist, key, value)
 
-    db.commit()
-    db.refresh(db_dist)
+    await db.commit()
+    await db.refresh(db_dist)
 
     return db_dist
 
 
 @router.delete("/{distribution_id}", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_distribution(distribution_id: int, db: Session = Depends(get_db)):
+async def delete_distribution(distribution_id: int, db: AsyncSession = Depends(get_async_db)):
     """Delete a distribution record."""
-    db_dist = db.query(Distribution).filter(Distribution.id == distribution_id).first()
+    db_dist = await db.get(Distribution, distribution_id)
 
     if not db_dist:
         raise HTTPException(
@@ -123,23 +132,28 @@ async def delete_distribution(distribution_id: int, db: Session = Depends(get_db
             detail="Distribution record not found"
         )
 
-    db.delete(db_dist)
-    db.commit()
+    await db.delete(db_dist)
+    await db.commit()
 
 
 @router.get("/batch/{batch_id}/summary", response_model=dict)
-async def get_batch_distribution_summary(batch_id: int, db: Session = Depends(get_db)):
+async def get_batch_distribution_summary(batch_id: int, db: AsyncSession = Depends(get_async_db)):
     """Get summary of all gifts/trades for a batch."""
     # Validate batch exists
-    batch = db.query(PlantBatch).filter(PlantBatch.id == batch_id).first()
+    batch = await db.get(PlantBatch, batch_id)
     if not batch:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Plant batch not found"
         )
 
-    dists = db.query(Distribution).filter(Distribution.batch_id == batch_id).all()
+    dists = (await db.scalars(select(Distribution).where(Distribution.batch_id == batch_id))).all()
 
+    return summarize_distributions(batch_id, dists)
+
+
+def summarize_distributions(batch_id: int, dists: list[Distribution]) -> dict:
+    """Totals shown on the batch page (shared with GET /plants/batches/{id}/full)."""
     gifts = [d for d in dists if d.type == "gift"]
     trades = [d for d in dists if d.type == "trade"]
 
@@ -1,30 +1,38 @@
 """Plant event endpoints (milestones, observations)."""
 
 from typing import Optional
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Response, status
+from sqlalchemy import select, insert, update, delete
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from database import get_db
-from models import Event, PlantBatch, EventType
-from schemas import EventCreate, EventResponse
+from auth import CurrentUser, get_current_user
+from database import get_async_db
+from pagination import paginate
+from models import Event, PlantBatch, EventType, Photo
+from schemas import EventCreate, EventResponse, EventBulkCreate, EventBulkResponse, BulkItemError
 
 router = APIRouter(prefix="/events", tags=["events"])
 
+MAX_BULK_EVENTS = 1000
+
 
 @router.get("/", response_model=list[EventResponse])
 async def list_events(
+    response: Response,
     batch_id: Optional[int] = None,
     event_type: Optional[str] = None,
     user_id: Optional[int] = None,
     skip: int = 0,
     limit: int = 100,
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = None,
+    include_total: bool = False,
+    db: AsyncSession = Depends(get_async_db)
 ):
     """List events with optional filters."""
-    query = db.query(Event)
+    query = select(Event)
 
     if batch_id:
-        query = query.filter(Event.batch_id == batch_id)
+        query = query.where(Event.batch_id == batch_id)
     if event_type:
         # Validate event type
         try:
@@ -34,18 +42,21 @@ async def list_events(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail=f"Invalid event type: {event_type}"
             )
-        query = query.filter(Event.event_type == event_type)
+        query = query.where(Event.event_type == event_type)
     if user_id:
-        query = query.filter(Event.user_id == user_id)
+        query = query.where(Event.user_id == user_id)
 
     # Order by event date descending
-    return query.order_by(Event.event_date.desc()).offset(skip).limit(limit).all()
+    return await paginate(
+        db, query, response, Event.event_date, Event.id,
+        cursor=cursor, skip=skip, limit=limit, include_total=include_total,
+    )
 
 
 @router.get("/{event_id}", response_model=EventResponse)
-async def get_event(event_id: int, db: Session = Depends(get_db)):
+async def get_event(event_id: int, db: AsyncSession = Depends(get_async_db)):
     """Get a specific event."""
-    event = db.query(Event).filter(Event.id == event_id).first()
+    event = await db.get(Event, event_id)
 
     if not event:
         raise HTTPException(
@@ -59,12 +70,12 @@ async def get_event(event_id: int, db: Session = Depends(get_db)):
 @router.post("/", response_model=EventResponse, status_code=status.HTTP_201_CREATED)
 async def create_event(
     event: EventCreate,
-    user_id: int,  # Injected from frontend session
-    db: Session = Depends(get_db)
+    current_user: CurrentUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Create a new event (quick logging primary use case)."""
     # Validate batch exists
-    batch = db.query(PlantBatch).filter(PlantBatch.id == event.batch_id).first()
+    batch = await db.get(PlantBatch, event.batch_id)
     if not batch:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -82,23 +93,72 @@ async def create_event(
 
     db_event = Event(
         **event.model_dump(),
-        user_id=user_id
+        user_id=current_user.id
     )
     db.add(db_event)
-    db.commit()
-    db.refresh(db_event)
+    await db.commit()
+    await db.refresh(db_event)
 
     return db_event
 
 
+@router.post("/bulk", response_model=EventBulkResponse, status_code=status.HTTP_201_CREATED)
+async def create_events_bulk(
+    payload: EventBulkCreate,
+    current_user: CurrentUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Create many events in one transaction.
+
+    Batch ids are checked with a single IN query and all valid rows are written
+    with one INSERT ... RETURNING. Invalid items are reported in `errors` by index
+    and don't stop the valid ones.
+    """
+    if len(payload.events) > MAX_BULK_EVENTS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Too many events. Max per request: {MAX_BULK_EVENTS}"
+        )
+
+    batch_ids = {event.batch_id for event in payload.events}
+    existing = set()
+    if batch_ids:
+        existing = set((await db.scalars(
+            select(PlantBatch.id).where(PlantBatch.id.in_(batch_ids))
+        )).all())
+
+    rows = []
+    errors = []
+    for index, event in enumerate(payload.events):
+        if event.batch_id not in existing:
+            errors.append(BulkItemError(index=index, detail="Plant batch not found"))
+            continue
+        try:
+            EventType(event.event_type)
+        except ValueError:
+            errors.append(BulkItemError(index=index, detail=f"Invalid event type: {event.event_type}"))
+            continue
+        rows.append({**event.model_dump(), "user_id": current_user.id})
+
+    created = []
+    if rows:
+        created = (await db.scalars(
+            insert(Event).returning(Event, sort_by_parameter_order=True), rows
+        )).all()
+        await db.commit()
+
+    return EventBulkResponse(created=created, errors=errors)
+
+
 @router.put("/{event_id}", response_model=EventResponse)
 async def update_event(
     event_id: int,
     event_update: EventCreate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Update an event (notes, date, etc.)."""
-    db_event = db.query(Event).filter(Event.id == event_id).first()
+    db_event = await db.get(Event, event_id)
 
     if not db_event:
         raise HTTPException(
@@ -119,16 +179,16 @@ async def update_event(
     for key, value in event_update.model_dump(exclude_unset=True).items():
         setattr(db_event, key, value)
 
-    db.commit()
-    db.refresh(db_event)
+    await db.commit()
+    await db.refresh(db_event)
 
     return db_event
 
 
 @router.delete("/{event_id}", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_event(event_id: int, db: Session = Depends(get_db)):
+async def delete_event(event_id: int, db: AsyncSession = Depends(get_async_db)):
     """Delete an event."""
-    db_event = db.query(Event).filter(Event.id == event_id).first()
+    db_event = await db.get(Event, event_id)
 
     if not db_event:
         raise HTTPException(
@@ -136,14 +196,16 @@ async def delete_event(event_id: int, db: Session = Depends(get_db)):
             detail="Event not found"
         )
 
-    db.delete(db_event)
-    db.commit()
+    # Detach photos from the event (what the ORM cascade used to do), then delete
+    await db.execute(update(Photo).where(Photo.event_id == event_id).values(event_id=None))
+    await db.execute(delete(Event).where(Event.id == event_id))
+    await db.commit()
 
 
 @router.get("/batch/{batch_id}/timeline", response_model=list[EventResponse])
-async def get_batch_timeline(batch_id: int, db: Session = Depends(get_db)):
+async def get_batch_timeline(batch_id: int, db: AsyncSession = Depends(get_async_db)):
     """Get all events for a batch in chronological order (for timeline view)."""
-    batch = db.query(PlantBatch).filter(PlantBatch.id == batch_id).first()
+    batch = await db.get(PlantBatch, batch_id)
 
     if not batch:
         raise HTTPException(
@@ -151,8 +213,8 @@ async def get_batch_timeline(batch_id: int, db: Session = Depends(get_db)):
             detail="Plant batch not found"
         )
 
-    events = db.query(Event).filter(
+    events = await db.scalars(select(Event).where(
         Event.batch_id == batch_id
-    ).order_by(Event.event_date.asc()).all()
+    ).order_by(Event.event_date.asc()))
 
-    return events
+    return events.all()
@@ -0,0 +1,46 @@
+"""Season export endpoints (streamed CSV / NDJSON / XLSX)."""
+
+from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from database import get_async_db
+from exporter import MEDIA_TYPES, STREAMS
+from models import Season
+
+router = APIRouter(prefix="/export", tags=["export"])
+
+
+@router.get("/season/{season_id}")
+async def export_season(
+    season_id: int,
+    format: str = "csv",
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Stream a season's batches (with variety), events, care events, costs and distributions.
+
+    - csv: one file with a record_type column
+    - ndjson: one JSON object per line, tagged with "record"
+    - xlsx: one sheet per record type
+    """
+    if format not in STREAMS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid format. Must be one of: {', '.join(STREAMS)}"
+        )
+
+    season = await db.get(Season, season_id)
+    if not season:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Season not found"
+        )
+
+    # The stream opens its own session - the request's session may be closed
+    # before the last chunk is sent
+    return StreamingResponse(
+        STREAMS[format](season_id),
+        media_type=MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="plantlady-season-{season.year}.{format}"'},
+    )
@@ -3,15 +3,27 @@
 import base64
 import json
 import os
-from fastapi import APIRouter, HTTPException, status, UploadFile, File
+import time
+from fastapi import APIRouter, Depends, HTTPException, Response, status, UploadFile, File
 from pydantic import BaseModel
+from sqlalchemy.ext.asyncio import AsyncSession
 import anthropic
 
+from database import get_async_db
+from executors import run_io, run_cpu
+from identify_cache import IDENTIFY_CACHE_HEADER, lookup_exact, lookup_similar, store
+from imaging import UPLOAD_FORMATS, downscale_for_upload, perceptual_hash
+from uploads import staged_upload, upload_extension
+
 router = APIRouter(prefix="/identify", tags=["identify"])
 
-# Allowed image types for identification
-ALLOWED_EXTENSIONS = {".jpg", ".jpeg", ".png", ".gif", ".webp"}
-MAX_FILE_SIZE = 10 * 1024 * 1024  # 10 MB
+# Uploads are downscaled and re-encoded before they're sent: the model gains
+# nothing from more than ~1.5k px on the long edge, and a 10 MB photo is slow to ship
+IDENTIFY_MAX_EDGE = int(os.getenv("IDENTIFY_MAX_EDGE", "1568"))
+IDENTIFY_IMAGE_FORMAT = os.getenv("IDENTIFY_IMAGE_FORMAT", "jpeg")  # jpeg or webp
+IDENTIFY_IMAGE_QUALITY = int(os.getenv("IDENTIFY_IMAGE_QUALITY", "85"))
+if IDENTIFY_IMAGE_FORMAT not in UPLOAD_FORMATS:
+    raise ValueError(f"Unknown IDENTIFY_IMAGE_FORMAT: {IDENTIFY_IMAGE_FORMAT}")
 
 
 class IdentifyResponse(BaseModel):
@@ -37,12 +49,21 @@ Return ONLY the JSON object, no other text or markdown formatting."""
 
 
 @router.post("/", response_model=IdentifyResponse, status_code=status.HTTP_200_OK)
-async def identify_plant(file: UploadFile = File(...)):
+async def identify_plant(
+    response: Response,
+    file: UploadFile = File(...),
+    db: AsyncSession = Depends(get_async_db)
+):
     """
     Upload a plant photo and get an AI-powered identification.
 
     Sends the image to Claude Vision API and returns structured plant info.
     Requires ANTHROPIC_API_KEY environment variable to be set.
+
+    Results are cached by content and perceptual hash: the same or a near-identical
+    photo identified before is answered from the cache (X-Identify-Cache: hit) without calling the API.
+    Otherwise the image is sent downscaled to IDENTIFY_MAX_EDGE; the Server-Timing
+    header reports the time spent preparing it and waiting on the API.
     """
     # Check that the API key is configured
     api_key = os.getenv("ANTHROPIC_API_KEY")
@@ -52,47 +73,47 @@ async def identify_plant(file: UploadFile = File(...)):
             detail="Plant identification service not configured (missing API key)"
         )
 
-    # Validate file has a name
-    if not file.filename:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="No filename provided"
-        )
-
-    # Check file extension
-    from pathlib import Path
-    file_ext = Path(file.filename).suffix.lower()
-    if file_ext not in ALLOWED_EXTENSIONS:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"File type not allowed. Must be: {', '.join(ALLOWED_EXTENSIONS)}"
-        )
-
-    # Read and validate file size
-    contents = await file.read()
-    if len(contents) > MAX_FILE_SIZE:
-        raise HTTPException(
-            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
-            detail=f"File too large. Max size: {MAX_FILE_SIZE / 1024 / 1024:.1f} MB"
-        )
-
-    # Map file extension to media type for the Claude API
-    media_type_map = {
-        ".jpg": "image/jpeg",
-        ".jpeg": "image/jpeg",
-        ".png": "image/png",
-        ".gif": "image/gif",
-        ".webp": "image/webp",
-    }
-    media_type = media_type_map[file_ext]
-
-    # Base64-encode the image for the Claude API
-    image_b64 = base64.b64encode(contents).decode("utf-8")
-
-    # Call Claude Vision API
+    # Same file types and size limit as photo uploads
+    upload_extension(file.filename)
+
+    # Staged to a temp file (413 past MAX_FILE_SIZE) so the image is never held in memory whole
+    async with staged_upload(file) as (staged, digest):
+        cached = await lookup_exact(db, digest)
+        if cached is None:
+            # Near-identical images share a hash, so a cached answer can be reused
+            try:
+                image_hash = await run_cpu(perceptual_hash, str(staged))
+            except Exception:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="File is not a readable image"
+                )
+            cached = await lookup_similar(db, image_hash)
+        if cached is not None:
+            response.headers[IDENTIFY_CACHE_HEADER] = "hit"
+            return IdentifyResponse(**cached)
+        response.headers[IDENTIFY_CACHE_HEADER] = "miss"
+
+        # Downscale and re-encode in the cpu pool, then base64-encode for the Claude API
+        prepare_started = time.perf_counter()
+        try:
+            image_bytes, media_type, sent = await run_cpu(
+                downscale_for_upload, str(staged), IDENTIFY_MAX_EDGE, IDENTIFY_IMAGE_FORMAT, IDENTIFY_IMAGE_QUALITY
+            )
+        except Exception:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="File is not a readable image"
+            )
+    image_b64 = base64.b64encode(image_bytes).decode("utf-8")
+    prepare_ms = (time.perf_counter() - prepare_started) * 1000
+
+    # Call Claude Vision API (the SDK call blocks, so it runs in the I/O pool)
+    upstream_started = time.perf_counter()
     try:
         client = anthropic.Anthropic(api_key=api_key)
-        message = client.messages.create(
+        message = await run_io(
+            client.messages.create,
             model="claude-sonnet-4-6",
             max_tokens=1024,
             messages=[
@@ -121,6 +142,14 @@ async def identify_plant(file: UploadFile = File(...)):
             status_code=status.HTTP_502_BAD_GATEWAY,
             detail=f"Plant identification service error: {str(e)}"
         )
+    upstream_ms = (time.perf_counter() - upstream_started) * 1000
+
+    response.headers["Server-Timing"] = f"prepare;dur={prepare_ms:.1f}, upstream;dur={upstream_ms:.1f}"
+    print(
+        f"Identify: sent {sent['bytes'] / 1024:.0f} KB {media_type} {sent['size'][0]}x{sent['size'][1]} "
+        f"(upload {sent['source_bytes'] / 1024:.0f} KB {sent['source_size'][0]}x{sent['source_size'][1]}), "
+        f"prepare {prepare_ms:.0f} ms, upstream {upstream_ms:.0f} ms"
+    )
 
     # Parse the JSON response from Claude
     raw_text = message.content[0].text.strip()
@@ -138,7 +167,7 @@ async def identify_plant(file: UploadFile = File(...)):
 
     # Validate and return structured response
     try:
-        return IdentifyResponse(
+        identified = IdentifyResponse(
             common_name=result["common_name"],
             scientific_name=result["scientific_name"],
             description=result["description"],
@@ -150,3 +179,6 @@ async def identify_plant(file: UploadFile = File(...)):
             status_code=status.HTTP_502_BAD_GATEWAY,
             detail=f"Unexpected response format from identification service: {str(e)}"
         )
+
+    await store(db, digest, image_hash, identified.model_dump())
+    return identified
@@ -0,0 +1,78 @@
+"""Spreadsheet import endpoints (season CSV/XLSX uploads)."""
+
+import os
+from typing import Optional
+from zipfile import BadZipFile
+from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File
+from sqlalchemy.exc import DataError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from auth import CurrentUser, get_current_user
+from database import engine, get_async_db
+from executors import run_io
+from importer import iter_rows, import_plants, import_costs
+from models import Season
+from schemas import ImportResponse
+
+router = APIRouter(prefix="/imports", tags=["imports"])
+
+# Enforced on the request body by UploadSizeLimit (see main.py)
+MAX_IMPORT_SIZE = int(os.getenv("MAX_IMPORT_MB", "20")) * 1024 * 1024
+
+
+def _run_import(apply, file: UploadFile, sheet: Optional[str], season_id: int, user_id: int) -> dict:
+    """Stream the upload into staging and apply it in one transaction (runs in the I/O pool)."""
+    try:
+        rows = iter_rows(file.file, file.filename or "", sheet)
+        with engine.begin() as conn:
+            return apply(conn, rows, season_id, user_id)
+    except (ValueError, UnicodeDecodeError, BadZipFile) as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Could not read spreadsheet: {e}"
+        )
+    except DataError as e:
+        # A value the per-row checks let through; nothing was written
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Could not import spreadsheet: {e.orig}"
+        )
+
+
+async def _import(apply, season_id, file, sheet, current_user, db) -> dict:
+    season = await db.get(Season, season_id)
+    if not season:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Season not found"
+        )
+    return await run_io(_run_import, apply, file, sheet, season_id, current_user.id)
+
+
+@router.post("/plants", response_model=ImportResponse)
+async def import_plants_sheet(
+    season_id: int,
+    file: UploadFile = File(...),
+    sheet: Optional[str] = None,  # xlsx worksheet name (first sheet by default)
+    current_user: CurrentUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Import a "Seed Starting Information" sheet (.csv or .xlsx) into a season.
+
+    Varieties are upserted by name and one batch per variety is created or
+    updated for the season.
+    """
+    return await _import(import_plants, season_id, file, sheet, current_user, db)
+
+
+@router.post("/costs", response_model=ImportResponse)
+async def import_costs_sheet(
+    season_id: int,
+    file: UploadFile = File(...),
+    sheet: Optional[str] = None,  # xlsx worksheet name (first sheet by default)
+    current_user: CurrentUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Import a "Season Costs" sheet (.csv or .xlsx); material costs are upserted by item name."""
+    return await _import(import_costs, season_id, file, sheet, current_user, db)
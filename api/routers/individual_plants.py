@@ -1,27 +1,28 @@
 """Individual plants (my plants collection) endpoints."""
 
 from typing import Optional
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File
-from sqlalchemy.orm import Session
-from sqlalchemy import func
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Response, status, UploadFile, File
+from sqlalchemy import select, insert, delete, literal, union_all
+from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import datetime
-import os
-import uuid
 
-from database import get_db
-from models import IndividualPlant, CareEvent, User
+from auth import CurrentUser, get_current_user
+from database import get_async_db
+from pagination import paginate
+from models import IndividualPlant, CareEvent, PlantBatch
 from schemas import (
     IndividualPlantCreate,
     IndividualPlantResponse,
     CareEventCreate,
     CareEventResponse,
+    CareEventBulkCreate,
+    CareEventBulkResponse,
 )
+from uploads import save_upload, generate_variants, release_photo, release_photos
 
 router = APIRouter(prefix="/individual-plants", tags=["individual-plants"])
 
-# Photo storage directory
-PHOTOS_DIR = "/app/photos"
-os.makedirs(PHOTOS_DIR, exist_ok=True)
+MAX_BULK_CARE_TARGETS = 1000
 
 
 # ============================================================================
@@ -30,35 +31,31 @@ os.makedirs(PHOTOS_DIR, exist_ok=True)
 
 @router.get("", response_model=list[IndividualPlantResponse])
 async def list_plants(
+    response: Response,
     user_id: int,
     skip: int = 0,
     limit: int = 100,
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = None,
+    include_total: bool = False,
+    db: AsyncSession = Depends(get_async_db)
 ):
-    """List user's individual plants."""
-    plants = db.query(IndividualPlant).filter(
-        IndividualPlant.user_id == user_id
-    ).offset(skip).limit(limit).all()
-    return plants
+    """List user's individual plants (oldest first, cursor-paginated)."""
+    query = select(IndividualPlant).where(IndividualPlant.user_id == user_id)
+    return await paginate(
+        db, query, response, IndividualPlant.created_at, IndividualPlant.id,
+        cursor=cursor, skip=skip, limit=limit, descending=False, include_total=include_total,
+    )
 
 
 @router.post("", response_model=IndividualPlantResponse, status_code=status.HTTP_201_CREATED)
 async def create_plant(
-    user_id: int,
     plant_data: IndividualPlantCreate,
-    db: Session = Depends(get_db)
+    current_user: CurrentUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Create a new individual plant."""
-    # Verify user exists
-    user = db.query(User).filter(User.id == user_id).first()
-    if not user:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="User not found"
-        )
-
     plant = IndividualPlant(
-        user_id=user_id,
+        user_id=current_user.id,
         common_name=plant_data.common_name,
         scientific_name=plant_data.scientific_name,
         location=plant_data.location,
@@ -66,15 +63,15 @@ async def create_plant(
         acquired_date=plant_data.acquired_date,
     )
     db.add(plant)
-    db.commit()
-    db.refresh(plant)
+    await db.commit()
+    await db.refresh(plant)
     return plant
 
 
 @router.get("/{plant_id}", response_model=IndividualPlantResponse)
-async def get_plant_detail(plant_id: int, db: Session = Depends(get_db)):
+async def get_plant_detail(plant_id: int, db: AsyncSession = Depends(get_async_db)):
     """Get individual plant details."""
-    plant = db.query(IndividualPlant).filter(IndividualPlant.id == plant_id).first()
+    plant = await db.get(IndividualPlant, plant_id)
 
     if not plant:
         raise HTTPException(
@@ -89,10 +86,10 @@ async def get_plant_detail(plant_id: int, db: Session = Depends(get_db)):
 async def update_plant(
     plant_id: int,
     plant_data: IndividualPlantCreate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Update individual plant."""
-    plant = db.query(IndividualPlant).filter(IndividualPlant.id == plant_id).first()
+    plant = await db.get(IndividualPlant, plant_id)
 
     if not plant:
         raise HTTPException(
@@ -105,47 +102,42 @@ async def update_plant(
     plant.location = plant_data.location
     plant.notes = plant_data.notes
 
-    db.commit()
-    db.refresh(plant)
+    await db.commit()
+    await db.refresh(plant)
     return plant
 
 
 @router.post("/{plant_id}/photo", response_model=IndividualPlantResponse)
 async def upload_plant_photo(
     plant_id: int,
-    user_id: int,
+    background_tasks: BackgroundTasks,
+    current_user: CurrentUser = Depends(get_current_user),
     file: UploadFile = File(...),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Upload or replace the hero photo for an individual plant."""
-    plant = db.query(IndividualPlant).filter(IndividualPlant.id == plant_id).first()
+    plant = await db.get(IndividualPlant, plant_id)
     if not plant:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Plant not found")
 
-    file_extension = os.path.splitext(file.filename)[1] if file.filename else ".jpg"
-    unique_filename = f"{uuid.uuid4()}{file_extension}"
-    file_path = os.path.join(PHOTOS_DIR, unique_filename)
+    unique_filename = (await save_upload(db, file, default_extension=".jpg")).filename
 
-    try:
-        contents = await file.read()
-        with open(file_path, "wb") as f:
-            f.write(contents)
-    except Exception as e:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Failed to save photo: {str(e)}"
-        )
+    previous = (plant.photo_url, plant.photo_variants)
+    if plant.photo_url != unique_filename:
+        plant.photo_url = unique_filename
+        plant.photo_variants = None
+    await db.commit()
+    await db.refresh(plant)
 
-    plant.photo_url = unique_filename
-    db.commit()
-    db.refresh(plant)
+    await release_photo(db, *previous)
+    background_tasks.add_task(generate_variants, unique_filename)
     return plant
 
 
 @router.delete("/{plant_id}", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_plant(plant_id: int, db: Session = Depends(get_db)):
+async def delete_plant(plant_id: int, db: AsyncSession = Depends(get_async_db)):
     """Delete individual plant (cascades to care events)."""
-    plant = db.query(IndividualPlant).filter(IndividualPlant.id == plant_id).first()
+    plant = await db.get(IndividualPlant, plant_id)
 
     if not plant:
         raise HTTPException(
@@ -153,8 +145,17 @@ async def delete_plant(plant_id: int, db: Session = Depends(get_db)):
             detail="Plant not found"
         )
 
-    db.delete(plant)
-    db.commit()
+    # Core deletes: the ORM cascade would lazy-load care_events, which an AsyncSession can't do
+    released = (await db.execute(
+        delete(CareEvent).where(CareEvent.plant_id == plant_id)
+        .returning(CareEvent.photo_filename, CareEvent.photo_variants)
+    )).all()
+    released.append((plant.photo_url, plant.photo_variants))
+    await db.execute(delete(IndividualPlant).where(IndividualPlant.id == plant_id))
+    await db.commit()
+
+    # Photos are shared by content - only remove the ones nothing else uses
+    await release_photos(db, released)
 
 
 # ============================================================================
@@ -163,28 +164,32 @@ async def delete_plant(plant_id: int, db: Session = Depends(get_db)):
 
 @router.get("/{plant_id}/care-events", response_model=list[CareEventResponse])
 async def get_care_events(
+    response: Response,
     plant_id: int,
     skip: int = 0,
     limit: int = 100,
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = None,
+    include_total: bool = False,
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get care events for a plant (ordered by event_date descending)."""
-    events = db.query(CareEvent).filter(
-        CareEvent.plant_id == plant_id
-    ).order_by(CareEvent.event_date.desc()).offset(skip).limit(limit).all()
-    return events
+    query = select(CareEvent).where(CareEvent.plant_id == plant_id)
+    return await paginate(
+        db, query, response, CareEvent.event_date, CareEvent.id,
+        cursor=cursor, skip=skip, limit=limit, include_total=include_total,
+    )
 
 
 @router.post("/{plant_id}/care-events", response_model=CareEventResponse, status_code=status.HTTP_201_CREATED)
 async def log_care_event(
     plant_id: int,
-    user_id: int,
     event_data: CareEventCreate,
-    db: Session = Depends(get_db)
+    current_user: CurrentUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Log a care event for a plant."""
     # Verify plant exists
-    plant = db.query(IndividualPlant).filter(IndividualPlant.id == plant_id).first()
+    plant = await db.get(IndividualPlant, plant_id)
     if not plant:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -193,15 +198,15 @@ async def log_care_event(
 
     event = CareEvent(
         plant_id=plant_id,
-        user_id=user_id,
+        user_id=current_user.id,
         care_type=event_data.care_type,
         event_date=event_data.event_date,
         notes=event_data.notes,
         milestone_label=event_data.milestone_label,
     )
     db.add(event)
-    db.commit()
-    db.refresh(event)
+    await db.commit()
+    await db.refresh(event)
     return event
 
 
@@ -209,16 +214,17 @@ async def log_care_event(
 async def upload_care_event_photo(
     plant_id: int,
     event_id: int,
-    user_id: int,
+    background_tasks: BackgroundTasks,
+    current_user: CurrentUser = Depends(get_current_user),
     file: UploadFile = File(...),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Upload photo for a care event."""
     # Verify event exists and belongs to the plant
-    event = db.query(CareEvent).filter(
+    event = await db.scalar(select(CareEvent).where(
         CareEvent.id == event_id,
         CareEvent.plant_id == plant_id
-    ).first()
+    ))
 
     if not event:
         raise HTTPException(
@@ -226,25 +232,19 @@ async def upload_care_event_photo(
             detail="Care event not found"
         )
 
-    # Save file with unique name
-    file_extension = os.path.splitext(file.filename)[1] if file.filename else ".jpg"
-    unique_filename = f"{uuid.uuid4()}{file_extension}"
-    file_path = os.path.join(PHOTOS_DIR, unique_filename)
-
-    try:
-        contents = await file.read()
-        with open(file_path, "wb") as f:
-            f.write(contents)
-    except Exception as e:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Failed to save photo: {str(e)}"
-        )
+    # Stored under its content hash - an identical photo is not written twice
+    unique_filename = (await save_upload(db, file, default_extension=".jpg")).filename
 
     # Update event with photo filename
-    event.photo_filename = unique_filename
-    db.commit()
-    db.refresh(event)
+    previous = (event.photo_filename, event.photo_variants)
+    if event.photo_filename != unique_filename:
+        event.photo_filename = unique_filename
+        event.photo_variants = None
+    await db.commit()
+    await db.refresh(event)
+
+    await release_photo(db, *previous)
+    background_tasks.add_task(generate_variants, unique_filename)
     return event
 
 
@@ -254,35 +254,111 @@ async def upload_care_event_photo(
 
 @router.get("/batch/{batch_id}/care-events", response_model=list[CareEventResponse])
 async def get_batch_care_events(
+    response: Response,
     batch_id: int,
     skip: int = 0,
     limit: int = 100,
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = None,
+    include_total: bool = False,
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get care events for a batch (ordered by event_date descending)."""
-    events = db.query(CareEvent).filter(
-        CareEvent.batch_id == batch_id
-    ).order_by(CareEvent.event_date.desc()).offset(skip).limit(limit).all()
-    return events
+    query = select(CareEvent).where(CareEvent.batch_id == batch_id)
+    return await paginate(
+        db, query, response, CareEvent.event_date, CareEvent.id,
+        cursor=cursor, skip=skip, limit=limit, include_total=include_total,
+    )
 
 
 @router.post("/batch/{batch_id}/care-events", response_model=CareEventResponse, status_code=status.HTTP_201_CREATED)
 async def log_batch_care_event(
     batch_id: int,
-    user_id: int,
     event_data: CareEventCreate,
-    db: Session = Depends(get_db)
+    current_user: CurrentUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Log a care event for a batch."""
+    # Verify batch exists
+    if not await db.get(PlantBatch, batch_id):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Batch not found"
+        )
+
     event = CareEvent(
         batch_id=batch_id,
-        user_id=user_id,
+        user_id=current_user.id,
         care_type=event_data.care_type,
         event_date=event_data.event_date,
         notes=event_data.notes,
         milestone_label=event_data.milestone_label,
     )
     db.add(event)
-    db.commit()
-    db.refresh(event)
+    await db.commit()
+    await db.refresh(event)
     return event
+
+
+# ============================================================================
+# Bulk Care Events
+# ============================================================================
+
+@router.post("/care-events/bulk", response_model=CareEventBulkResponse, status_code=status.HTTP_201_CREATED)
+async def log_care_events_bulk(
+    payload: CareEventBulkCreate,
+    current_user: CurrentUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Log the same care event (e.g. watering day) for many plants and batches.
+
+    Every id is checked in one query and all rows are written with one INSERT.
+    Like the single-plant endpoints, any household member may log care for any
+    plant or batch; ids that don't exist are returned as rejected rather than
+    failing the request.
+    """
+    plant_ids = list(dict.fromkeys(payload.plant_ids))
+    batch_ids = list(dict.fromkeys(payload.batch_ids))
+
+    if not plant_ids and not batch_ids:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Provide at least one plant_id or batch_id"
+        )
+    if len(plant_ids) + len(batch_ids) > MAX_BULK_CARE_TARGETS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Too many targets. Max per request: {MAX_BULK_CARE_TARGETS}"
+        )
+
+    found = (await db.execute(union_all(
+        select(literal("plant").label("kind"), IndividualPlant.id).where(IndividualPlant.id.in_(plant_ids)),
+        select(literal("batch").label("kind"), PlantBatch.id).where(PlantBatch.id.in_(batch_ids)),
+    ))).all()
+    found_plants = {row.id for row in found if row.kind == "plant"}
+    found_batches = {row.id for row in found if row.kind == "batch"}
+
+    shared = {
+        "user_id": current_user.id,
+        "care_type": payload.care_type,
+        "event_date": payload.event_date,
+        "notes": payload.notes,
+        "milestone_label": payload.milestone_label,
+    }
+    rows = (
+        [{**shared, "plant_id": plant_id, "batch_id": None} for plant_id in plant_ids if plant_id in found_plants]
+        + [{**shared, "plant_id": None, "batch_id": batch_id} for batch_id in batch_ids if batch_id in found_batches]
+    )
+
+    created = []
+    if rows:
+        created = (await db.scalars(
+            insert(CareEvent).returning(CareEvent, sort_by_parameter_order=True), rows
+        )).all()
+        await db.commit()
+
+    return CareEventBulkResponse(
+        created=created,
+        rejected_plant_ids=[plant_id for plant_id in plant_ids if plant_id not in found_plants],
+        rejected_batch_ids=[batch_id for batch_id in batch_ids if batch_id not in found_batches],
+    )
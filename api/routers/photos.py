@@ -1,53 +1,57 @@
 """Photo upload and management endpoints."""
 
-from typing import Optional
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File
-from sqlalchemy.orm import Session
-from pathlib import Path
-import uuid
-import shutil
-
-from database import get_db
+import mimetypes
+from datetime import timezone
+from typing import Literal, Optional
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Request, Response, status, UploadFile, File
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from auth import CurrentUser, get_current_user
+from database import get_async_db
+from executors import run_io
+from file_responses import CACHE_IMMUTABLE, CACHE_REVALIDATE, stored_file_response
+from pagination import paginate
 from models import Photo, PlantBatch, Event
 from schemas import PhotoCreate, PhotoResponse
+from storage import storage
+from uploads import save_upload, generate_variants, is_content_addressed, release_photo
 
 router = APIRouter(prefix="/photos", tags=["photos"])
 
-# Photo storage directory
-PHOTOS_DIR = Path(__file__).parent.parent / "photos"
-PHOTOS_DIR.mkdir(exist_ok=True)
-
-# Allowed file types
-ALLOWED_EXTENSIONS = {".jpg", ".jpeg", ".png", ".gif", ".webp"}
-MAX_FILE_SIZE = 10 * 1024 * 1024  # 10 MB
-
 
 @router.get("/", response_model=list[PhotoResponse])
 async def list_photos(
+    response: Response,
     batch_id: Optional[int] = None,
     event_id: Optional[int] = None,
     user_id: Optional[int] = None,
     skip: int = 0,
     limit: int = 100,
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = None,
+    include_total: bool = False,
+    db: AsyncSession = Depends(get_async_db)
 ):
     """List photos with optional filters."""
-    query = db.query(Photo)
+    query = select(Photo)
 
     if batch_id:
-        query = query.filter(Photo.batch_id == batch_id)
+        query = query.where(Photo.batch_id == batch_id)
     if event_id:
-        query = query.filter(Photo.event_id == event_id)
+        query = query.where(Photo.event_id == event_id)
     if user_id:
-        query = query.filter(Photo.user_id == user_id)
+        query = query.where(Photo.user_id == user_id)
 
-    return query.order_by(Photo.taken_at.desc()).offset(skip).limit(limit).all()
+    return await paginate(
+        db, query, response, Photo.taken_at, Photo.id,
+        cursor=cursor, skip=skip, limit=limit, include_total=include_total,
+    )
 
 
 @router.get("/{photo_id}", response_model=PhotoResponse)
-async def get_photo(photo_id: int, db: Session = Depends(get_db)):
+async def get_photo(photo_id: int, db: AsyncSession = Depends(get_async_db)):
     """Get a specific photo record."""
-    photo = db.query(Photo).filter(Photo.id == photo_id).first()
+    photo = await db.get(Photo, photo_id)
 
     if not photo:
         raise HTTPException(
@@ -58,19 +62,84 @@ async def get_photo(photo_id: int, db: Session = Depends(get_db)):
     return photo
 
 
+@router.api_route("/{photo_id}/file", methods=["GET", "HEAD"], response_class=Response)
+async def get_photo_file(
+    photo_id: int,
+    request: Request,
+    size: Optional[Literal["thumb", "medium", "full"]] = None,
+    format: Literal["webp", "jpg"] = "webp",
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Serve the image itself, for setups without the nginx /photos/ location.
+
+    - size: a resized variant (thumb / medium / full); omit for the original
+    - format: variant format, ignored for the original
+
+    Supports If-None-Match / If-Modified-Since (304) and byte ranges (206).
+    Until variants exist the original is sent, and isn't marked immutable.
+    """
+    photo = await db.get(Photo, photo_id)
+
+    if not photo:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Photo not found"
+        )
+
+    name = photo.filename
+    if size:
+        name = (photo.variants or {}).get(size, {}).get(format, photo.filename)
+    as_requested = size is None or name != photo.filename
+    created_at = photo.created_at
+    # Don't hold a pooled connection while the file is sent
+    await db.close()
+
+    stat = await run_io(storage.stat, name)
+    if stat is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Photo file not found"
+        )
+
+    # A shared file's mtime moves whenever an upload reuses it; the row's creation doesn't
+    modified = None
+    if is_content_addressed(name) and created_at is not None:
+        modified = created_at.replace(tzinfo=timezone.utc).timestamp()
+
+    if as_requested and is_content_addressed(name):
+        # The name is the content hash, so it can be the validator and cached forever
+        etag, cache_control = f'"{name.rsplit(".", 1)[0]}"', CACHE_IMMUTABLE
+    else:
+        etag, cache_control = f'"{stat.st_mtime_ns:x}-{stat.st_size:x}"', CACHE_REVALIDATE
+
+    return stored_file_response(
+        request, name, stat,
+        media_type=mimetypes.guess_type(name)[0] or "application/octet-stream",
+        etag=etag,
+        cache_control=cache_control,
+        modified=modified,
+    )
+
+
 @router.post("/upload", response_model=PhotoResponse, status_code=status.HTTP_201_CREATED)
 async def upload_photo(
     batch_id: int,
+    background_tasks: BackgroundTasks,
     file: UploadFile = File(...),
     caption: Optional[str] = None,
     event_id: Optional[int] = None,
-    taken_at: Optional[str] = None,  # ISO date string, e.g. "2026-03-01"
-    user_id: int = None,  # Injected from session
-    db: Session = Depends(get_db)
+    taken_at: Optional[str] = None,  # ISO date string, e.g. "2026-03-01"; defaults to the EXIF capture time
+    current_user: CurrentUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    """Upload a photo for a plant batch."""
+    """Upload a photo for a plant batch (resized variants are generated in the background).
+
+    The image is rotated upright and stripped of EXIF on ingest; its dimensions,
+    byte size and capture time are stored on the record.
+    """
     # Validate batch exists
-    batch = db.query(PlantBatch).filter(PlantBatch.id == batch_id).first()
+    batch = await db.get(PlantBatch, batch_id)
     if not batch:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -79,52 +148,14 @@ async def upload_photo(
 
     # Validate event if provided
     if event_id:
-        event = db.query(Event).filter(Event.id == event_id).first()
+        event = await db.get(Event, event_id)
         if not event or event.batch_id != batch_id:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Event not found or doesn't belong to this batch"
             )
 
-    # Validate file
-    if not file.filename:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="No filename provided"
-        )
-
-    # Check file extension
-    file_ext = Path(file.filename).suffix.lower()
-    if file_ext not in ALLOWED_EXTENSIONS:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"File type not allowed. Must be: {', '.join(ALLOWED_EXTENSIONS)}"
-        )
-
-    # Check file size
-    contents = await file.read()
-    if len(contents) > MAX_FILE_SIZE:
-        raise HTTPException(
-            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
-            detail=f"File too large. Max size: {MAX_FILE_SIZE / 1024 / 1024:.1f} MB"
-        )
-
-    # Generate unique filename
-    unique_id = uuid.uuid4().hex
-    new_filename = f"{unique_id}{file_ext}"
-    file_path = PHOTOS_DIR / new_filename
-
-    # Save file
-    try:
-        with open(file_path, "wb") as f:
-            f.write(contents)
-    except Exception as e:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Failed to save file: {str(e)}"
-        )
-
-    # Parse taken_at if provided, otherwise leave as None
+    # Parse taken_at if provided - checked before anything is stored
     parsed_taken_at = None
     if taken_at:
         from datetime import datetime
@@ -132,21 +163,31 @@ async def upload_photo(
             # Accept YYYY-MM-DD or full ISO string
             parsed_taken_at = datetime.fromisoformat(taken_at)
         except ValueError:
-            pass  # Invalid format — just leave taken_at as None
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid datetime format"
+            )
+
+    # Stream to disk; rejects bad types, unreadable images and oversized files
+    stored = await save_upload(db, file)
 
     # Create database record
     photo = Photo(
         batch_id=batch_id,
         event_id=event_id,
-        user_id=user_id,
-        filename=new_filename,
+        user_id=current_user.id,
+        filename=stored.filename,
         caption=caption,
-        taken_at=parsed_taken_at,
+        taken_at=parsed_taken_at or stored.taken_at,
+        width=stored.width,
+        height=stored.height,
+        byte_size=stored.byte_size,
     )
     db.add(photo)
-    db.commit()
-    db.refresh(photo)
+    await db.commit()
+    await db.refresh(photo)
 
+    background_tasks.add_task(generate_variants, stored.filename)
     return photo
 
 
@@ -155,10 +196,10 @@ async def update_photo(
     photo_id: int,
     caption: Optional[str] = None,
     taken_at: Optional[str] = None,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Update photo metadata (caption, taken_at)."""
-    photo = db.query(Photo).filter(Photo.id == photo_id).first()
+    photo = await db.get(Photo, photo_id)
 
     if not photo:
         raise HTTPException(
@@ -178,16 +219,16 @@ async def update_photo(
                 detail="Invalid datetime format"
             )
 
-    db.commit()
-    db.refresh(photo)
+    await db.commit()
+    await db.refresh(photo)
 
     return photo
 
 
 @router.delete("/{photo_id}", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_photo(photo_id: int, db: Session = Depends(get_db)):
+async def delete_photo(photo_id: int, db: AsyncSession = Depends(get_async_db)):
     """Delete a photo (removes from database and storage)."""
-    photo = db.query(Photo).filter(Photo.id == photo_id).first()
+    photo = await db.get(Photo, photo_id)
 
     if not photo:
         raise HTTPException(
@@ -195,24 +236,16 @@ async def delete_photo(photo_id: int, db: Session = Depends(get_db)):
             detail="Photo not found"
         )
 
-    # Delete file from storage
-    file_path = PHOTOS_DIR / photo.filename
-    try:
-        if file_path.exists():
-            file_path.unlink()
-    except Exception as e:
-        # Log but don't fail - database record gets deleted
-        print(f"Warning: Failed to delete file {photo.filename}: {e}")
-
-    # Delete database record
-    db.delete(photo)
-    db.commit()
+    # Delete database record, then the file if no other row shares it
+    await db.delete(photo)
+    await db.commit()
+    await release_photo(db, photo.filename, photo.variants)
 
 
 @router.get("/batch/{batch_id}/gallery", response_model=list[PhotoResponse])
-async def get_batch_gallery(batch_id: int, db: Session = Depends(get_db)):
+async def get_batch_gallery(batch_id: int, db: AsyncSession = Depends(get_async_db)):
     """Get all photos for a batch, ordered by date (for gallery/timeline view)."""
-    batch = db.query(PlantBatch).filter(PlantBatch.id == batch_id).first()
+    batch = await db.get(PlantBatch, batch_id)
 
     if not batch:
         raise HTTPException(
@@ -220,8 +253,8 @@ async def get_batch_gallery(batch_id: int, db: Session = Depends(get_db)):
             detail="Plant batch not found"
         )
 
-    photos = db.query(Photo).filter(
+    photos = await db.scalars(select(Photo).where(
         Photo.batch_id == batch_id
-    ).order_by(Photo.taken_at.desc(), Photo.created_at.desc()).all()
+    ).order_by(Photo.taken_at.desc().nulls_last(), Photo.created_at.desc()))
 
-    return photos
+    return photos.all()
@@ -1,18 +1,26 @@
 """Plant variety and batch endpoints."""
 
 from typing import Optional
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-
-from database import get_db
-from models import PlantVariety, PlantBatch, Season
+from fastapi import APIRouter, Depends, HTTPException, Response, status
+from datetime import datetime
+from sqlalchemy import select, func, delete
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload, selectinload
+
+from auth import CurrentUser, get_current_user
+from database import get_async_db
+from pagination import paginate
+from routers.distributions import summarize_distributions
+from models import PlantVariety, PlantBatch, Season, Event, Photo, Distribution, CareEvent
 from schemas import (
     PlantVarietyCreate,
     PlantVarietyResponse,
     PlantBatchCreate,
     PlantBatchUpdate,
     PlantBatchResponse,
+    PlantBatchFullResponse,
 )
+from uploads import release_photos
 
 router = APIRouter(prefix="/plants", tags=["plants"])
 
@@ -26,21 +34,22 @@ async def list_varieties(
     category: Optional[str] = None,
     skip: int = 0,
     limit: int = 100,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """List all plant varieties, optionally filtered by category."""
-    query = db.query(PlantVariety)
+    query = select(PlantVariety)
 
     if category:
-        query = query.filter(PlantVariety.category == category)
+        query = query.where(PlantVariety.category == category)
 
-    return query.offset(skip).limit(limit).all()
+    result = await db.scalars(query.offset(skip).limit(limit))
+    return result.all()
 
 
 @router.get("/varieties/{variety_id}", response_model=PlantVarietyResponse)
-async def get_variety(variety_id: int, db: Session = Depends(get_db)):
+async def get_variety(variety_id: int, db: AsyncSession = Depends(get_async_db)):
     """Get a specific plant variety."""
-    variety = db.query(PlantVariety).filter(PlantVariety.id == variety_id).first()
+    variety = await db.get(PlantVariety, variety_id)
 
     if not variety:
         raise HTTPException(
@@ -52,12 +61,12 @@ async def get_variety(variety_id: int, db: Session = Depends(get_db)):
 
 
 @router.post("/varieties", response_model=PlantVarietyResponse, status_code=status.HTTP_201_CREATED)
-async def create_variety(variety: PlantVarietyCreate, db: Session = Depends(get_db)):
+async def create_variety(variety: PlantVarietyCreate, db: AsyncSession = Depends(get_async_db)):
     """Create a new plant variety."""
     # Check if variety already exists
-    existing = db.query(PlantVariety).filter(
+    existing = await db.scalar(select(PlantVariety).where(
         PlantVariety.common_name == variety.common_name
-    ).first()
+    ))
 
     if existing:
         raise HTTPException(
@@ -67,8 +76,8 @@ async def create_variety(variety: PlantVarietyCreate, db: Session = Depends(get_
 
     db_variety = PlantVariety(**variety.model_dump())
     db.add(db_variety)
-    db.commit()
-    db.refresh(db_variety)
+    await db.commit()
+    await db.refresh(db_variety)
 
     return db_variety
 
@@ -77,10 +86,10 @@ async def create_variety(variety: PlantVarietyCreate, db: Session = Depends(get_
 async def update_variety(
     variety_id: int,
     variety_update: PlantVarietyCreate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Update a plant variety."""
-    db_variety = db.query(PlantVariety).filter(PlantVariety.id == variety_id).first()
+    db_variety = await db.get(PlantVariety, variety_id)
 
     if not db_variety:
         raise HTTPException(
@@ -91,16 +100,16 @@ async def update_variety(
     for key, value in variety_update.model_dump(exclude_unset=True).items():
         setattr(db_variety, key, value)
 
-    db.commit()
-    db.refresh(db_variety)
+    await db.commit()
+    await db.refresh(db_variety)
 
     return db_variety
 
 
 @router.delete("/varieties/{variety_id}", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_variety(variety_id: int, db: Session = Depends(get_db)):
+async def delete_variety(variety_id: int, db: AsyncSession = Depends(get_async_db)):
     """Delete a plant variety (if no batches exist)."""
-    db_variety = db.query(PlantVariety).filter(PlantVariety.id == variety_id).first()
+    db_variety = await db.get(PlantVariety, variety_id)
 
     if not db_variety:
         raise HTTPException(
@@ -109,15 +118,17 @@ async def delete_variety(variety_id: int, db: Session = Depends(get_db)):
         )
 
     # Check if any batches use this variety
-    batches = db.query(PlantBatch).filter(PlantBatch.variety_id == variety_id).count()
+    batches = await db.scalar(
+        select(func.count(PlantBatch.id)).where(PlantBatch.variety_id == variety_id)
+    )
     if batches > 0:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Cannot delete variety with existing plant batches"
         )
 
-    db.delete(db_variety)
-    db.commit()
+    await db.execute(delete(PlantVariety).where(PlantVariety.id == variety_id))
+    await db.commit()
 
 
 # ============================================================================
@@ -126,30 +137,36 @@ async def delete_variety(variety_id: int, db: Session = Depends(get_db)):
 
 @router.get("/batches", response_model=list[PlantBatchResponse])
 async def list_batches(
+    response: Response,
     season_id: Optional[int] = None,
     variety_id: Optional[int] = None,
     user_id: Optional[int] = None,
     skip: int = 0,
     limit: int = 100,
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = None,
+    include_total: bool = False,
+    db: AsyncSession = Depends(get_async_db)
 ):
-    """List plant batches with optional filters."""
-    query = db.query(PlantBatch)
+    """List plant batches with optional filters (oldest first, cursor-paginated)."""
+    query = select(PlantBatch)
 
     if season_id:
-        query = query.filter(PlantBatch.season_id == season_id)
+        query = query.where(PlantBatch.season_id == season_id)
     if variety_id:
-        query = query.filter(PlantBatch.variety_id == variety_id)
+        query = query.where(PlantBatch.variety_id == variety_id)
     if user_id:
-        query = query.filter(PlantBatch.user_id == user_id)
+        query = query.where(PlantBatch.user_id == user_id)
 
-    return query.offset(skip).limit(limit).all()
+    return await paginate(
+        db, query, response, PlantBatch.created_at, PlantBatch.id,
+        cursor=cursor, skip=skip, limit=limit, descending=False, include_total=include_total,
+    )
 
 
 @router.get("/batches/{batch_id}", response_model=PlantBatchResponse)
-async def get_batch(batch_id: int, db: Session = Depends(get_db)):
+async def get_batch(batch_id: int, db: AsyncSession = Depends(get_async_db)):
     """Get a specific plant batch with full details."""
-    batch = db.query(PlantBatch).filter(PlantBatch.id == batch_id).first()
+    batch = await db.get(PlantBatch, batch_id)
 
     if not batch:
         raise HTTPException(
@@ -160,17 +177,64 @@ async def get_batch(batch_id: int, db: Session = Depends(get_db)):
     return batch
 
 
+@router.get("/batches/{batch_id}/full", response_model=PlantBatchFullResponse)
+async def get_batch_full(batch_id: int, db: AsyncSession = Depends(get_async_db)):
+    """
+    Get a batch with variety, season, events, photos, distributions and care events.
+
+    Replaces five separate calls from the batch detail page. Loads in a fixed
+    five queries regardless of row counts: batch+variety+season joined, then
+    one selectin query per child collection.
+    """
+    batch = await db.scalar(
+        select(PlantBatch).where(PlantBatch.id == batch_id).options(
+            joinedload(PlantBatch.variety),
+            joinedload(PlantBatch.season),
+            selectinload(PlantBatch.events),
+            selectinload(PlantBatch.photos),
+            selectinload(PlantBatch.distributions),
+            selectinload(PlantBatch.care_events),
+        )
+    )
+
+    if not batch:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Plant batch not found"
+        )
+
+    full = PlantBatchFullResponse.model_validate({
+        **PlantBatchResponse.model_validate(batch).model_dump(),
+        "variety": batch.variety,
+        "season": batch.season,
+        "events": batch.events,
+        "photos": batch.photos,
+        "distributions": batch.distributions,
+        "distribution_summary": summarize_distributions(batch_id, batch.distributions),
+        "care_events": batch.care_events,
+    }, from_attributes=True)
+
+    # Same orderings as the individual timeline / gallery / care-event endpoints
+    # (the gallery sorts photos without a taken_at last)
+    full.events.sort(key=lambda e: e.event_date)
+    full.photos.sort(
+        key=lambda p: (p.taken_at is not None, p.taken_at or datetime.min, p.created_at),
+        reverse=True,
+    )
+    full.care_events.sort(key=lambda c: c.event_date, reverse=True)
+
+    return full
+
+
 @router.post("/batches", response_model=PlantBatchResponse, status_code=status.HTTP_201_CREATED)
 async def create_batch(
     batch: PlantBatchCreate,
-    user_id: int,  # Injected from frontend session
-    db: Session = Depends(get_db)
+    current_user: CurrentUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Create a new plant batch for current user."""
     # Validate variety exists
-    variety = db.query(PlantVariety).filter(
-        PlantVariety.id == batch.variety_id
-    ).first()
+    variety = await db.get(PlantVariety, batch.variety_id)
     if not variety:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -178,19 +242,17 @@ async def create_batch(
         )
 
     # Validate season exists
-    season = db.query(Season).filter(
-        Season.id == batch.season_id
-    ).first()
+    season = await db.get(Season, batch.season_id)
     if not season:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Season not found"
         )
 
-    db_batch = PlantBatch(**batch.model_dump(), user_id=user_id)
+    db_batch = PlantBatch(**batch.model_dump(), user_id=current_user.id)
     db.add(db_batch)
-    db.commit()
-    db.refresh(db_batch)
+    await db.commit()
+    await db.refresh(db_batch)
 
     return db_batch
 
@@ -199,10 +261,10 @@ async def create_batch(
 async def update_batch(
     batch_id: int,
     batch_update: PlantBatchUpdate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Update a plant batch."""
-    db_batch = db.query(PlantBatch).filter(PlantBatch.id == batch_id).first()
+    db_batch = await db.get(PlantBatch, batch_id)
 
     if not db_batch:
         raise HTTPException(
@@ -213,16 +275,16 @@ async def update_batch(
     for key, value in batch_update.model_dump(exclude_unset=True).items():
         setattr(db_batch, key, value)
 
-    db.commit()
-    db.refresh(db_batch)
+    await db.commit()
+    await db.refresh(db_batch)
 
     return db_batch
 
 
 @router.delete("/batches/{batch_id}", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_batch(batch_id: int, db: Session = Depends(get_db)):
-    """Delete a plant batch and associated events/photos."""
-    db_batch = db.query(PlantBatch).filter(PlantBatch.id == batch_id).first()
+async def delete_batch(batch_id: int, db: AsyncSession = Depends(get_async_db)):
+    """Delete a plant batch and associated events/photos/distributions/care events."""
+    db_batch = await db.get(PlantBatch, batch_id)
 
     if not db_batch:
         raise HTTPException(
@@ -231,10 +293,20 @@ async def delete_batch(batch_id: int, db: Session = Depends(get_db)):
         )
 
     # Cascade delete: events, photos, distributions
-    from models import Event, Photo, Distribution
-    db.query(Event).filter(Event.batch_id == batch_id).delete()
-    db.query(Photo).filter(Photo.batch_id == batch_id).delete()
-    db.query(Distribution).filter(Distribution.batch_id == batch_id).delete()
-
-    db.delete(db_batch)
-    db.commit()
+    # Core deletes rather than db.delete(): the ORM would lazy-load each child
+    # collection first, which isn't possible on an AsyncSession.
+    # Photos go before events since photos.event_id references events.
+    released = (await db.execute(
+        delete(Photo).where(Photo.batch_id == batch_id).returning(Photo.filename, Photo.variants)
+    )).all()
+    await db.execute(delete(Event).where(Event.batch_id == batch_id))
+    await db.execute(delete(Distribution).where(Distribution.batch_id == batch_id))
+    released += (await db.execute(
+        delete(CareEvent).where(CareEvent.batch_id == batch_id)
+        .returning(CareEvent.photo_filename, CareEvent.photo_variants)
+    )).all()
+    await db.execute(delete(PlantBatch).where(PlantBatch.id == batch_id))
+    await db.commit()
+
+    # Photo files are shared by content - only remove the ones nothing else uses
+    await release_photos(db, released)
@@ -1,25 +1,27 @@
 """Season endpoints."""
 
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy import select, func, delete
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from database import get_db
-from models import Season
+from database import get_async_db
+from models import Season, PlantBatch, SeasonCost
 from schemas import SeasonCreate, SeasonResponse
 
 router = APIRouter(prefix="/seasons", tags=["seasons"])
 
 
 @router.get("/", response_model=list[SeasonResponse])
-async def list_seasons(db: Session = Depends(get_db)):
+async def list_seasons(db: AsyncSession = Depends(get_async_db)):
     """List all seasons."""
-    return db.query(Season).order_by(Season.year.desc()).all()
+    result = await db.scalars(select(Season).order_by(Season.year.desc()))
+    return result.all()
 
 
 @router.get("/{season_id}", response_model=SeasonResponse)
-async def get_season(season_id: int, db: Session = Depends(get_db)):
+async def get_season(season_id: int, db: AsyncSession = Depends(get_async_db)):
     """Get a specific season."""
-    season = db.query(Season).filter(Season.id == season_id).first()
+    season = await db.get(Season, season_id)
 
     if not season:
         raise HTTPException(
@@ -31,9 +33,9 @@ async def get_season(season_id: int, db: Session = Depends(get_db)):
 
 
 @router.get("/year/{year}", response_model=SeasonResponse)
-async def get_season_by_year(year: int, db: Session = Depends(get_db)):
+async def get_season_by_year(year: int, db: AsyncSession = Depends(get_async_db)):
     """Get season by year."""
-    season = db.query(Season).filter(Season.year == year).first()
+    season = await db.scalar(select(Season).where(Season.year == year))
 
     if not season:
         raise HTTPException(
@@ -45,10 +47,10 @@ async def get_season_by_year(year: int, db: Session = Depends(get_db)):
 
 
 @router.post("/", response_model=SeasonResponse, status_code=status.HTTP_201_CREATED)
-async def create_season(season: SeasonCreate, db: Session = Depends(get_db)):
+async def create_season(season: SeasonCreate, db: AsyncSession = Depends(get_async_db)):
     """Create a new season."""
     # Check if season already exists
-    existing = db.query(Season).filter(Season.year == season.year).first()
+    existing = await db.scalar(select(Season).where(Season.year == season.year))
 
     if existing:
         raise HTTPException(
@@ -58,8 +60,8 @@ async def create_season(season: SeasonCreate, db: Session = Depends(get_db)):
 
     db_season = Season(**season.model_dump())
     db.add(db_season)
-    db.commit()
-    db.refresh(db_season)
+    await db.commit()
+    await db.refresh(db_season)
 
     return db_season
 
@@ -68,10 +70,10 @@ async def create_season(season: SeasonCreate, db: Session = Depends(get_db)):
 async def update_season(
     season_id: int,
     season_update: SeasonCreate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Update a season."""
-    db_season = db.query(Season).filter(Season.id == season_id).first()
+    db_season = await db.get(Season, season_id)
 
     if not db_season:
         raise HTTPException(
@@ -82,16 +84,16 @@ async def update_season(
     for key, value in season_update.model_dump(exclude_unset=True).items():
         setattr(db_season, key, value)
 
-    db.commit()
-    db.refresh(db_season)
+    await db.commit()
+    await db.refresh(db_season)
 
     return db_season
 
 
 @router.delete("/{season_id}", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_season(season_id: int, db: Session = Depends(get_db)):
+async def delete_season(season_id: int, db: AsyncSession = Depends(get_async_db)):
     """Delete a season (if empty)."""
-    season = db.query(Season).filter(Season.id == season_id).first()
+    season = await db.get(Season, season_id)
 
     if not season:
         raise HTTPException(
@@ -100,9 +102,12 @@ async def delete_season(season_id: int, db: Session = Depends(get_db)):
         )
 
     # Check if season has any batches or costs
-    from models import PlantBatch, SeasonCost
-    batch_count = db.query(PlantBatch).filter(PlantBatch.season_id == season_id).count()
-    cost_count = db.query(SeasonCost).filter(SeasonCost.season_id == season_id).count()
+    batch_count = await db.scalar(
+        select(func.count(PlantBatch.id)).where(PlantBatch.season_id == season_id)
+    )
+    cost_count = await db.scalar(
+        select(func.count(SeasonCost.id)).where(SeasonCost.season_id == season_id)
+    )
 
     if batch_count > 0 or cost_count > 0:
         raise HTTPException(
@@ -110,5 +115,5 @@ async def delete_season(season_id: int, db: Session = Depends(get_db)):
             detail="Cannot delete season with existing batches or costs"
         )
 
-    db.delete(season)
-    db.commit()
+    await db.execute(delete(Season).where(Season.id == season_id))
+    await db.commit()
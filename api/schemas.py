@@ -12,6 +12,7 @@ from pydantic import BaseModel
 class PINLogin(BaseModel):
     """PIN login request."""
     pin: str  # 4-digit PIN
+    user_id: Optional[int] = None  # optional: verify against this user only
 
 
 class UserSelect(BaseModel):
@@ -25,6 +26,8 @@ class AuthResponse(BaseModel):
     name: str
     display_color: str
     created_at: datetime
+    access_token: str  # send as "Authorization: Bearer <token>"
+    token_type: str = "bearer"
 
 
 class UserStatsResponse(BaseModel):
@@ -165,6 +168,23 @@ class EventResponse(EventCreate):
         from_attributes = True
 
 
+class BulkItemError(BaseModel):
+    """A bulk request item that was rejected (the rest are still written)."""
+    index: int  # position in the request list
+    detail: str
+
+
+class EventBulkCreate(BaseModel):
+    """Log many events at once (e.g. "germinated" across a seed tray)."""
+    events: list[EventCreate]
+
+
+class EventBulkResponse(BaseModel):
+    """Bulk event result."""
+    created: list[EventResponse]  # in request order
+    errors: list[BulkItemError]
+
+
 # ============================================================================
 # Photos
 # ============================================================================
@@ -177,11 +197,19 @@ class PhotoCreate(BaseModel):
     taken_at: Optional[datetime] = None
 
 
+# size (thumb/medium/full) -> extension (webp/jpg) -> stored filename; None until generated
+PhotoVariants = dict[str, dict[str, str]]
+
+
 class PhotoResponse(PhotoCreate):
     """Photo response."""
     id: int
     user_id: int
     filename: str
+    width: Optional[int] = None
+    height: Optional[int] = None
+    byte_size: Optional[int] = None
+    variants: Optional[PhotoVariants] = None
     created_at: datetime
 
     class Config:
@@ -237,6 +265,31 @@ class SeasonCostResponse(SeasonCostCreate):
         from_attributes = True
 
 
+# ============================================================================
+# Batch detail (single round trip)
+# ============================================================================
+
+class DistributionSummary(BaseModel):
+    """Gift/trade totals for a batch."""
+    batch_id: int
+    total_distributed: int
+    total_quantity: int
+    gifts: int
+    trades: int
+    recipients: list[str]
+
+
+class PlantBatchFullResponse(PlantBatchResponse):
+    """Plant batch with everything the batch detail page shows."""
+    variety: PlantVarietyResponse
+    season: SeasonResponse
+    events: list[EventResponse]  # chronological (timeline order)
+    photos: list[PhotoResponse]  # newest first (gallery order)
+    distributions: list[DistributionResponse]
+    distribution_summary: DistributionSummary
+    care_events: list["CareEventResponse"]  # newest first
+
+
 # ============================================================================
 # Dashboard / Stats
 # ============================================================================
@@ -284,6 +337,7 @@ class IndividualPlantResponse(BaseModel):
     notes: Optional[str] = None
     acquired_date: Optional[date] = None
     photo_url: Optional[str] = None
+    photo_variants: Optional[PhotoVariants] = None
     created_at: datetime
 
     class Config:
@@ -305,7 +359,55 @@ class CareEventResponse(CareEventCreate):
     plant_id: Optional[int] = None
     user_id: int
     photo_filename: Optional[str] = None
+    photo_variants: Optional[PhotoVariants] = None
     created_at: datetime
 
     class Config:
         from_attributes = True
+
+
+class CareEventBulkCreate(BaseModel):
+    """Log one care event (e.g. watering) for many plants and/or batches."""
+    plant_ids: list[int] = []
+    batch_ids: list[int] = []
+    care_type: str  # WATERING, FERTILIZING, MILESTONE, NOTE
+    event_date: datetime
+    notes: Optional[str] = None
+    milestone_label: Optional[str] = None
+
+
+class CareEventBulkResponse(BaseModel):
+    """Bulk care event result."""
+    created: list[CareEventResponse]
+    rejected_plant_ids: list[int]  # not found
+    rejected_batch_ids: list[int]
+
+
+# ============================================================================
+# Imports
+# ============================================================================
+
+class ImportCounts(BaseModel):
+    """Rows written by an import, per table."""
+    inserted: int
+    updated: int
+    skipped: int  # unchanged or duplicate rows
+
+
+class ImportRowError(BaseModel):
+    """A spreadsheet row left out of an import."""
+    row: int  # as numbered in the spreadsheet (the header is row 1)
+    error: str
+
+
+class ImportResponse(BaseModel):
+    """Spreadsheet import result."""
+    rows_read: int
+    rows_staged: int  # rows that mapped to a record (blank/total rows are dropped)
+    errors: list[ImportRowError] = []  # rows with values that don't fit their columns
+    varieties: Optional[ImportCounts] = None
+    batches: Optional[ImportCounts] = None
+    costs: Optional[ImportCounts] = None
+
+
+PlantBatchFullResponse.model_rebuild()
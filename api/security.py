@@ -0,0 +1,42 @@
+"""PIN hashing helpers.
+
+Kept free of FastAPI/database imports so the verify helpers can run in the CPU process pool.
+"""
+
+import hashlib
+import hmac
+import os
+
+from passlib.context import CryptContext
+
+# Password context for hashing (argon2 only for hashing, but supports bcrypt verification)
+# Using only argon2 for hashing to avoid bcrypt compatibility issues
+pwd_context = CryptContext(schemes=["argon2"], deprecated="auto")
+
+# Server-side key for the PIN lookup index. There are only 10,000 PINs, so anyone with
+# the key and a copy of the database can reverse every pin_lookup - it has no default.
+# After changing it, clear users.pin_lookup and run backfill_pin_lookup.py
+PIN_LOOKUP_KEY = os.getenv("PIN_LOOKUP_KEY")
+if not PIN_LOOKUP_KEY:
+    raise RuntimeError("PIN_LOOKUP_KEY is not set - generate one with: openssl rand -hex 32")
+
+
+def pin_lookup(pin: str) -> str:
+    """Keyed HMAC of a PIN, stored in users.pin_lookup to find the one hash worth verifying."""
+    return hmac.new(PIN_LOOKUP_KEY.encode(), pin.encode(), hashlib.sha256).hexdigest()
+
+
+def verify_pin(pin: str, pin_hash: str) -> bool:
+    """Check a PIN against its hash; malformed or unknown hashes simply don't match."""
+    try:
+        return pwd_context.verify(pin, pin_hash)
+    except Exception:
+        return False
+
+
+def verify_and_update_pin(pin: str, pin_hash: str) -> tuple[bool, str | None]:
+    """Verify a PIN and, if the hash uses outdated parameters, return a replacement hash."""
+    try:
+        return pwd_context.verify_and_update(pin, pin_hash)
+    except Exception:
+        return False, None
@@ -1,233 +1,208 @@
-"""Seed initial data from CSV files into database."""
+"""Seed initial data from CSV files into database.
 
-import csv
+Existing variety/batch/cost keys are prefetched into dicts up front and new rows
+are written with executemany, all in one transaction:
+
+    python seed_data.py            # seed
+    python seed_data.py --dry-run  # report what would be written, then roll back
+"""
+
+import argparse
 import sys
-from datetime import datetime
+import time
 from pathlib import Path
 from passlib.context import CryptContext
 
+from sqlalchemy import select, insert
 from sqlalchemy.orm import Session
 from database import SessionLocal, engine, Base
-from models import User, Season, PlantVariety, PlantBatch, SeasonCost, EventType
+from models import User, Season, PlantVariety, PlantBatch, SeasonCost
+from security import pin_lookup
+from importer import iter_csv_rows, map_plant_row, map_cost_row
 
 # Password hashing context (argon2 only, with bcrypt support for verification)
 pwd_context = CryptContext(schemes=["argon2"], deprecated="auto")
 
+DATA_DIR = Path(__file__).parent.parent
+
 
 def hash_pin(pin: str) -> str:
     """Hash a 4-digit PIN using argon2."""
     return pwd_context.hash(pin)
 
 
+def report(label: str, rows: int, started: float):
+    """Print a row count with throughput for one seed step."""
+    elapsed = time.perf_counter() - started
+    rate = rows / elapsed if elapsed > 0 else 0
+    print(f"  ⏱ {label}: {rows} rows in {elapsed * 1000:.1f} ms ({rate:,.0f} rows/s)")
+
+
 def create_users(db: Session):
     """Create default users (Jamison and Amy)."""
-    users = [
-        User(
-            name="Jamison",
-            display_color="#648655",
-            pin_hash=hash_pin("1234")  # Default PIN - change in production!
-        ),
-        User(
-            name="Amy",
-            display_color="#a8bf8f",
-            pin_hash=hash_pin("1234")  # Same PIN - shared access
-        )
-    ]
+    existing = set(db.scalars(select(User.name)))
 
-    for user in users:
-        existing = db.query(User).filter(User.name == user.name).first()
-        if not existing:
-            db.add(user)
-            print(f"✓ Created user: {user.name}")
-        else:
-            print(f"• User already exists: {user.name}")
+    # Only hash PINs for users that will actually be created - argon2 is slow on purpose
+    for name, color in (("Jamison", "#648655"), ("Amy", "#a8bf8f")):
+        if name in existing:
+            print(f"• User already exists: {name}")
+            continue
+        db.add(User(
+            name=name,
+            display_color=color,
+            pin_hash=hash_pin("1234"),  # Default PIN (shared access) - change in production!
+            pin_lookup=pin_lookup("1234")
+        ))
+        print(f"✓ Created user: {name}")
 
-    db.commit()
+    db.flush()
 
 
 def create_seasons(db: Session):
     """Create season entries for 2025 and 2026."""
-    seasons = [
-        Season(year=2025, notes="Learning year"),
-        Season(year=2026, notes="Second growing season")
-    ]
-
-    for season in seasons:
-        existing = db.query(Season).filter(Season.year == season.year).first()
-        if not existing:
-            db.add(season)
-            print(f"✓ Created season: {season.year}")
-        else:
-            print(f"• Season already exists: {season.year}")
-
-    db.commit()
-
-
-def parse_date(date_str: str) -> datetime | None:
-    """Parse various date formats from CSV."""
-    if not date_str or date_str.strip() == "":
-        return None
-
-    date_str = date_str.strip()
-    formats = [
-        "%m/%d/%Y",
-        "%m/%d/%y",
-        "%Y-%m-%d",
-        "%m/%d",  # Will assume current year
-    ]
+    existing = set(db.scalars(select(Season.year)))
 
-    for fmt in formats:
-        try:
-            return datetime.strptime(date_str, fmt)
-        except ValueError:
+    for year, notes in ((2025, "Learning year"), (2026, "Second growing season")):
+        if year in existing:
+            print(f"• Season already exists: {year}")
             continue
+        db.add(Season(year=year, notes=notes))
+        print(f"✓ Created season: {year}")
 
-    # Try extracting first date from range like "2/26 - 3/18"
-    if " - " in date_str:
-        try:
-            return datetime.strptime(date_str.split(" - ")[0].strip(), "%m/%d")
-        except ValueError:
-            pass
-
-    return None
-
-
-def parse_int_range(value: str) -> int | None:
-    """Parse integer or range like '14-21' and return first value."""
-    if not value or value.strip() == "":
-        return None
-
-    value = value.strip()
-    try:
-        return int(value.split("-")[0])
-    except (ValueError, IndexError):
-        return None
+    db.flush()
 
 
 def seed_plant_varieties_2025(db: Session):
     """Import plant varieties from 2025 CSV."""
-    csv_path = Path(__file__).parent.parent / "Progress-sheet3-2025 Seed Starting Information.csv"
+    csv_path = DATA_DIR / "Progress-sheet3-2025 Seed Starting Information.csv"
 
     if not csv_path.exists():
         print(f"⚠ CSV not found: {csv_path}")
         return
 
-    season_2025 = db.query(Season).filter(Season.year == 2025).first()
-    jamison = db.query(User).filter(User.name == "Jamison").first()
+    season_2025 = db.scalar(select(Season).where(Season.year == 2025))
+    jamison = db.scalar(select(User).where(User.name == "Jamison"))
 
     if not season_2025 or not jamison:
         print("✗ Season or User not found")
         return
 
-    with open(csv_path, encoding='utf-8-sig') as f:
-        reader = csv.DictReader(f)
-        row_num = 0
-
-        for row in reader:
-            row_num += 1
-            plant_name = row.get("Plant Name", "").strip()
-
-            if not plant_name:
-                continue
+    started = time.perf_counter()
+
+    # Prefetch existing keys once instead of querying per row
+    variety_ids = dict(db.execute(select(PlantVariety.common_name, PlantVariety.id)).all())
+    batched_variety_ids = set(db.scalars(
+        select(PlantBatch.variety_id).where(PlantBatch.season_id == season_2025.id)
+    ))
+
+    rows_read = 0
+    plants = {}  # common_name -> first mapped row
+    with open(csv_path, "rb") as f:
+        for row in iter_csv_rows(f):
+            rows_read += 1
+            mapped = map_plant_row(row)
+            if mapped and mapped["common_name"] not in plants:
+                plants[mapped["common_name"]] = mapped
+
+    new_varieties = [
+        {
+            "common_name": name,
+            "category": "vegetable",  # Default - adjust as needed
+            "flowering_season": plant["flowering_season"],
+            "days_to_germinate": plant["days_to_germinate"],
+            "notes": plant["variety_notes"],
+        }
+        for name, plant in plants.items() if name not in variety_ids
+    ]
+    if new_varieties:
+        variety_ids.update(db.execute(
+            insert(PlantVariety).returning(PlantVariety.common_name, PlantVariety.id),
+            new_varieties
+        ).all())
+
+    new_batches = [
+        {
+            "user_id": jamison.id,
+            "variety_id": variety_ids[name],
+            "season_id": season_2025.id,
+            "seeds_count": plant["seeds_count"],
+            "packets": plant["packets"],
+            "start_date": plant["start_date"],
+            "transplant_date": plant["transplant_date"],
+            "repeat_next_year": plant["repeat_next_year"],
+            "outcome_notes": plant["outcome_notes"],
+        }
+        for name, plant in plants.items() if variety_ids[name] not in batched_variety_ids
+    ]
+    if new_batches:
+        db.execute(insert(PlantBatch), new_batches)
 
-            # Check if variety exists
-            existing_variety = db.query(PlantVariety).filter(
-                PlantVariety.common_name == plant_name
-            ).first()
-
-            if not existing_variety:
-                variety = PlantVariety(
-                    common_name=plant_name,
-                    category="vegetable",  # Default - adjust as needed
-                    flowering_season=row.get("Flowering Season", "").strip() or None,
-                    days_to_germinate=parse_int_range(row.get("Days to Germinate", "")),
-                    notes=row.get("Notes", "").strip() or None
-                )
-                db.add(variety)
-                db.flush()
-                existing_variety = variety
-
-            # Create plant batch for 2025
-            batch_exists = db.query(PlantBatch).filter(
-                PlantBatch.variety_id == existing_variety.id,
-                PlantBatch.season_id == season_2025.id
-            ).first()
-
-            if not batch_exists:
-                batch = PlantBatch(
-                    user_id=jamison.id,
-                    variety_id=existing_variety.id,
-                    season_id=season_2025.id,
-                    seeds_count=parse_int_range(row.get("Seeds", "")),
-                    packets=parse_int_range(row.get("Packets", "")),
-                    start_date=parse_date(row.get("Date Planted", "")),
-                    transplant_date=parse_date(row.get("Transplant Outside", "")),
-                    repeat_next_year=row.get("Repeat?", "").strip().lower() or None,
-                    outcome_notes=row.get("Outcome", "").strip() or None
-                )
-                db.add(batch)
-
-    db.commit()
-    print(f"✓ Imported {row_num} plant varieties from 2025")
+    print(f"✓ Imported {len(new_varieties)} plant varieties and {len(new_batches)} batches from 2025"
+          f" ({len(plants) - len(new_batches)} already present)")
+    report("2025 varieties", rows_read, started)
 
 
 def seed_season_costs_2026(db: Session):
     """Import season costs from 2026 CSV."""
-    csv_path = Path(__file__).parent.parent / "Progress-sheet2-2026 Season Costs.csv"
+    csv_path = DATA_DIR / "Progress-sheet2-2026 Season Costs.csv"
 
     if not csv_path.exists():
         print(f"⚠ CSV not found: {csv_path}")
         return
 
-    season_2026 = db.query(Season).filter(Season.year == 2026).first()
-    jamison = db.query(User).filter(User.name == "Jamison").first()
+    season_2026 = db.scalar(select(Season).where(Season.year == 2026))
+    jamison = db.scalar(select(User).where(User.name == "Jamison"))
 
     if not season_2026 or not jamison:
         print("✗ Season or User not found")
         return
 
-    with open(csv_path, encoding='utf-8-sig') as f:
-        reader = csv.DictReader(f)
-        cost_count = 0
-
-        for row in reader:
-            item_name = row.get("Material", "").strip()
-            cost_str = row.get("Cost", "").strip()
-            quantity_str = row.get("Quantity", "").strip()
-
-            if not item_name or not cost_str or cost_str == "$0.00":
-                continue
+    started = time.perf_counter()
 
-            try:
-                cost_value = float(cost_str.replace("$", "").replace(",", ""))
-                quantity = int(quantity_str) if quantity_str and quantity_str.isdigit() else 1
-
-                cost_entry = SeasonCost(
-                    user_id=jamison.id,
-                    season_id=season_2026.id,
-                    item_name=item_name,
-                    cost=cost_value,
-                    quantity=quantity,
-                    category="material",
-                    is_one_time=True
-                )
-                db.add(cost_entry)
-                cost_count += 1
-            except ValueError:
+    # Re-running the seed must not duplicate costs: skip items already recorded
+    existing_items = set(db.scalars(
+        select(SeasonCost.item_name).where(
+            SeasonCost.season_id == season_2026.id,
+            SeasonCost.category == "material"
+        )
+    ))
+
+    rows_read = 0
+    new_costs = []
+    with open(csv_path, "rb") as f:
+        for row in iter_csv_rows(f):
+            rows_read += 1
+            cost = map_cost_row(row)
+            if not cost or cost["item_name"] in existing_items:
                 continue
+            existing_items.add(cost["item_name"])
+            new_costs.append({
+                **cost,
+                "user_id": jamison.id,
+                "season_id": season_2026.id,
+                "category": "material",
+                "is_one_time": True,
+            })
 
-        db.commit()
-        if cost_count > 0:
-            print(f"✓ Imported {cost_count} season costs from 2026")
+    if new_costs:
+        db.execute(insert(SeasonCost), new_costs)
+        print(f"✓ Imported {len(new_costs)} season costs from 2026")
+    report("2026 costs", rows_read, started)
 
 
 def main():
-    """Run all seed operations."""
-    print("\n🌱 Seeding PlantLady database...\n")
+    """Run all seed operations in a single transaction."""
+    parser = argparse.ArgumentParser(description="Seed the PlantLady database from the CSV exports.")
+    parser.add_argument("--dry-run", action="store_true", help="run every step, then roll back")
+    args = parser.parse_args()
 
-    # Create tables
-    print("Creating database tables...")
-    Base.metadata.create_all(bind=engine)
+    print("\n🌱 Seeding PlantLady database..." + (" (dry run)" if args.dry_run else "") + "\n")
+    started = time.perf_counter()
+
+    if not args.dry_run:
+        # Create tables
+        print("Creating database tables...")
+        Base.metadata.create_all(bind=engine)
 
     db = SessionLocal()
 
@@ -244,7 +219,12 @@ def main():
         print("\n💰 Importing season costs (2026)...")
         seed_season_costs_2026(db)
 
-        print("\n✅ Database seeding complete!\n")
+        if args.dry_run:
+            db.rollback()
+            print(f"\n↩ Dry run - rolled back ({time.perf_counter() - started:.2f}s)\n")
+        else:
+            db.commit()
+            print(f"\n✅ Database seeding complete! ({time.perf_counter() - started:.2f}s)\n")
 
     except Exception as e:
         print(f"\n✗ Error: {e}\n")
@@ -0,0 +1,230 @@
+"""Photo file storage.
+
+Every upload, variant, backup and delete path goes through the module-level
+`storage` object, chosen by PHOTO_STORAGE:
+
+- local:  files under PHOTOS_DIR, sharded by name prefix - abcd1234....jpg lives
+          at ab/cd/abcd1234....jpg - so no directory grows past a few hundred
+          entries. Files from the old flat layout are still found (and served by
+          nginx) until migrate_photos.py has moved them.
+- object: a local stand-in for an object store (S3-style bucket) rooted at
+          PHOTO_OBJECT_DIR. Keys use the same sharding; objects are only ever
+          written whole (copy in, no rename from the caller's temp file) and read
+          back through a local copy, like a real remote store.
+
+Methods are blocking - call them through run_io() from async code. This module
+only imports the stdlib: cpu pool workers (imaging.make_variants) use it too.
+"""
+
+import os
+import re
+import shutil
+import tempfile
+from contextlib import contextmanager
+from pathlib import Path
+from typing import BinaryIO, Iterator, Optional
+
+PHOTO_STORAGE = os.getenv("PHOTO_STORAGE", "local")
+PHOTOS_DIR = Path(os.getenv("PHOTOS_DIR", Path(__file__).resolve().parent / "photos"))
+PHOTO_OBJECT_DIR = Path(os.getenv("PHOTO_OBJECT_DIR", PHOTOS_DIR.parent / "photo-objects"))
+
+# Staging area for uploads and generated variants; kept inside the photo root so
+# the final move is a same-filesystem rename
+INCOMING_DIR_NAME = ".incoming"
+
+_SHARDABLE = re.compile(r"[0-9a-f]{4}")
+
+
+def shard(name: str) -> str:
+    """Directory prefix for a stored name ("" for names that don't start with 4 hex chars)."""
+    if _SHARDABLE.match(name):
+        return f"{name[0:2]}/{name[2:4]}"
+    return ""
+
+
+def _walk(root: Path, after: Optional[str] = None) -> Iterator[str]:
+    """Keys ("ab/cd/name", or "name" at the root) in a stable sorted order, skipping hidden entries.
+
+    Directories are walked depth-first in sorted order, so resuming with after=<last
+    key> skips whole directories that come before it. Memory use is bounded by the
+    largest single directory.
+    """
+    resume = tuple(after.rsplit("/", 1)) if after and "/" in after else ("", after) if after else None
+    for dirpath, dirnames, filenames in os.walk(root):
+        relative = Path(dirpath).relative_to(root).as_posix()
+        relative = "" if relative == "." else relative
+        dirnames[:] = sorted(
+            d for d in dirnames
+            if not d.startswith(".") and (
+                resume is None
+                or f"{relative}/{d}".lstrip("/") >= resume[0]
+                or resume[0].startswith(f"{relative}/{d}/".lstrip("/"))
+            )
+        )
+        for filename in sorted(filenames):
+            if filename.startswith(".") or (resume and (relative, filename) <= resume):
+                continue
+            yield f"{relative}/{filename}" if relative else filename
+
+
+class LocalStorage:
+    """Sharded directory tree on the local filesystem."""
+
+    def __init__(self, root: Path):
+        self.root = root
+        self.temp_dir = root / INCOMING_DIR_NAME
+        self.temp_dir.mkdir(parents=True, exist_ok=True)
+
+    def path(self, name: str) -> Path:
+        return self.root / shard(name) / name
+
+    def legacy_path(self, name: str) -> Path:
+        return self.root / name
+
+    def _find(self, name: str) -> Optional[Path]:
+        for path in (self.path(name), self.legacy_path(name)):
+            if path.is_file():
+                return path
+        return None
+
+    def exists(self, name: str) -> bool:
+        return self._find(name) is not None
+
+    def stat(self, name: str) -> Optional[os.stat_result]:
+        path = self._find(name)
+        return path.stat() if path else None
+
+    def touch(self, name: str) -> bool:
+        """Bump the modified time; False if the file isn't stored."""
+        path = self._find(name)
+        if path is None:
+            return False
+        os.utime(path)
+        return True
+
+    def put_file(self, source: Path, name: str) -> None:
+        """Move a finished file (from temp_dir) into place atomically."""
+        target = self.path(name)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        os.replace(source, target)
+
+    def open(self, name: str) -> BinaryIO:
+        path = self._find(name)
+        if path is None:
+            raise FileNotFoundError(name)
+        return open(path, "rb")
+
+    @contextmanager
+    def local_path(self, name: str) -> Iterator[Path]:
+        path = self._find(name)
+        if path is None:
+            raise FileNotFoundError(name)
+        yield path
+
+    def delete(self, name: str) -> None:
+        self.path(name).unlink(missing_ok=True)
+        self.legacy_path(name).unlink(missing_ok=True)
+
+    def names(self) -> Iterator[str]:
+        return (key.rsplit("/", 1)[-1] for key in _walk(self.root))
+
+    def keys(self, after: Optional[str] = None) -> Iterator[str]:
+        """Storage keys in sorted order (resumable - see _walk); the name is the last path part."""
+        return _walk(self.root, after)
+
+    def legacy_names(self) -> Iterator[str]:
+        """Files still in the flat pre-sharding layout that now belong in a shard."""
+        for entry in os.scandir(self.root):
+            if entry.is_file() and not entry.name.startswith(".") and shard(entry.name):
+                yield entry.name
+
+    def shard_in_place(self, name: str) -> None:
+        """Move one flat file into its shard without a moment where it can't be read.
+
+        The file is hard-linked into the shard before the flat name is removed,
+        so nginx and the API (which look in the shard first) always find it.
+        """
+        source = self.legacy_path(name)
+        target = self.path(name)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        if not target.exists():
+            try:
+                os.link(source, target)
+            except OSError:
+                # No hard links on this filesystem - copy beside the target, then rename
+                partial = self.temp_dir / f".{name}.part"
+                shutil.copy2(source, partial)
+                os.replace(partial, target)
+        source.unlink()
+
+
+class LocalObjectStorage:
+    """Object-store stand-in: whole-object puts and gets under a bucket directory."""
+
+    def __init__(self, root: Path, temp_dir: Path):
+        self.root = root
+        self.temp_dir = temp_dir
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.temp_dir.mkdir(parents=True, exist_ok=True)
+
+    def _object(self, name: str) -> Path:
+        return self.root / shard(name) / name
+
+    def exists(self, name: str) -> bool:
+        return self._object(name).is_file()
+
+    def stat(self, name: str) -> Optional[os.stat_result]:
+        path = self._object(name)
+        return path.stat() if path.is_file() else None
+
+    def touch(self, name: str) -> bool:
+        # A real store would copy the object onto itself to refresh Last-Modified
+        path = self._object(name)
+        if not path.is_file():
+            return False
+        os.utime(path)
+        return True
+
+    def put_file(self, source: Path, name: str) -> None:
+        """Upload a local file as one object, then drop the local copy."""
+        target = self._object(name)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        partial = target.with_name(f".{name}.part")
+        shutil.copyfile(source, partial)
+        os.replace(partial, target)
+        source.unlink()
+
+    def open(self, name: str) -> BinaryIO:
+        return open(self._object(name), "rb")
+
+    @contextmanager
+    def local_path(self, name: str) -> Iterator[Path]:
+        """Download the object to a temp file for code that needs a real path."""
+        fd, temp = tempfile.mkstemp(dir=self.temp_dir, prefix=".get-", suffix=Path(name).suffix)
+        try:
+            with os.fdopen(fd, "wb") as dst, self.open(name) as src:
+                shutil.copyfileobj(src, dst)
+            yield Path(temp)
+        finally:
+            Path(temp).unlink(missing_ok=True)
+
+    def delete(self, name: str) -> None:
+        self._object(name).unlink(missing_ok=True)
+
+    def names(self) -> Iterator[str]:
+        return (key.rsplit("/", 1)[-1] for key in _walk(self.root))
+
+    def keys(self, after: Optional[str] = None) -> Iterator[str]:
+        """Storage keys in sorted order (resumable - see _walk); the name is the last path part."""
+        return _walk(self.root, after)
+
+
+def create_storage(kind: str = PHOTO_STORAGE):
+    if kind == "local":
+        return LocalStorage(PHOTOS_DIR)
+    if kind == "object":
+        return LocalObjectStorage(PHOTO_OBJECT_DIR, PHOTOS_DIR / INCOMING_DIR_NAME)
+    raise ValueError(f"Unknown PHOTO_STORAGE: {kind}")
+
+
+storage = create_storage()
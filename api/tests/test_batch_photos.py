@@ -0,0 +1,42 @@
+"""A batch's photos come back in one order from the gallery and from /full."""
+
+from datetime import datetime
+
+import pytest
+from sqlalchemy import text
+
+
+@pytest.fixture
+def photos(engine, users, batch):
+    """(taken_at, created_at) pairs covering ties on taken_at and photos without one."""
+    rows = [
+        (datetime(2026, 5, 1), datetime(2026, 5, 1, 9)),
+        (None, datetime(2026, 5, 3)),
+        (datetime(2026, 5, 2), datetime(2026, 5, 2)),
+        (datetime(2026, 5, 1), datetime(2026, 5, 1, 18)),
+        (None, datetime(2026, 5, 4)),
+    ]
+    with engine.begin() as conn:
+        conn.execute(
+            text("""
+                INSERT INTO photos (batch_id, user_id, filename, taken_at, created_at)
+                VALUES (:batch_id, :user_id, :filename, :taken_at, :created_at)
+            """),
+            [
+                {"batch_id": batch, "user_id": users["jamison"], "filename": f"{n}.jpg",
+                 "taken_at": taken_at, "created_at": created_at}
+                for n, (taken_at, created_at) in enumerate(rows)
+            ],
+        )
+    # Newest capture first, ties by upload time, photos without a capture time last
+    return ["2.jpg", "3.jpg", "0.jpg", "4.jpg", "1.jpg"]
+
+
+@pytest.mark.parametrize("path", ["/photos/batch/{batch}/gallery", "/plants/batches/{batch}/full"])
+def test_photos_without_taken_at_sort_last(client, batch, photos, path):
+    response = client.get(path.format(batch=batch))
+
+    assert response.status_code == 200, response.text
+    body = response.json()
+    rows = body["photos"] if isinstance(body, dict) else body
+    assert [row["filename"] for row in rows] == photos
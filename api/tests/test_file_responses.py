@@ -0,0 +1,202 @@
+"""GET/HEAD /photos/{id}/file: validators, 304s and byte ranges."""
+
+import io
+from email.utils import formatdate, parsedate_to_datetime
+
+import pytest
+from PIL import Image
+from sqlalchemy import text
+
+from file_responses import CACHE_IMMUTABLE, CACHE_REVALIDATE
+
+
+def _jpeg(size=(320, 240)) -> bytes:
+    out = io.BytesIO()
+    Image.effect_noise(size, 64).convert("RGB").save(out, "JPEG")
+    return out.getvalue()
+
+
+@pytest.fixture
+def jpeg():
+    return _jpeg()
+
+
+@pytest.fixture
+def photo(client, auth_headers, batch, jpeg):
+    """An uploaded photo: (id, stored bytes, stored filename)."""
+    from storage import storage
+
+    response = client.post(
+        "/photos/upload", params={"batch_id": batch},
+        files={"file": ("photo.jpg", jpeg)}, headers=auth_headers(),
+    )
+    assert response.status_code == 201, response.text
+    filename = response.json()["filename"]
+    with storage.open(filename) as f:
+        return response.json()["id"], f.read(), filename
+
+
+def _get(client, photo_id: int, method: str = "GET", **headers):
+    return client.request(method, f"/photos/{photo_id}/file", headers=headers)
+
+
+def test_whole_file_with_validators(client, photo):
+    photo_id, content, filename = photo
+
+    response = _get(client, photo_id)
+
+    assert response.status_code == 200
+    assert response.content == content
+    assert response.headers["content-type"] == "image/jpeg"
+    assert response.headers["content-length"] == str(len(content))
+    assert response.headers["etag"] == f'"{filename.split(".")[0]}"'
+    assert response.headers["cache-control"] == CACHE_IMMUTABLE
+    assert response.headers["accept-ranges"] == "bytes"
+
+
+@pytest.mark.parametrize("if_none_match", ["{etag}", "W/{etag}", '"other", {etag}', "*"])
+def test_matching_etag_is_not_modified(client, photo, if_none_match):
+    etag = _get(client, photo[0]).headers["etag"]
+
+    response = _get(client, photo[0], **{"If-None-Match": if_none_match.format(etag=etag)})
+
+    assert response.status_code == 304
+    assert response.content == b""
+    assert response.headers["etag"] == etag
+
+
+def test_other_etag_sends_the_file(client, photo):
+    response = _get(client, photo[0], **{"If-None-Match": '"other"'})
+
+    assert response.status_code == 200
+    assert response.content == photo[1]
+
+
+def test_if_modified_since(client, photo):
+    last_modified = _get(client, photo[0]).headers["last-modified"]
+    earlier = formatdate(parsedate_to_datetime(last_modified).timestamp() - 60, usegmt=True)
+
+    assert _get(client, photo[0], **{"If-Modified-Since": last_modified}).status_code == 304
+    assert _get(client, photo[0], **{"If-Modified-Since": earlier}).status_code == 200
+    assert _get(client, photo[0], **{"If-Modified-Since": "not a date"}).status_code == 200
+
+
+def test_if_none_match_wins_over_if_modified_since(client, photo):
+    last_modified = _get(client, photo[0]).headers["last-modified"]
+
+    response = _get(client, photo[0], **{"If-None-Match": '"other"', "If-Modified-Since": last_modified})
+
+    assert response.status_code == 200
+
+
+def test_last_modified_survives_reuse_of_the_file(client, auth_headers, batch, photo, jpeg):
+    from storage import storage
+
+    before = _get(client, photo[0]).headers["last-modified"]
+    mtime = storage.stat(photo[2]).st_mtime
+
+    client.post(
+        "/photos/upload", params={"batch_id": batch},
+        files={"file": ("again.jpg", jpeg)}, headers=auth_headers(),
+    )
+
+    assert storage.stat(photo[2]).st_mtime >= mtime
+    assert _get(client, photo[0]).headers["last-modified"] == before
+
+
+@pytest.mark.parametrize("header, start, end", [
+    ("bytes=0-9", 0, 9),
+    ("bytes=100-", 100, None),
+    ("bytes=-10", -10, None),
+    ("bytes=5-999999999", 5, None),
+])
+def test_single_range(client, photo, header, start, end):
+    content = photo[1]
+    expected = content[start:end + 1 if end is not None else None]
+    first = start % len(content)
+
+    response = _get(client, photo[0], Range=header)
+
+    assert response.status_code == 206
+    assert response.content == expected
+    assert response.headers["content-length"] == str(len(expected))
+    assert response.headers["content-range"] == f"bytes {first}-{first + len(expected) - 1}/{len(content)}"
+
+
+@pytest.mark.parametrize("header", ["bytes={size}-", "bytes={size}-{size}", "bytes=-0"])
+def test_unsatisfiable_range(client, photo, header):
+    size = len(photo[1])
+
+    response = _get(client, photo[0], Range=header.format(size=size))
+
+    assert response.status_code == 416
+    assert response.headers["content-range"] == f"bytes */{size}"
+
+
+@pytest.mark.parametrize("header", ["bytes=0-9,20-29", "bytes=9-0", "items=0-9", "bytes=-"])
+def test_unusable_range_sends_the_whole_file(client, photo, header):
+    response = _get(client, photo[0], Range=header)
+
+    assert response.status_code == 200
+    assert response.content == photo[1]
+
+
+def test_if_range(client, photo):
+    headers = _get(client, photo[0]).headers
+
+    for validator in (headers["etag"], headers["last-modified"]):
+        assert _get(client, photo[0], Range="bytes=0-9", **{"If-Range": validator}).status_code == 206
+    stale = _get(client, photo[0], Range="bytes=0-9", **{"If-Range": '"stale"'})
+    assert stale.status_code == 200
+    assert stale.content == photo[1]
+
+
+def test_head(client, photo):
+    response = _get(client, photo[0], "HEAD")
+
+    assert response.status_code == 200
+    assert response.content == b""
+    assert response.headers["content-length"] == str(len(photo[1]))
+    assert _get(client, photo[0], "HEAD", Range="bytes=0-9").status_code == 206
+
+
+def test_variant_is_immutable(client, photo):
+    response = client.get(f"/photos/{photo[0]}/file", params={"size": "thumb", "format": "jpg"})
+
+    assert response.status_code == 200
+    assert response.content != photo[1]
+    assert response.headers["cache-control"] == CACHE_IMMUTABLE
+    assert response.headers["etag"] != _get(client, photo[0]).headers["etag"]
+
+
+def test_missing_variant_falls_back_to_the_original_without_caching_it(client, engine, photo):
+    with engine.begin() as conn:
+        conn.execute(text("UPDATE photos SET variants = NULL WHERE id = :id"), {"id": photo[0]})
+
+    response = client.get(f"/photos/{photo[0]}/file", params={"size": "thumb"})
+
+    assert response.content == photo[1]
+    assert response.headers["cache-control"] == CACHE_REVALIDATE
+
+
+def test_legacy_name_revalidates(client, engine, users, batch, jpeg):
+    from storage import storage
+
+    staged = storage.temp_dir / "legacy.part"
+    staged.write_bytes(jpeg)
+    storage.put_file(staged, "legacy-upload.jpg")
+    with engine.begin() as conn:
+        photo_id = conn.execute(text("""
+            INSERT INTO photos (batch_id, user_id, filename, created_at)
+            VALUES (:batch_id, :user_id, 'legacy-upload.jpg', now()) RETURNING id
+        """), {"batch_id": batch, "user_id": users["jamison"]}).scalar()
+
+    response = _get(client, photo_id)
+
+    assert response.content == jpeg
+    assert response.headers["cache-control"] == CACHE_REVALIDATE
+    assert _get(client, photo_id, **{"If-None-Match": response.headers["etag"]}).status_code == 304
+
+
+def test_missing_photo(client, users):
+    assert _get(client, 999).status_code == 404
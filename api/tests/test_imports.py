@@ -0,0 +1,249 @@
+"""Spreadsheet imports: column mapping, idempotent re-imports and rejected rows."""
+
+import csv
+import io
+
+import pytest
+from openpyxl import Workbook
+from sqlalchemy import text
+
+PLANT_HEADER = [
+    "Plant Name", "Flowering Season", "Days to Germinate", "Notes", "Seeds", "Packets",
+    "Date Planted", "Transplant Outside", "Repeat?", "Outcome",
+]
+PLANT_ROWS = [
+    ["Basil", "Summer", "5-10", "Pinch often", "24", "1", "3/15/2026", "5/1/2026", "Yes", ""],
+    ["Zinnia", "", "7", "", "12 - 18", "", "2/26 - 3/18", "", "maybe, if there's room", "Mildew"],
+    ["", "", "", "", "", "", "", "", "", ""],
+    ["Basil", "", "", "", "99", "", "", "", "", ""],
+]
+COST_HEADER = ["Material", "Cost", "Quantity"]
+COST_ROWS = [
+    ["Seed trays", "$12.50", "4"],
+    ["Potting mix", "$1,024.00", ""],
+    ["Labels", "$0.00", "10"],
+    ["Total", "", ""],
+]
+
+
+def _csv(header: list, rows: list) -> bytes:
+    out = io.StringIO()
+    writer = csv.writer(out)
+    writer.writerow(header)
+    writer.writerows(rows)
+    return out.getvalue().encode()
+
+
+def _xlsx(header: list, rows: list) -> bytes:
+    workbook = Workbook()
+    workbook.active.title = "Seeds"
+    workbook.active.append(header)
+    for row in rows:
+        workbook.active.append(row)
+    out = io.BytesIO()
+    workbook.save(out)
+    return out.getvalue()
+
+
+@pytest.fixture
+def season(engine, users):
+    with engine.begin() as conn:
+        return conn.execute(text("INSERT INTO seasons (year) VALUES (2026) RETURNING id")).scalar()
+
+
+@pytest.fixture
+def upload(client, auth_headers, season):
+    def upload(kind: str, content: bytes, filename: str = "sheet.csv", **params):
+        return client.post(
+            f"/imports/{kind}",
+            params={"season_id": season, **params},
+            files={"file": (filename, content)},
+            headers=auth_headers(),
+        )
+
+    return upload
+
+
+def _batches(engine) -> dict:
+    with engine.connect() as conn:
+        rows = conn.execute(text("""
+            SELECT v.common_name, v.flowering_season, v.days_to_germinate, v.notes,
+                   b.seeds_count, b.packets, b.start_date::date, b.transplant_date::date,
+                   b.repeat_next_year, b.outcome_notes, b.user_id
+            FROM plant_batches b JOIN plant_varieties v ON v.id = b.variety_id
+        """)).mappings().all()
+    return {row["common_name"]: dict(row) for row in rows}
+
+
+def test_plant_columns_are_mapped(engine, users, upload):
+    response = upload("plants", _csv(PLANT_HEADER, PLANT_ROWS))
+
+    assert response.status_code == 200, response.text
+    assert response.json() == {
+        "rows_read": 4,
+        "rows_staged": 3,
+        "errors": [],
+        "varieties": {"inserted": 2, "updated": 0, "skipped": 0},
+        "batches": {"inserted": 2, "updated": 0, "skipped": 1},
+        "costs": None,
+    }
+    batches = _batches(engine)
+    basil, zinnia = batches["Basil"], batches["Zinnia"]
+    # The first row for a name wins
+    assert (basil["seeds_count"], basil["packets"], basil["days_to_germinate"]) == (24, 1, 5)
+    assert (str(basil["start_date"]), str(basil["transplant_date"])) == ("2026-03-15", "2026-05-01")
+    assert (basil["flowering_season"], basil["notes"], basil["repeat_next_year"]) == ("Summer", "Pinch often", "yes")
+    assert basil["user_id"] == users["jamison"]
+    # Ranges keep their start; free text after yes/no/maybe moves to the outcome
+    assert (zinnia["seeds_count"], zinnia["days_to_germinate"], str(zinnia["start_date"])) == (12, 7, "1900-02-26")
+    assert zinnia["repeat_next_year"] == "maybe"
+    assert zinnia["outcome_notes"] == "Mildew\nRepeat? maybe, if there's room"
+
+
+def test_xlsx_maps_like_csv(engine, upload):
+    response = upload("plants", _xlsx(PLANT_HEADER, PLANT_ROWS), filename="sheet.xlsx", sheet="Seeds")
+
+    assert response.status_code == 200, response.text
+    assert response.json()["batches"]["inserted"] == 2
+    assert _batches(engine)["Basil"]["seeds_count"] == 24
+
+
+def test_missing_sheet_is_rejected(upload):
+    response = upload("plants", _xlsx(PLANT_HEADER, PLANT_ROWS), filename="sheet.xlsx", sheet="Costs")
+
+    assert response.status_code == 400
+    assert "Sheet not found" in response.json()["detail"]
+
+
+def test_plant_reimport_changes_nothing(engine, upload):
+    upload("plants", _csv(PLANT_HEADER, PLANT_ROWS))
+    before = _batches(engine)
+
+    response = upload("plants", _csv(PLANT_HEADER, PLANT_ROWS))
+
+    assert response.json()["varieties"] == {"inserted": 0, "updated": 0, "skipped": 2}
+    assert response.json()["batches"] == {"inserted": 0, "updated": 0, "skipped": 3}
+    assert _batches(engine) == before
+
+
+def test_plant_reimport_updates_and_fills_gaps(engine, upload):
+    upload("plants", _csv(PLANT_HEADER, PLANT_ROWS))
+
+    response = upload("plants", _csv(PLANT_HEADER, [
+        ["Zinnia", "Late summer", "", "Cut and come again", "30", "", "", "", "", ""],
+        ["Cosmos", "", "", "", "", "", "", "", "", ""],
+    ]))
+
+    assert response.json()["varieties"] == {"inserted": 1, "updated": 1, "skipped": 0}
+    assert response.json()["batches"] == {"inserted": 1, "updated": 1, "skipped": 0}
+    zinnia = _batches(engine)["Zinnia"]
+    # Sheet values replace batch fields; variety fields are only filled in where empty
+    assert zinnia["seeds_count"] == 30
+    assert zinnia["outcome_notes"] == "Mildew\nRepeat? maybe, if there's room"
+    assert (zinnia["flowering_season"], zinnia["notes"]) == ("Late summer", "Cut and come again")
+
+
+def test_existing_variety_keeps_its_values(engine, upload):
+    upload("plants", _csv(PLANT_HEADER, PLANT_ROWS))
+
+    upload("plants", _csv(PLANT_HEADER, [["Basil", "Winter", "", "Other notes", "", "", "", "", "", ""]]))
+
+    basil = _batches(engine)["Basil"]
+    assert (basil["flowering_season"], basil["notes"]) == ("Summer", "Pinch often")
+
+
+def test_out_of_range_rows_are_reported_and_skipped(engine, upload):
+    response = upload("plants", _csv(PLANT_HEADER, [
+        ["Basil", "", "", "", "24", "", "", "", "", ""],
+        ["Zinnia", "", "", "", "99999999999", "", "", "", "", ""],
+    ]))
+
+    assert response.status_code == 200, response.text
+    assert response.json()["rows_staged"] == 1
+    assert response.json()["errors"] == [{"row": 3, "error": "seeds_count out of range: 99999999999"}]
+    assert set(_batches(engine)) == {"Basil"}
+
+
+def _costs(engine) -> dict:
+    with engine.connect() as conn:
+        rows = conn.execute(text("SELECT item_name, cost, quantity, category FROM season_costs")).all()
+    return {row.item_name: (float(row.cost), row.quantity, row.category) for row in rows}
+
+
+def test_cost_columns_are_mapped(engine, upload):
+    response = upload("costs", _csv(COST_HEADER, COST_ROWS))
+
+    assert response.status_code == 200, response.text
+    assert response.json()["rows_read"] == 4
+    assert response.json()["costs"] == {"inserted": 2, "updated": 0, "skipped": 0}
+    assert _costs(engine) == {"Seed trays": (12.5, 4, "material"), "Potting mix": (1024.0, 1, "material")}
+
+
+def test_cost_reimport_updates_by_item_name(engine, upload):
+    upload("costs", _csv(COST_HEADER, COST_ROWS))
+
+    response = upload("costs", _csv(COST_HEADER, [["Seed trays", "$15.00", "4"], ["Potting mix", "$1,024.00", ""]]))
+
+    assert response.json()["costs"] == {"inserted": 0, "updated": 1, "skipped": 1}
+    assert _costs(engine)["Seed trays"] == (15.0, 4, "material")
+
+
+def test_repeated_cost_item_is_summed(engine, upload):
+    rows = [["Seed trays", "$12.50", "4"], ["Labels", "$3.00", ""], ["Seed trays", "$7.25", "2"]]
+
+    response = upload("costs", _csv(COST_HEADER, rows))
+
+    assert response.json()["rows_staged"] == 3
+    assert response.json()["costs"] == {"inserted": 2, "updated": 0, "skipped": 0}
+    assert _costs(engine) == {"Seed trays": (19.75, 6, "material"), "Labels": (3.0, 1, "material")}
+
+    # Re-importing the same sheet leaves the sums alone
+    response = upload("costs", _csv(COST_HEADER, rows))
+
+    assert response.json()["costs"] == {"inserted": 0, "updated": 0, "skipped": 2}
+    assert _costs(engine)["Seed trays"] == (19.75, 6, "material")
+
+
+def test_cost_too_large_is_reported(engine, upload):
+    response = upload("costs", _csv(COST_HEADER, [["Greenhouse", "$100,000,000.00", "1"]]))
+
+    assert response.json()["errors"] == [{"row": 2, "error": "cost out of range: 100000000.0"}]
+    assert _costs(engine) == {}
+
+
+def test_disallowed_file_type_is_rejected(upload):
+    response = upload("plants", b"Plant Name\nBasil\n", filename="sheet.txt")
+
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Could not read spreadsheet: File type not allowed. Must be: .csv, .xlsx"
+
+
+def test_corrupt_xlsx_is_rejected(upload):
+    assert upload("plants", b"not a zip file", filename="sheet.xlsx").status_code == 400
+
+
+def test_unknown_season_is_rejected(client, auth_headers):
+    response = client.post(
+        "/imports/plants", params={"season_id": 999},
+        files={"file": ("sheet.csv", _csv(PLANT_HEADER, PLANT_ROWS))}, headers=auth_headers(),
+    )
+
+    assert response.status_code == 404
+
+
+def test_import_needs_a_user(client, season):
+    response = client.post(
+        "/imports/plants", params={"season_id": season},
+        files={"file": ("sheet.csv", _csv(PLANT_HEADER, PLANT_ROWS))},
+    )
+
+    assert response.status_code == 401
+
+
+def test_oversized_import_is_rejected(engine, upload):
+    from routers.imports import MAX_IMPORT_SIZE
+
+    response = upload("plants", b"x" * (MAX_IMPORT_SIZE + 1024 * 1024))
+
+    assert response.status_code == 413
+    assert _batches(engine) == {}
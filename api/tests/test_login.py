@@ -0,0 +1,112 @@
+"""PIN login: one argon2 verify per attempt, 409 whenever the PIN alone can't name the user."""
+
+import pytest
+from sqlalchemy import text
+
+from auth import _decode_token
+from conftest import PIN
+
+
+def _login(client, pin: str, user_id: int = None):
+    body = {"pin": pin} if user_id is None else {"pin": pin, "user_id": user_id}
+    return client.post("/auth/login", json=body)
+
+
+def _pin_lookup_of(engine, user_id: int):
+    with engine.connect() as conn:
+        return conn.execute(text("SELECT pin_lookup FROM users WHERE id = :id"), {"id": user_id}).scalar()
+
+
+def _set_user(engine, user_id: int, **columns):
+    assignments = ", ".join(f"{column} = :{column}" for column in columns)
+    with engine.begin() as conn:
+        conn.execute(text(f"UPDATE users SET {assignments} WHERE id = :id"), {"id": user_id, **columns})
+
+
+@pytest.fixture(scope="session")
+def other_pin_hash():
+    from security import pwd_context
+
+    return pwd_context.hash("9876")
+
+
+def test_shared_pin_needs_the_user(client, users):
+    response = _login(client, PIN)
+
+    assert response.status_code == 409
+
+
+@pytest.mark.parametrize("name", ["jamison", "amy"])
+def test_shared_pin_with_the_user_logs_in(client, users, name):
+    response = _login(client, PIN, users[name])
+
+    assert response.status_code == 200, response.text
+    body = response.json()
+    assert body["id"] == users[name]
+    assert body["name"] == name.capitalize()
+    assert _decode_token(body["access_token"]) == users[name]
+
+
+def test_unique_pin_finds_its_user(client, engine, users, other_pin_hash):
+    from security import pin_lookup
+
+    _set_user(engine, users["amy"], pin_hash=other_pin_hash, pin_lookup=pin_lookup("9876"))
+
+    assert _login(client, "9876").json()["id"] == users["amy"]
+    assert _login(client, PIN).json()["id"] == users["jamison"]
+
+
+def test_wrong_pin_is_rejected(client, users):
+    assert _login(client, "0000").status_code == 401
+    assert _login(client, "0000", users["amy"]).status_code == 401
+
+
+def test_unknown_user_is_rejected(client, users):
+    assert _login(client, PIN, 99).status_code == 401
+
+
+@pytest.mark.parametrize("pin", ["", "123", "12345", "12a4", "    "])
+def test_malformed_pin_is_rejected(client, users, pin):
+    assert _login(client, pin).status_code == 400
+
+
+def test_unindexed_user_blocks_pin_only_login(client, engine, users, other_pin_hash):
+    from security import pin_lookup
+
+    # Jamison's PIN is unique among the indexed users, but Amy could share it
+    _set_user(engine, users["jamison"], pin_hash=other_pin_hash, pin_lookup=pin_lookup("9876"))
+    _set_user(engine, users["amy"], pin_lookup=None)
+
+    assert _login(client, "9876").status_code == 409
+    assert _login(client, PIN).status_code == 409
+
+
+def test_login_with_user_indexes_an_unindexed_user(client, engine, users, other_pin_hash):
+    from security import pin_lookup
+
+    _set_user(engine, users["jamison"], pin_hash=other_pin_hash, pin_lookup=pin_lookup("9876"))
+    _set_user(engine, users["amy"], pin_lookup=None)
+
+    assert _login(client, PIN, users["amy"]).status_code == 200
+    assert _pin_lookup_of(engine, users["amy"]) == pin_lookup(PIN)
+
+    # Everyone is indexed again, so the PIN alone is enough
+    assert _login(client, PIN).json()["id"] == users["amy"]
+
+
+def test_failed_login_does_not_index(client, engine, users):
+    _set_user(engine, users["amy"], pin_lookup=None)
+
+    assert _login(client, "0000", users["amy"]).status_code == 401
+    assert _pin_lookup_of(engine, users["amy"]) is None
+
+
+def test_plaintext_pin_row_logs_in_and_is_indexed(client, engine, users, other_pin_hash):
+    from security import pin_lookup
+
+    # A pre-migration row: plaintext pin, no index entry
+    _set_user(engine, users["jamison"], pin_hash=other_pin_hash, pin_lookup=pin_lookup("9876"))
+    _set_user(engine, users["amy"], pin="5555", pin_lookup=None)
+
+    assert _login(client, "5555").json()["id"] == users["amy"]
+    assert _pin_lookup_of(engine, users["amy"]) == pin_lookup("5555")
@@ -0,0 +1,109 @@
+"""Keyset pagination: following X-Next-Cursor visits every row exactly once."""
+
+from datetime import datetime
+
+import pytest
+from sqlalchemy import text
+
+from pagination import NEXT_CURSOR_HEADER
+
+NOON = datetime(2026, 5, 1, 12, 0)
+
+
+def _walk(client, path: str, limit: int) -> list[int]:
+    """Ids of every page of path, following the cursor until it runs out."""
+    ids = []
+    response = client.get(path, params={"limit": limit})
+    while True:
+        assert response.status_code == 200, response.text
+        ids.extend(row["id"] for row in response.json())
+        cursor = response.headers.get(NEXT_CURSOR_HEADER)
+        if cursor is None:
+            return ids
+        response = client.get(path, params={"limit": limit, "cursor": cursor})
+
+
+@pytest.fixture
+def photos(engine, users, batch):
+    """Photos of one batch: three sharing a taken_at, two without one, two others."""
+    taken = [NOON, None, NOON, datetime(2026, 5, 2), None, NOON, datetime(2026, 4, 30)]
+    with engine.begin() as conn:
+        conn.execute(
+            text("""
+                INSERT INTO photos (batch_id, user_id, filename, taken_at, created_at)
+                VALUES (:batch_id, :user_id, :filename, :taken_at, now())
+            """),
+            [
+                {"batch_id": batch, "user_id": users["jamison"], "filename": f"{n}.jpg", "taken_at": taken_at}
+                for n, taken_at in enumerate(taken)
+            ],
+        )
+
+
+def _photo_ids_in_page_order(engine, batch) -> list[int]:
+    with engine.connect() as conn:
+        return conn.execute(text(
+            "SELECT id FROM photos WHERE batch_id = :batch_id ORDER BY taken_at DESC NULLS FIRST, id DESC"
+        ), {"batch_id": batch}).scalars().all()
+
+
+@pytest.mark.parametrize("limit", [1, 2, 3, 7, 50])
+def test_cursor_walk_covers_ties_and_nulls(client, engine, batch, photos, limit):
+    expected = _photo_ids_in_page_order(engine, batch)
+    assert len(expected) == 7
+
+    assert _walk(client, f"/photos/?batch_id={batch}", limit) == expected
+
+
+def test_newest_first_with_nulls_first_and_ties_by_id(client, batch, photos):
+    rows = client.get(f"/photos/?batch_id={batch}").json()
+
+    assert [row["taken_at"] for row in rows[:2]] == [None, None]
+    tied = [row["id"] for row in rows if row["taken_at"] == NOON.isoformat()]
+    assert tied == sorted(tied, reverse=True)
+
+
+def test_cursor_walk_on_non_nullable_sort_column(client, engine, users, batch):
+    with engine.begin() as conn:
+        conn.execute(
+            text("""
+                INSERT INTO events (batch_id, user_id, event_type, event_date, created_at)
+                VALUES (:batch_id, :user_id, 'OBSERVATION', :event_date, now())
+            """),
+            [
+                {"batch_id": batch, "user_id": users["jamison"], "event_date": NOON if n % 2 else datetime(2026, 5, n + 1)}
+                for n in range(9)
+            ],
+        )
+        expected = conn.execute(text(
+            "SELECT id FROM events WHERE batch_id = :batch_id ORDER BY event_date DESC, id DESC"
+        ), {"batch_id": batch}).scalars().all()
+
+    assert _walk(client, f"/events/?batch_id={batch}", 2) == expected
+
+
+def test_last_page_has_no_cursor(client, batch, photos):
+    response = client.get(f"/photos/?batch_id={batch}", params={"limit": 7})
+
+    assert len(response.json()) == 7
+    assert NEXT_CURSOR_HEADER not in response.headers
+
+
+def test_limit_zero_returns_nothing(client, batch, photos):
+    response = client.get(f"/photos/?batch_id={batch}", params={"limit": 0})
+
+    assert response.status_code == 200
+    assert response.json() == []
+
+
+def test_negative_limit_is_rejected(client, batch, photos):
+    response = client.get(f"/photos/?batch_id={batch}", params={"limit": -1})
+
+    assert response.status_code == 400
+
+
+def test_malformed_cursor_is_rejected(client, batch, photos):
+    response = client.get(f"/photos/?batch_id={batch}", params={"cursor": "not-a-cursor"})
+
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Invalid cursor"
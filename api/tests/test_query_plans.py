@@ -0,0 +1,134 @@
+"""The filtered list endpoints are served by the composite indexes from migration 005.
+
+Each case calls the real endpoint, captures the SELECT it ran on the async
+engine and EXPLAINs that exact statement against a seeded, ANALYZEd database -
+with sequential scans allowed, so an index shows up only if the planner
+actually prefers it. Add a case whenever a router gains a filtered query.
+"""
+
+import json
+import re
+
+import pytest
+from sqlalchemy import event, text
+
+from conftest import truncate_all
+
+USERS = 30
+SEASONS = 12
+BATCHES = 240
+EVENTS_PER_BATCH = 20
+PHOTOS_PER_BATCH = 10
+DISTRIBUTIONS_PER_BATCH = 5
+COSTS_PER_SEASON = 150
+PLANTS = 100
+CARE_EVENTS_PER_TARGET = 20
+
+SEED = [
+    f"""INSERT INTO users (name, pin_hash, display_color)
+        SELECT 'user ' || n, 'not-a-hash', '#648655' FROM generate_series(1, {USERS}) n""",
+    f"INSERT INTO seasons (year) SELECT 2000 + n FROM generate_series(1, {SEASONS}) n",
+    f"""INSERT INTO plant_varieties (common_name, category)
+        SELECT 'variety ' || n, 'vegetable' FROM generate_series(1, {BATCHES}) n""",
+    f"""INSERT INTO plant_batches (user_id, variety_id, season_id, start_date)
+        SELECT 1 + n % {USERS}, n, 1 + n % {SEASONS}, now() - n * interval '1 day'
+        FROM generate_series(1, {BATCHES}) n""",
+    f"""INSERT INTO events (batch_id, user_id, event_type, event_date)
+        SELECT b.id, 1 + (b.id + n) % {USERS}, 'OBSERVATION', now() - (n % 7) * interval '1 day'
+        FROM plant_batches b, generate_series(1, {EVENTS_PER_BATCH}) n""",
+    f"""INSERT INTO photos (batch_id, event_id, user_id, filename, taken_at)
+        SELECT b.id, (SELECT min(e.id) FROM events e WHERE e.batch_id = b.id) + n,
+               1 + (b.id + n) % {USERS}, md5(b.id || '-' || n) || '.jpg',
+               CASE WHEN n % 4 = 0 THEN NULL ELSE now() - (n % 3) * interval '1 day' END
+        FROM plant_batches b, generate_series(1, {PHOTOS_PER_BATCH}) n""",
+    f"""INSERT INTO distributions (batch_id, user_id, recipient, type, date)
+        SELECT b.id, 1 + (b.id + n) % {USERS}, 'neighbour', 'gift', now()
+        FROM plant_batches b, generate_series(1, {DISTRIBUTIONS_PER_BATCH}) n""",
+    f"""INSERT INTO season_costs (user_id, season_id, item_name, cost, category, created_at)
+        SELECT 1 + (s.id + n) % {USERS}, s.id, 'item ' || n, 1.50,
+               (ARRAY['seed', 'material', 'tool'])[1 + n % 3], now() - n * interval '1 hour'
+        FROM seasons s, generate_series(1, {COSTS_PER_SEASON}) n""",
+    f"""INSERT INTO individual_plants (user_id, common_name, created_at)
+        SELECT 1 + n % {USERS}, 'plant ' || n, now() FROM generate_series(1, {PLANTS}) n""",
+    f"""INSERT INTO care_events (plant_id, user_id, care_type, event_date, created_at)
+        SELECT p.id, p.user_id, 'WATERING', now() - n * interval '1 day', now()
+        FROM individual_plants p, generate_series(1, {CARE_EVENTS_PER_TARGET}) n""",
+    f"""INSERT INTO care_events (batch_id, user_id, care_type, event_date, created_at)
+        SELECT b.id, b.user_id, 'WATERING', now() - n * interval '1 day', now()
+        FROM plant_batches b, generate_series(1, {CARE_EVENTS_PER_TARGET}) n""",
+]
+
+# (endpoint, table the captured SELECT reads, index its plan must use)
+CASES = [
+    ("/events/?batch_id=7", "events", "ix_events_batch_id_event_date"),
+    ("/events/?user_id=7", "events", "ix_events_user_id_event_date"),
+    ("/events/batch/7/timeline", "events", "ix_events_batch_id_event_date"),
+    ("/photos/?batch_id=7", "photos", "ix_photos_batch_id_taken_at"),
+    ("/photos/?event_id=7", "photos", "ix_photos_event_id_taken_at"),
+    ("/photos/?user_id=7", "photos", "ix_photos_user_id_taken_at"),
+    ("/photos/batch/7/gallery", "photos", "ix_photos_batch_id_taken_at"),
+    ("/distributions/?batch_id=7", "distributions", "ix_distributions_batch_id"),
+    ("/distributions/?user_id=7", "distributions", "ix_distributions_user_id"),
+    ("/costs/?season_id=7&category=seed", "season_costs", "ix_season_costs_season_id_category"),
+    ("/costs/?user_id=7", "season_costs", "ix_season_costs_user_id"),
+    ("/individual-plants/7/care-events", "care_events", "ix_care_events_plant_id_event_date"),
+    ("/individual-plants/batch/7/care-events", "care_events", "ix_care_events_batch_id_event_date"),
+]
+
+
+@pytest.fixture(scope="module")
+def seeded(engine):
+    truncate_all(engine)
+    with engine.begin() as conn:
+        for statement in SEED:
+            conn.execute(text(statement))
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        conn.execute(text("ANALYZE"))
+    yield
+    truncate_all(engine)
+
+
+@pytest.fixture
+def captured():
+    """(statement, parameters) of every query the async engine runs during the test."""
+    from database import async_engine
+
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        statements.append((statement, parameters))
+
+    event.listen(async_engine.sync_engine, "before_cursor_execute", capture)
+    yield statements
+    event.remove(async_engine.sync_engine, "before_cursor_execute", capture)
+
+
+def _explain(engine, statement: str, parameters) -> dict:
+    """EXPLAIN an asyncpg statement ($1 placeholders) on the sync psycopg2 engine."""
+    sql = re.sub(r"\$(\d+)", r"%(p\1)s", statement.replace("%", "%%"))
+    params = {f"p{i}": value for i, value in enumerate(parameters, start=1)}
+    with engine.connect() as conn:
+        plan = conn.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {sql}", params).scalar()
+    return plan[0]["Plan"]
+
+
+def _index_names(plan: dict) -> set[str]:
+    names = {plan["Index Name"]} if "Index Name" in plan else set()
+    for child in plan.get("Plans", []):
+        names |= _index_names(child)
+    return names
+
+
+@pytest.mark.parametrize("path, table, index", CASES)
+def test_list_query_uses_composite_index(engine, client, seeded, captured, path, table, index):
+    response = client.get(path)
+    assert response.status_code == 200, response.text
+    assert response.json(), "the seed data should match this filter"
+
+    selects = [
+        (statement, parameters) for statement, parameters in captured
+        if statement.lstrip().startswith("SELECT") and f"FROM {table}" in statement
+    ]
+    assert selects, f"no SELECT on {table} captured for {path}"
+    plan = _explain(engine, *selects[-1])
+    assert index in _index_names(plan), json.dumps(plan, indent=2)
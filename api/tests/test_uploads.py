@@ -0,0 +1,138 @@
+"""Photo uploads: size limits, content-addressed dedup and temp file cleanup."""
+
+import hashlib
+import io
+
+import pytest
+from PIL import Image
+from sqlalchemy import text
+
+
+def _jpeg(color=(90, 140, 60), size=(64, 48)) -> bytes:
+    out = io.BytesIO()
+    Image.new("RGB", size, color).save(out, "JPEG")
+    return out.getvalue()
+
+
+def _staged_files() -> list:
+    from storage import storage
+
+    return list(storage.temp_dir.iterdir())
+
+
+@pytest.fixture
+def upload(client, auth_headers, batch):
+    def upload(content, filename: str = "photo.jpg", **kwargs):
+        return client.post(
+            "/photos/upload",
+            params={"batch_id": batch},
+            files={"file": (filename, content)},
+            headers=auth_headers(),
+            **kwargs,
+        )
+
+    return upload
+
+
+def test_upload_is_stored_under_its_hash(upload):
+    from storage import storage
+
+    content = _jpeg()
+
+    response = upload(content)
+
+    assert response.status_code == 201, response.text
+    photo = response.json()
+    assert photo["filename"] == f"{hashlib.sha256(content).hexdigest()}.jpg"
+    assert (photo["width"], photo["height"]) == (64, 48)
+    assert storage.exists(photo["filename"])
+    assert _staged_files() == []
+
+
+def test_same_image_twice_is_one_file(engine, upload):
+    from storage import storage
+
+    content = _jpeg()
+
+    first = upload(content).json()
+    second = upload(content, filename="copy.JPEG").json()
+
+    assert first["id"] != second["id"]
+    assert first["filename"] == second["filename"]
+    assert [path.name for path in storage.path(first["filename"]).parent.iterdir()].count(first["filename"]) == 1
+    with engine.connect() as conn:
+        assert conn.execute(text("SELECT count(DISTINCT filename) FROM photos")).scalar() == 1
+    assert _staged_files() == []
+
+
+def test_different_images_are_different_files(upload):
+    first = upload(_jpeg()).json()
+    second = upload(_jpeg(color=(200, 40, 40))).json()
+
+    assert first["filename"] != second["filename"]
+
+
+def test_disallowed_extension_is_rejected(upload):
+    response = upload(_jpeg(), filename="photo.bmp")
+
+    assert response.status_code == 400
+    assert response.json()["detail"].startswith("File type not allowed")
+
+
+def test_unreadable_image_is_rejected(engine, upload):
+    response = upload(b"not really a jpeg")
+
+    assert response.status_code == 400
+    assert response.json()["detail"] == "File is not a readable image"
+    with engine.connect() as conn:
+        assert conn.execute(text("SELECT count(*) FROM photos")).scalar() == 0
+    assert _staged_files() == []
+
+
+def test_file_just_over_the_limit_is_rejected(engine, upload):
+    from uploads import MAX_FILE_SIZE
+
+    # Within the body limit's multipart headroom, so the chunked copy is what stops it
+    response = upload(b"\xff" * (MAX_FILE_SIZE + 1))
+
+    assert response.status_code == 413
+    with engine.connect() as conn:
+        assert conn.execute(text("SELECT count(*) FROM photos")).scalar() == 0
+    assert _staged_files() == []
+
+
+def test_oversized_body_is_rejected_by_content_length(upload):
+    from uploads import MAX_FILE_SIZE, MULTIPART_OVERHEAD
+
+    response = upload(b"\xff" * (MAX_FILE_SIZE + MULTIPART_OVERHEAD + 1))
+
+    assert response.status_code == 413
+    assert response.json()["detail"].startswith("File too large")
+
+
+def test_oversized_body_is_cut_off_without_content_length(client, auth_headers, batch):
+    from uploads import MAX_FILE_SIZE, MULTIPART_OVERHEAD
+
+    boundary = "plantlady-test"
+    chunk = b"\xff" * (1024 * 1024)
+    chunks = (MAX_FILE_SIZE + MULTIPART_OVERHEAD) // len(chunk) + 2
+
+    def body():
+        yield (
+            f'--{boundary}\r\nContent-Disposition: form-data; name="file"; filename="photo.jpg"\r\n'
+            "Content-Type: image/jpeg\r\n\r\n"
+        ).encode()
+        for _ in range(chunks):
+            yield chunk
+        yield f"\r\n--{boundary}--\r\n".encode()
+
+    response = client.post(
+        "/photos/upload",
+        params={"batch_id": batch},
+        content=body(),
+        headers={**auth_headers(), "Content-Type": f"multipart/form-data; boundary={boundary}"},
+    )
+
+    assert response.status_code == 413
+    assert _staged_files() == []
+
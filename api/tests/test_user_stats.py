@@ -0,0 +1,214 @@
+"""user_stats is kept current by the triggers from migration 006.
+
+Every check compares the trigger-maintained row with the hand-worked values and,
+where history is involved, with a from-scratch recount of events/plant_batches.
+"""
+
+from datetime import date, datetime, timedelta
+
+import pytest
+from sqlalchemy import text
+
+DAY = date(2026, 5, 10)
+
+
+def _stats(engine, user_id: int) -> tuple:
+    """(batch_count, event_count, last_active_day, current_streak) as the triggers left them."""
+    with engine.connect() as conn:
+        row = conn.execute(text(
+            "SELECT batch_count, event_count, last_active_day, current_streak FROM user_stats WHERE user_id = :id"
+        ), {"id": user_id}).first()
+    return tuple(row) if row else (0, 0, None, 0)
+
+
+def _recounted(engine, user_id: int) -> tuple:
+    """The same four values computed from the tables directly."""
+    with engine.connect() as conn:
+        batches = conn.execute(text("SELECT count(*) FROM plant_batches WHERE user_id = :id"), {"id": user_id}).scalar()
+        days = conn.execute(text(
+            "SELECT DISTINCT event_date::date FROM events WHERE user_id = :id ORDER BY 1 DESC"
+        ), {"id": user_id}).scalars().all()
+        events = conn.execute(text("SELECT count(*) FROM events WHERE user_id = :id"), {"id": user_id}).scalar()
+    streak = 0
+    for n, day in enumerate(days):
+        if day != days[0] - timedelta(days=n):
+            break
+        streak += 1
+    return batches, events, days[0] if days else None, streak
+
+
+def _add_events(engine, batch_id: int, user_id: int, *days: date) -> list[int]:
+    with engine.begin() as conn:
+        return conn.execute(
+            text("""
+                INSERT INTO events (batch_id, user_id, event_type, event_date)
+                SELECT :batch_id, :user_id, 'OBSERVATION', d FROM unnest(CAST(:days AS timestamp[])) d
+                RETURNING id
+            """),
+            {"batch_id": batch_id, "user_id": user_id, "days": [datetime.combine(d, datetime.min.time()) for d in days]},
+        ).scalars().all()
+
+
+def _run(engine, statement: str, **params):
+    with engine.begin() as conn:
+        conn.execute(text(statement), params)
+
+
+def _day(offset: int) -> date:
+    return DAY + timedelta(days=offset)
+
+
+@pytest.fixture
+def jamison(users):
+    return users["jamison"]
+
+
+@pytest.fixture
+def amy(users):
+    return users["amy"]
+
+
+def test_first_event_starts_a_streak(engine, batch, jamison):
+    _add_events(engine, batch, jamison, DAY)
+
+    assert _stats(engine, jamison) == (1, 1, DAY, 1)
+
+
+def test_consecutive_days_extend_the_streak(engine, batch, jamison):
+    for offset in range(3):
+        _add_events(engine, batch, jamison, _day(offset))
+
+    assert _stats(engine, jamison) == (1, 3, _day(2), 3)
+
+
+def test_second_event_on_the_same_day_only_counts(engine, batch, jamison):
+    _add_events(engine, batch, jamison, DAY)
+    _add_events(engine, batch, jamison, DAY)
+
+    assert _stats(engine, jamison) == (1, 2, DAY, 1)
+
+
+def test_gap_restarts_the_streak(engine, batch, jamison):
+    _add_events(engine, batch, jamison, _day(0))
+    _add_events(engine, batch, jamison, _day(1))
+    _add_events(engine, batch, jamison, _day(3))
+
+    assert _stats(engine, jamison) == (1, 3, _day(3), 1)
+
+
+def test_back_dated_event_joins_runs(engine, batch, jamison):
+    # Runs 0-1 and 3-4; filling day 2 makes one five-day run
+    for offset in (0, 1, 3, 4):
+        _add_events(engine, batch, jamison, _day(offset))
+    assert _stats(engine, jamison)[3] == 2
+
+    _add_events(engine, batch, jamison, _day(2))
+
+    assert _stats(engine, jamison) == (1, 5, _day(4), 5)
+
+
+def test_older_event_leaves_the_latest_run_alone(engine, batch, jamison):
+    _add_events(engine, batch, jamison, _day(5), _day(6))
+    _add_events(engine, batch, jamison, _day(0))
+
+    assert _stats(engine, jamison) == (1, 3, _day(6), 2)
+
+
+def test_multi_row_insert_matches_a_recount(engine, batch, jamison):
+    _add_events(engine, batch, jamison, _day(4), _day(0), _day(2), _day(3), _day(1), _day(3))
+
+    assert _stats(engine, jamison) == (1, 6, _day(4), 5)
+    assert _stats(engine, jamison) == _recounted(engine, jamison)
+
+
+def test_deleting_the_latest_day_recomputes(engine, batch, jamison):
+    ids = _add_events(engine, batch, jamison, _day(0), _day(1), _day(3))
+
+    _run(engine, "DELETE FROM events WHERE id = :id", id=ids[-1])
+
+    assert _stats(engine, jamison) == (1, 2, _day(1), 2)
+
+
+def test_deleting_a_middle_day_splits_the_run(engine, batch, jamison):
+    ids = _add_events(engine, batch, jamison, _day(0), _day(1), _day(2))
+
+    _run(engine, "DELETE FROM events WHERE id = :id", id=ids[1])
+
+    assert _stats(engine, jamison) == (1, 2, _day(2), 1)
+
+
+def test_deleting_every_event_clears_the_streak(engine, batch, jamison):
+    _add_events(engine, batch, jamison, _day(0), _day(1))
+
+    _run(engine, "DELETE FROM events")
+
+    assert _stats(engine, jamison) == (1, 0, None, 0)
+
+
+def test_deleting_a_batch_with_both_users_events(engine, batch, jamison, amy):
+    _add_events(engine, batch, jamison, _day(0), _day(1))
+    _add_events(engine, batch, amy, _day(1), _day(2), _day(3))
+
+    _run(engine, "DELETE FROM events WHERE batch_id = :id", id=batch)
+    _run(engine, "DELETE FROM plant_batches WHERE id = :id", id=batch)
+
+    assert _stats(engine, jamison) == (0, 0, None, 0)
+    assert _stats(engine, amy) == (0, 0, None, 0)
+
+
+def test_moving_an_event_between_users(engine, batch, jamison, amy):
+    ids = _add_events(engine, batch, jamison, _day(0), _day(1), _day(2))
+    _add_events(engine, batch, amy, _day(3))
+
+    _run(engine, "UPDATE events SET user_id = :amy WHERE id = :id", amy=amy, id=ids[2])
+
+    assert _stats(engine, jamison) == (1, 2, _day(1), 2)
+    assert _stats(engine, amy) == (0, 2, _day(3), 2)
+
+
+def test_moving_an_event_to_another_day(engine, batch, jamison):
+    ids = _add_events(engine, batch, jamison, _day(0), _day(1), _day(5))
+
+    _run(engine, "UPDATE events SET event_date = :d WHERE id = :id", d=_day(2), id=ids[2])
+
+    assert _stats(engine, jamison) == (1, 3, _day(2), 3)
+
+
+def test_multi_row_update_matches_a_recount(engine, batch, jamison, amy):
+    _add_events(engine, batch, jamison, *(_day(n) for n in range(6)))
+
+    _run(engine, "UPDATE events SET user_id = :amy WHERE event_date >= :d", amy=amy, d=_day(3))
+    _run(engine, "UPDATE events SET event_date = event_date + interval '10 days' WHERE user_id = :amy", amy=amy)
+
+    assert _stats(engine, jamison) == _recounted(engine, jamison) == (1, 3, _day(2), 3)
+    assert _stats(engine, amy) == _recounted(engine, amy) == (0, 3, _day(15), 3)
+
+
+def test_batches_are_counted_on_insert_delete_and_reassign(engine, batch, jamison, amy):
+    with engine.begin() as conn:
+        conn.execute(text("""
+            INSERT INTO plant_batches (user_id, variety_id, season_id, start_date)
+            SELECT :amy, variety_id, season_id, now() FROM plant_batches, generate_series(1, 3)
+        """), {"amy": amy})
+    assert (_stats(engine, jamison)[0], _stats(engine, amy)[0]) == (1, 3)
+
+    _run(engine, "UPDATE plant_batches SET user_id = :jamison WHERE id = :id", jamison=jamison, id=batch + 1)
+    assert (_stats(engine, jamison)[0], _stats(engine, amy)[0]) == (2, 2)
+
+    _run(engine, "DELETE FROM plant_batches WHERE user_id = :amy", amy=amy)
+    assert (_stats(engine, jamison)[0], _stats(engine, amy)[0]) == (2, 0)
+    assert _stats(engine, jamison) == _recounted(engine, jamison)
+
+
+def test_stats_endpoint_only_counts_a_streak_reaching_today(client, engine, batch, jamison):
+    today = datetime.utcnow().date()
+    _add_events(engine, batch, jamison, today - timedelta(days=2), today - timedelta(days=1))
+    assert client.get(f"/users/{jamison}/stats").json() == {"batch_count": 1, "event_count": 2, "streak": 0}
+
+    _add_events(engine, batch, jamison, today)
+
+    assert client.get(f"/users/{jamison}/stats").json() == {"batch_count": 1, "event_count": 3, "streak": 3}
+
+
+def test_stats_endpoint_for_a_user_without_activity(client, jamison):
+    assert client.get(f"/users/{jamison}/stats").json() == {"batch_count": 0, "event_count": 0, "streak": 0}
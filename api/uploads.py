@@ -0,0 +1,335 @@
+"""Streaming, content-addressed photo uploads shared by every upload endpoint.
+
+Photos are stored as <sha256><ext>, so the same picture used as a batch photo,
+a care-event photo and a plant hero image is one file. The upload is copied in
+fixed-size chunks into a temp file in the storage staging directory and hashed
+on the way, in a single io-pool call (size limit enforced as the bytes are
+read). If that content is already stored the temp file is simply dropped.
+Otherwise it is normalized in the cpu pool (rotated upright, EXIF stripped - see
+imaging.normalize_upload) and handed to the storage backend (see storage.py),
+which moves it into place atomically - a reader never sees a half-written photo
+and peak memory is one chunk. The name stays the hash of the uploaded bytes, so
+the same upload still deduplicates after normalization.
+
+Files are shared, so deleting a row only calls release_photo, which unlinks the
+file and its variants once no photos / individual_plants / care_events row
+references it any more. save_upload takes the same per-filename advisory lock in
+the caller's transaction before reusing or writing a file, so a release (or
+photo_gc) can't delete it between the upload and the commit of its row.
+
+UploadSizeLimit guards the raw request body on the upload routes as well, so an
+oversized upload is cut off while it is still being received instead of after
+multipart parsing has spooled all of it.
+
+Once the owning row is committed, generate_variants runs as a background task:
+the resized derivatives are built in the cpu pool and their filenames stored on
+whichever photos / individual_plants / care_events rows point at the file.
+"""
+
+import hashlib
+import os
+import re
+import tempfile
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Optional
+
+from fastapi import HTTPException, UploadFile, status
+from sqlalchemy import func, select, text, union_all, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.responses import JSONResponse
+
+from database import AsyncSessionLocal
+from executors import run_io, run_cpu
+from imaging import make_variants, normalize_upload, read_metadata, variant_files
+from models import Photo, IndividualPlant, CareEvent
+from storage import storage
+
+ALLOWED_EXTENSIONS = {".jpg", ".jpeg", ".png", ".gif", ".webp"}
+# Spellings of the same type share one stored name
+CANONICAL_EXTENSIONS = {".jpeg": ".jpg"}
+MAX_FILE_SIZE = int(os.getenv("MAX_UPLOAD_MB", "10")) * 1024 * 1024
+UPLOAD_CHUNK_SIZE = int(os.getenv("UPLOAD_CHUNK_KB", "256")) * 1024
+
+# A just-reused file isn't deleted for this long, in case the upload that reused it
+# hasn't committed its row yet - better an orphaned file than a missing one
+RELEASE_GRACE_SECONDS = 300
+
+# <sha256><ext>, or a variant of one (<sha256>_<size>.<ext>)
+_CONTENT_ADDRESSED = re.compile(r"[0-9a-f]{64}(_[a-z]+)?\.[a-z0-9]+")
+
+# Headroom for multipart boundaries and the small form fields sent with a photo
+MULTIPART_OVERHEAD = 64 * 1024
+
+
+def _too_large(max_size: int = MAX_FILE_SIZE) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+        detail=f"File too large. Max size: {max_size / 1024 / 1024:.1f} MB"
+    )
+
+
+def upload_extension(filename: Optional[str], default: Optional[str] = None) -> str:
+    """Lower-cased extension of an uploaded filename, checked against ALLOWED_EXTENSIONS."""
+    extension = Path(filename).suffix.lower() if filename else ""
+    if not extension and default:
+        return default
+    if not filename:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="No filename provided"
+        )
+    if extension not in ALLOWED_EXTENSIONS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"File type not allowed. Must be: {', '.join(sorted(ALLOWED_EXTENSIONS))}"
+        )
+    return CANONICAL_EXTENSIONS.get(extension, extension)
+
+
+def is_content_addressed(name: str) -> bool:
+    """True for stored names derived from the file's hash - the content behind them never changes."""
+    return _CONTENT_ADDRESSED.fullmatch(name) is not None
+
+
+@dataclass(frozen=True)
+class StoredPhoto:
+    """A saved upload: its stored filename plus what was read from the image."""
+    filename: str
+    width: int
+    height: int
+    byte_size: int
+    taken_at: Optional[datetime]  # EXIF capture time
+
+
+def _open_temp():
+    return tempfile.NamedTemporaryFile(dir=storage.temp_dir, prefix=".upload-", suffix=".part", delete=False)
+
+
+def _discard(temp) -> None:
+    temp.close()
+    Path(temp.name).unlink(missing_ok=True)
+
+
+def _close(temp) -> None:
+    temp.flush()
+    os.fsync(temp.fileno())
+    temp.close()
+
+
+def _copy_and_hash(source, temp) -> str:
+    """Copy source into temp chunk by chunk and return its sha256; 413 as soon as it passes MAX_FILE_SIZE."""
+    digest = hashlib.sha256()
+    size = 0
+    while chunk := source.read(UPLOAD_CHUNK_SIZE):
+        size += len(chunk)
+        if size > MAX_FILE_SIZE:
+            raise _too_large()
+        digest.update(chunk)
+        temp.write(chunk)
+    _close(temp)
+    return digest.hexdigest()
+
+
+@asynccontextmanager
+async def staged_upload(file: UploadFile):
+    """The upload copied into the staging directory, as (temp path, sha256 hex).
+
+    The copy and hash are one io-pool call; the temp file is removed on exit.
+    """
+    temp = await run_io(_open_temp)
+    try:
+        await file.seek(0)
+        yield Path(temp.name), await run_io(_copy_and_hash, file.file, temp)
+    finally:
+        await run_io(_discard, temp)
+
+
+def _not_an_image() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        detail="File is not a readable image"
+    )
+
+
+async def save_upload(db: AsyncSession, file: UploadFile, default_extension: Optional[str] = None) -> StoredPhoto:
+    """Store an upload under its content hash and return it with its image metadata.
+
+    Raises 400 for a disallowed file type or unreadable image and 413 as soon as
+    the file passes MAX_FILE_SIZE. Content that is already stored is not written
+    again; temp files are removed on any failure. The filename's advisory lock is
+    held in db's transaction, so insert the referencing row before committing.
+    """
+    extension = upload_extension(file.filename, default_extension)
+    async with staged_upload(file) as (staged, digest):
+        filename = f"{digest}{extension}"
+        await db.execute(text("SELECT pg_advisory_xact_lock(hashtext(:name))"), {"name": filename})
+        # Already stored: bump its modified time so release_photo leaves it alone
+        if await run_io(storage.touch, filename):
+            try:
+                return StoredPhoto(filename, **await run_cpu(read_metadata, filename))
+            except Exception:
+                raise _not_an_image()
+
+        normalized = staged.with_name(f"{staged.name}.normalized")
+        try:
+            try:
+                metadata = await run_cpu(normalize_upload, str(staged), str(normalized))
+            except Exception:
+                raise _not_an_image()
+            await run_io(storage.put_file, normalized, filename)
+        except HTTPException:
+            raise
+        except Exception as e:
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"Failed to save photo: {str(e)}"
+            )
+        finally:
+            await run_io(normalized.unlink, missing_ok=True)
+    return StoredPhoto(filename, **metadata)
+
+
+def variant_updates(filename: str, variants: Optional[dict]) -> list:
+    """UPDATE statements that record variants on every row referencing filename."""
+    return [
+        update(Photo).where(Photo.filename == filename).values(variants=variants),
+        update(IndividualPlant).where(IndividualPlant.photo_url == filename).values(photo_variants=variants),
+        update(CareEvent).where(CareEvent.photo_filename == filename).values(photo_variants=variants),
+    ]
+
+
+def _references(filename: str):
+    """One row per photos / individual_plants / care_events reference to filename, with its variants."""
+    return union_all(
+        select(Photo.variants).where(Photo.filename == filename),
+        select(IndividualPlant.photo_variants).where(IndividualPlant.photo_url == filename),
+        select(CareEvent.photo_variants).where(CareEvent.photo_filename == filename),
+    ).subquery()
+
+
+def _all_exist(names: list[str]) -> bool:
+    return all(storage.exists(name) for name in names)
+
+
+async def generate_variants(filename: str) -> None:
+    """Background task: build the resized derivatives of a stored photo and record them.
+
+    A deduplicated upload reuses the variants another row already recorded.
+    """
+    async with AsyncSessionLocal() as db:
+        references = _references(filename)
+        variants = await db.scalar(select(references.c.variants).where(references.c.variants.isnot(None)).limit(1))
+
+        if not variants or not await run_io(_all_exist, variant_files(variants)):
+            try:
+                variants = await run_cpu(make_variants, filename)
+            except Exception as e:
+                # The original stays usable; backfill_variants.py can retry later
+                print(f"Warning: Failed to generate variants for {filename}: {e}")
+                return
+
+        for statement in variant_updates(filename, variants):
+            await db.execute(statement)
+        await db.commit()
+
+
+def _unlink_unless_reused(filename: str, variants: Optional[dict]) -> None:
+    stat = storage.stat(filename)
+    if stat and time.time() - stat.st_mtime < RELEASE_GRACE_SECONDS:
+        return
+    for name in [filename, *variant_files(variants)]:
+        storage.delete(name)
+
+
+async def release_photo(db: AsyncSession, filename: Optional[str], variants: Optional[dict] = None) -> None:
+    """Delete a stored photo and its variants once nothing references it.
+
+    Call after the referencing row is gone (committed). The count and unlink run
+    under an advisory lock on the filename so two releases can't race.
+    """
+    if not filename:
+        return
+    await db.execute(text("SELECT pg_advisory_xact_lock(hashtext(:name))"), {"name": filename})
+    remaining = await db.scalar(select(func.count()).select_from(_references(filename)))
+    if not remaining:
+        try:
+            await run_io(_unlink_unless_reused, filename, variants)
+        except OSError as e:
+            # Log but don't fail - the rows are already gone
+            print(f"Warning: Failed to delete file {filename}: {e}")
+    await db.commit()
+
+
+async def release_photos(db: AsyncSession, rows) -> None:
+    """release_photo for each distinct filename in (filename, variants) rows, e.g. from DELETE ... RETURNING."""
+    released = {}
+    for filename, variants in rows:
+        released[filename] = released.get(filename) or variants
+    for filename, variants in released.items():
+        await release_photo(db, filename, variants)
+
+
+class _BodyTooLarge(HTTPException):
+    """Raised from receive() - an HTTPException so body parsing re-raises it as-is."""
+
+    def __init__(self, max_size: int):
+        too_large = _too_large(max_size)
+        super().__init__(status_code=too_large.status_code, detail=too_large.detail)
+
+
+class UploadSizeLimit:
+    """ASGI middleware that rejects upload request bodies past max_size (MAX_FILE_SIZE by default).
+
+    Checks Content-Length up front, then counts bytes as they are received so a
+    chunked or lying client is cut off mid-stream with 413.
+    """
+
+    def __init__(self, app, path_prefixes: tuple[str, ...], max_size: int = MAX_FILE_SIZE):
+        self.app = app
+        self.path_prefixes = path_prefixes
+        self.max_size = max_size
+        self.max_body = max_size + MULTIPART_OVERHEAD
+
+    async def __call__(self, scope, receive, send):
+        if (
+            scope["type"] != "http"
+            or scope["method"] not in ("POST", "PUT")
+            or not scope["path"].startswith(self.path_prefixes)
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        response = JSONResponse({"detail": _too_large(self.max_size).detail}, status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE)
+        for name, value in scope["headers"]:
+            if name == b"content-length" and value.isdigit() and int(value) > self.max_body:
+                await response(scope, receive, send)
+                return
+
+        received = 0
+        started = False
+
+        async def limited_receive():
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > self.max_body:
+                    raise _BodyTooLarge(self.max_size)
+            return message
+
+        async def tracked_send(message):
+            nonlocal started
+            if message["type"] == "http.response.start":
+                started = True
+            await send(message)
+
+        try:
+            await self.app(scope, limited_receive, tracked_send)
+        except _BodyTooLarge:
+            if started:
+                raise
+            await response(scope, receive, send)
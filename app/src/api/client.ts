@@ -1,7 +1,22 @@
-import { User, Season, Variety, Batch, Event, EventType, IndividualPlant, CareEvent, CareType, UserStats, Distribution, DistributionCreate, DistributionSummary, SeasonCost, SeasonCostCreate, SeasonCostTotal, Photo, IdentifyResult } from '../types'
+import { User, Season, Variety, Batch, Event, EventType, IndividualPlant, CareEvent, CareType, UserStats, Distribution, DistributionCreate, DistributionSummary, SeasonCost, SeasonCostCreate, SeasonCostTotal, Photo, PhotoSize, PhotoVariants, IdentifyResult } from '../types'
 
 const API_BASE = '/api'
 
+// Signed session token from /auth/login, sent on every request
+let accessToken: string | null = sessionStorage.getItem('plantlady-token')
+
+function apiFetch(input: string, init: RequestInit = {}): Promise<Response> {
+  if (!accessToken) return fetch(input, init)
+  const headers = new Headers(init.headers)
+  headers.set('Authorization', `Bearer ${accessToken}`)
+  return fetch(input, { ...init, headers })
+}
+
+// URL of a stored photo, preferring its resized WebP variant once it has been generated
+export function photoSrc(filename: string, variants?: PhotoVariants | null, size: PhotoSize = 'thumb'): string {
+  return `/photos/${variants?.[size]?.webp ?? filename}`
+}
+
 async function handleResponse<T>(response: Response): Promise<T> {
   if (!response.ok) {
     throw new Error(`API error: ${response.status}`)
@@ -11,30 +26,44 @@ async function handleResponse<T>(response: Response): Promise<T> {
 
 export const client = {
   // Auth
-  async login(pin: string): Promise<User> {
-    const response = await fetch(`${API_BASE}/auth/login`, {
+  // Rejects with 'API error: 409' when the PIN alone doesn't identify the user - retry with userId
+  async login(pin: string, userId?: number): Promise<User> {
+    const response = await apiFetch(`${API_BASE}/auth/login`, {
       method: 'POST',
       headers: { 'Content-Type': 'application/json' },
-      body: JSON.stringify({ pin })
+      body: JSON.stringify({ pin, user_id: userId })
     })
-    return handleResponse<User>(response)
+    const { access_token, ...user } = await handleResponse<User & { access_token: string }>(response)
+    accessToken = access_token
+    sessionStorage.setItem('plantlady-token', access_token)
+    return user
+  },
+
+  async getUsers(): Promise<Pick<User, 'id' | 'name' | 'display_color'>[]> {
+    const response = await apiFetch(`${API_BASE}/users`)
+    return handleResponse<Pick<User, 'id' | 'name' | 'display_color'>[]>(response)
+  },
+
+  clearToken(): void {
+    accessToken = null
+    sessionStorage.removeItem('plantlady-token')
   },
 
   // User Stats
   async getUserStats(userId: number): Promise<UserStats> {
-    const response = await fetch(`${API_BASE}/users/${userId}/stats`)
+    const response = await apiFetch(`${API_BASE}/users/${userId}/stats`)
     return handleResponse<UserStats>(response)
   },
 
   // Seasons
   async getSeasons(): Promise<Season[]> {
-    const response = await fetch(`${API_BASE}/seasons/`)
+    const response = await apiFetch(`${API_BASE}/seasons/`)
     return handleResponse<Season[]>(response)
   },
 
   // Varieties
   async getVarieties(): Promise<Variety[]> {
-    const response = await fetch(`${API_BASE}/plants/varieties`)
+    const response = await apiFetch(`${API_BASE}/plants/varieties`)
     return handleResponse<Variety[]>(response)
   },
 
@@ -43,7 +72,7 @@ export const client = {
     scientific_name: string
     category: string
   }): Promise<Variety> {
-    const response = await fetch(`${API_BASE}/plants/varieties`, {
+    const response = await apiFetch(`${API_BASE}/plants/varieties`, {
       method: 'POST',
       headers: { 'Content-Type': 'application/json' },
       body: JSON.stringify(data)
@@ -53,12 +82,12 @@ export const client = {
 
   // Batches
   async getBatches(seasonId: number): Promise<Batch[]> {
-    const response = await fetch(`${API_BASE}/plants/batches?season_id=${seasonId}`)
+    const response = await apiFetch(`${API_BASE}/plants/batches?season_id=${seasonId}`)
     return handleResponse<Batch[]>(response)
   },
 
   async getBatchById(batchId: number): Promise<Batch> {
-    const response = await fetch(`${API_BASE}/plants/batches/${batchId}`)
+    const response = await apiFetch(`${API_BASE}/plants/batches/${batchId}`)
     return handleResponse<Batch>(response)
   },
 
@@ -71,7 +100,7 @@ export const client = {
     source?: string
     outcome_notes?: string
   }): Promise<Batch> {
-    const response = await fetch(`${API_BASE}/plants/batches?user_id=${userId}`, {
+    const response = await apiFetch(`${API_BASE}/plants/batches?user_id=${userId}`, {
       method: 'POST',
       headers: { 'Content-Type': 'application/json' },
       body: JSON.stringify(data)
@@ -86,7 +115,7 @@ export const client = {
     event_date: string
     notes?: string
   }): Promise<Event> {
-    const response = await fetch(`${API_BASE}/events/?user_id=${userId}`, {
+    const response = await apiFetch(`${API_BASE}/events/?user_id=${userId}`, {
       method: 'POST',
       headers: { 'Content-Type': 'application/json' },
       body: JSON.stringify(data)
@@ -95,7 +124,7 @@ export const client = {
   },
 
   async getEventsForBatch(batchId: number): Promise<Event[]> {
-    const response = await fetch(`${API_BASE}/events/batch/${batchId}/timeline`)
+    const response = await apiFetch(`${API_BASE}/events/batch/${batchId}/timeline`)
     return handleResponse<Event[]>(response)
   },
 
@@ -105,7 +134,7 @@ export const client = {
     form.append('file', file)
     const params = new URLSearchParams({ user_id: String(userId), batch_id: String(batchId) })
     if (takenAt) params.append('taken_at', takenAt)
-    const response = await fetch(`${API_BASE}/photos/upload?${params}`, {
+    const response = await apiFetch(`${API_BASE}/photos/upload?${params}`, {
       method: 'POST',
       body: form
     })
@@ -113,12 +142,12 @@ export const client = {
   },
 
   async getBatchGallery(batchId: number): Promise<Photo[]> {
-    const response = await fetch(`${API_BASE}/photos/batch/${batchId}/gallery`)
+    const response = await apiFetch(`${API_BASE}/photos/batch/${batchId}/gallery`)
     return handleResponse<Photo[]>(response)
   },
 
   async deletePhoto(photoId: number): Promise<void> {
-    const response = await fetch(`${API_BASE}/photos/${photoId}`, {
+    const response = await apiFetch(`${API_BASE}/photos/${photoId}`, {
       method: 'DELETE'
     })
     if (!response.ok) {
@@ -128,12 +157,12 @@ export const client = {
 
   // Individual Plants (My Plants)
   async getPlants(userId: number): Promise<IndividualPlant[]> {
-    const response = await fetch(`${API_BASE}/individual-plants?user_id=${userId}`)
+    const response = await apiFetch(`${API_BASE}/individual-plants?user_id=${userId}`)
     return handleResponse<IndividualPlant[]>(response)
   },
 
   async getPlantCareEvents(plantId: number): Promise<CareEvent[]> {
-    const response = await fetch(`${API_BASE}/individual-plants/${plantId}/care-events`)
+    const response = await apiFetch(`${API_BASE}/individual-plants/${plantId}/care-events`)
     return handleResponse<CareEvent[]>(response)
   },
 
@@ -143,7 +172,7 @@ export const client = {
     notes?: string
     milestone_label?: string
   }): Promise<CareEvent> {
-    const response = await fetch(`${API_BASE}/individual-plants/${plantId}/care-events?user_id=${userId}`, {
+    const response = await apiFetch(`${API_BASE}/individual-plants/${plantId}/care-events?user_id=${userId}`, {
       method: 'POST',
       headers: { 'Content-Type': 'application/json' },
       body: JSON.stringify(data)
@@ -152,14 +181,14 @@ export const client = {
   },
 
   async getPlantDetail(plantId: number): Promise<IndividualPlant> {
-    const response = await fetch(`${API_BASE}/individual-plants/${plantId}`)
+    const response = await apiFetch(`${API_BASE}/individual-plants/${plantId}`)
     return handleResponse<IndividualPlant>(response)
   },
 
   async uploadPlantPhoto(plantId: number, userId: number, file: File): Promise<IndividualPlant> {
     const form = new FormData()
     form.append('file', file)
-    const response = await fetch(`${API_BASE}/individual-plants/${plantId}/photo?user_id=${userId}`, {
+    const response = await apiFetch(`${API_BASE}/individual-plants/${plantId}/photo?user_id=${userId}`, {
       method: 'POST',
       body: form
     })
@@ -173,7 +202,7 @@ export const client = {
     notes?: string
     acquired_date?: string
   }): Promise<IndividualPlant> {
-    const response = await fetch(`${API_BASE}/individual-plants?user_id=${userId}`, {
+    const response = await apiFetch(`${API_BASE}/individual-plants?user_id=${userId}`, {
       method: 'POST',
       headers: { 'Content-Type': 'application/json' },
       body: JSON.stringify(data)
@@ -182,7 +211,7 @@ export const client = {
   },
 
   async getBatchCareEvents(batchId: number): Promise<CareEvent[]> {
-    const response = await fetch(`${API_BASE}/individual-plants/batch/${batchId}/care-events`)
+    const response = await apiFetch(`${API_BASE}/individual-plants/batch/${batchId}/care-events`)
     return handleResponse<CareEvent[]>(response)
   },
 
@@ -192,7 +221,7 @@ export const client = {
     notes?: string
     milestone_label?: string
   }): Promise<CareEvent> {
-    const response = await fetch(`${API_BASE}/individual-plants/batch/${batchId}/care-events?user_id=${userId}`, {
+    const response = await apiFetch(`${API_BASE}/individual-plants/batch/${batchId}/care-events?user_id=${userId}`, {
       method: 'POST',
       headers: { 'Content-Type': 'application/json' },
       body: JSON.stringify(data)
@@ -203,7 +232,7 @@ export const client = {
   async uploadCareEventPhoto(plantId: number, eventId: number, userId: number, file: File): Promise<CareEvent> {
     const form = new FormData()
     form.append('file', file)
-    const response = await fetch(`${API_BASE}/individual-plants/${plantId}/care-events/${eventId}/photo?user_id=${userId}`, {
+    const response = await apiFetch(`${API_BASE}/individual-plants/${plantId}/care-events/${eventId}/photo?user_id=${userId}`, {
       method: 'POST',
       body: form
     })
@@ -213,12 +242,12 @@ export const client = {
   // Distributions (gifts/trades)
   async getDistributions(batchId?: number): Promise<Distribution[]> {
     const params = batchId ? `?batch_id=${batchId}` : ''
-    const response = await fetch(`${API_BASE}/distributions/${params}`)
+    const response = await apiFetch(`${API_BASE}/distributions/${params}`)
     return handleResponse<Distribution[]>(response)
   },
 
   async createDistribution(userId: number, data: DistributionCreate): Promise<Distribution> {
-    const response = await fetch(`${API_BASE}/distributions/?user_id=${userId}`, {
+    const response = await apiFetch(`${API_BASE}/distributions/?user_id=${userId}`, {
       method: 'POST',
       headers: { 'Content-Type': 'application/json' },
       body: JSON.stringify(data)
@@ -227,7 +256,7 @@ export const client = {
   },
 
   async deleteDistribution(id: number): Promise<void> {
-    const response = await fetch(`${API_BASE}/distributions/${id}`, {
+    const response = await apiFetch(`${API_BASE}/distributions/${id}`, {
       method: 'DELETE'
     })
     if (!response.ok) {
@@ -236,19 +265,19 @@ export const client = {
   },
 
   async getDistributionSummary(batchId: number): Promise<DistributionSummary> {
-    const response = await fetch(`${API_BASE}/distributions/batch/${batchId}/summary`)
+    const response = await apiFetch(`${API_BASE}/distributions/batch/${batchId}/summary`)
     return handleResponse<DistributionSummary>(response)
   },
 
   // Season Costs
   async getCosts(seasonId?: number): Promise<SeasonCost[]> {
     const params = seasonId ? `?season_id=${seasonId}` : ''
-    const response = await fetch(`${API_BASE}/costs/${params}`)
+    const response = await apiFetch(`${API_BASE}/costs/${params}`)
     return handleResponse<SeasonCost[]>(response)
   },
 
   async createCost(userId: number, data: SeasonCostCreate): Promise<SeasonCost> {
-    const response = await fetch(`${API_BASE}/costs/?user_id=${userId}`, {
+    const response = await apiFetch(`${API_BASE}/costs/?user_id=${userId}`, {
       method: 'POST',
       headers: { 'Content-Type': 'application/json' },
       body: JSON.stringify(data)
@@ -257,7 +286,7 @@ export const client = {
   },
 
   async deleteCost(id: number): Promise<void> {
-    const response = await fetch(`${API_BASE}/costs/${id}`, {
+    const response = await apiFetch(`${API_BASE}/costs/${id}`, {
       method: 'DELETE'
     })
     if (!response.ok) {
@@ -266,7 +295,7 @@ export const client = {
   },
 
   async getSeasonCostTotal(seasonId: number): Promise<SeasonCostTotal> {
-    const response = await fetch(`${API_BASE}/costs/season/${seasonId}/total`)
+    const response = await apiFetch(`${API_BASE}/costs/season/${seasonId}/total`)
     return handleResponse<SeasonCostTotal>(response)
   },
 
@@ -274,7 +303,7 @@ export const client = {
   async identifyPlant(file: File): Promise<IdentifyResult> {
     const form = new FormData()
     form.append('file', file)
-    const response = await fetch(`${API_BASE}/identify/`, {
+    const response = await apiFetch(`${API_BASE}/identify/`, {
       method: 'POST',
       body: form
     })
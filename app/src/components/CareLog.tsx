@@ -1,5 +1,6 @@
 import React, { useRef, useEffect } from 'react';
 import { CareEvent, CareType } from '../types';
+import { photoSrc } from '../api/client';
 
 const CARE_EMOJIS: Record<CareType, string> = {
   WATERING: '💧',
@@ -111,10 +112,10 @@ export const CareLog: React.FC<Props> = ({ events, scrollToDate }) => {
                   {/* Thumbnail photo */}
                   {event.photo_filename && (
                     <img
-                      src={`/photos/${event.photo_filename}`}
+                      src={photoSrc(event.photo_filename, event.photo_variants)}
                       alt="Care photo"
                       className="w-14 h-14 rounded-lg object-cover flex-shrink-0 cursor-pointer"
-                      onClick={() => window.open(`/photos/${event.photo_filename}`, '_blank')}
+                      onClick={() => window.open(photoSrc(event.photo_filename!, event.photo_variants, 'full'), '_blank')}
                     />
                   )}
                 </div>
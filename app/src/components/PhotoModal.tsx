@@ -1,6 +1,7 @@
 import React from 'react';
 import { Button } from './Button';
 import { Photo } from '../types';
+import { photoSrc } from '../api/client';
 
 interface PhotoModalProps {
   photo: Photo;
@@ -26,7 +27,7 @@ export const PhotoModal: React.FC<PhotoModalProps> = ({ photo, onClose, onDelete
         onClick={(e) => e.stopPropagation()}
       >
         <img
-          src={`/photos/${photo.filename}`}
+          src={photoSrc(photo.filename, photo.variants, 'full')}
           alt={photo.caption || 'Batch photo'}
           className="max-w-full max-h-full object-contain rounded-lg"
         />
@@ -1,5 +1,6 @@
 import { createContext, useContext, useState, useEffect } from 'react'
 import { User, Season, AuthContextType } from '../types'
+import { client } from '../api/client'
 
 const AuthContext = createContext<AuthContextType | undefined>(undefined)
 
@@ -56,6 +57,7 @@ export function AuthProvider({ children }: { children: React.ReactNode }) {
     setCurrentUser(null)
     setCurrentSeason(null)
     sessionStorage.removeItem('plantlady-session')
+    client.clearToken()
   }
 
   const value: AuthContextType = {
@@ -7,7 +7,7 @@ import { CareCalendar } from '../components/CareCalendar';
 import { CareLog } from '../components/CareLog';
 import { LogCareModal } from '../components/LogCareModal';
 import { Batch, Event, Variety, Distribution, DistributionSummary, Photo, CareEvent, CareType } from '../types';
-import { client } from '../api/client';
+import { client, photoSrc } from '../api/client';
 import { useAuth } from '../context/AuthContext';
 
 const eventTypeEmojis: Record<string, string> = {
@@ -414,7 +414,7 @@ export const BatchDetailPage: React.FC = () => {
                     className="aspect-square rounded-lg overflow-hidden bg-brand-sage/10"
                   >
                     <img
-                      src={`/photos/${photo.filename}`}
+                      src={photoSrc(photo.filename, photo.variants)}
                       alt={photo.caption || 'Batch photo'}
                       className="w-full h-full object-cover"
                     />
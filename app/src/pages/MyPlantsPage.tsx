@@ -2,7 +2,7 @@ import React, { useState, useEffect } from 'react';
 import { useNavigate } from 'react-router-dom';
 import { PlantGridCard } from '../components/PlantGridCard';
 import { Button } from '../components/Button';
-import { client } from '../api/client';
+import { client, photoSrc } from '../api/client';
 import { useAuth } from '../context/AuthContext';
 import { IndividualPlant } from '../types';
 
@@ -31,7 +31,7 @@ export const MyPlantsPage: React.FC = () => {
         const displayPlants: PlantDisplay[] = userPlants.map((plant: IndividualPlant) => ({
           id: plant.id,
           name: plant.common_name,
-          photoUrl: plant.photo_url,
+          photoUrl: plant.photo_url ? photoSrc(plant.photo_url, plant.photo_variants) : undefined,
           careUrgency: 'healthy',
           careLabel: 'Tap to view care history',
         }));
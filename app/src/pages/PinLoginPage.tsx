@@ -4,14 +4,40 @@ import { useAuth } from '../context/AuthContext'
 import { client } from '../api/client'
 import { LoadingSpinner } from '../components/LoadingSpinner'
 import { Card } from '../components/Card'
+import { User } from '../types'
+
+type UserChoice = Pick<User, 'id' | 'name' | 'display_color'>
 
 export default function PinLoginPage() {
   const [pin, setPin] = useState('')
   const [error, setError] = useState('')
   const [loading, setLoading] = useState(false)
+  // Set when the PIN matches more than one user (or an unindexed one) - pick who's logging in
+  const [choices, setChoices] = useState<UserChoice[] | null>(null)
   const navigate = useNavigate()
   const { selectUser } = useAuth()
 
+  const submit = async (pinToTry: string, userId?: number) => {
+    setLoading(true)
+    try {
+      const user = await client.login(pinToTry, userId)
+      const seasons = await client.getSeasons()
+      const currentSeason = seasons[0]
+      selectUser(user, currentSeason)
+      navigate('/today')
+    } catch (err) {
+      if (userId === undefined && err instanceof Error && err.message === 'API error: 409') {
+        setChoices(await client.getUsers())
+        setLoading(false)
+        return
+      }
+      setChoices(null)
+      setError('Invalid PIN')
+      setPin('')
+      setLoading(false)
+    }
+  }
+
   const handleDigit = async (digit: string) => {
     const newPin = pin + digit
     setPin(newPin)
@@ -19,18 +45,7 @@ export default function PinLoginPage() {
 
     // Auto-submit on 4th digit
     if (newPin.length === 4) {
-      setLoading(true)
-      try {
-        const user = await client.login(newPin)
-        const seasons = await client.getSeasons()
-        const currentSeason = seasons[0]
-        selectUser(user, currentSeason)
-        navigate('/today')
-      } catch (err) {
-        setError('Invalid PIN')
-        setPin('')
-        setLoading(false)
-      }
+      await submit(newPin)
     }
   }
 
@@ -42,6 +57,7 @@ export default function PinLoginPage() {
   const handleClear = () => {
     setPin('')
     setError('')
+    setChoices(null)
   }
 
   if (loading) {
@@ -52,6 +68,38 @@ export default function PinLoginPage() {
     )
   }
 
+  if (choices) {
+    return (
+      <div className="min-h-screen bg-[var(--color-bg)] flex flex-col items-center justify-center p-4">
+        <div className="w-full max-w-sm">
+          <Card variant="elevated" className="p-8 mb-8">
+            <p className="font-body text-sm text-[var(--color-text-2)] text-center mb-4">
+              Who's logging in?
+            </p>
+            <div className="space-y-3">
+              {choices.map((choice) => (
+                <button
+                  key={choice.id}
+                  onClick={() => submit(pin, choice.id)}
+                  className="w-full h-14 bg-[var(--color-surface)] border border-[var(--color-border)] rounded-lg text-lg font-body font-semibold text-[var(--color-text)] hover:bg-[var(--color-surface-2)] transition"
+                  style={{ borderLeft: `6px solid ${choice.display_color}` }}
+                >
+                  {choice.name}
+                </button>
+              ))}
+              <button
+                onClick={handleClear}
+                className="w-full h-12 text-sm font-body text-[var(--color-text-2)] hover:text-[var(--color-text)] transition"
+              >
+                ← Back
+              </button>
+            </div>
+          </Card>
+        </div>
+      </div>
+    )
+  }
+
   return (
     <div className="min-h-screen bg-[var(--color-bg)] flex flex-col items-center justify-center p-4">
       <div className="w-full max-w-sm">
@@ -5,7 +5,7 @@ import { CareCalendar } from '../components/CareCalendar';
 import { CareLog } from '../components/CareLog';
 import { LogCareModal } from '../components/LogCareModal';
 import { Button } from '../components/Button';
-import { client } from '../api/client';
+import { client, photoSrc } from '../api/client';
 import { useAuth } from '../context/AuthContext';
 import { IndividualPlant, CareEvent, CareType } from '../types';
 
@@ -99,7 +99,7 @@ export const PlantDetailPage: React.FC = () => {
         {/* Hero Section */}
         <PlantHeroSection
           plantName={plant.common_name}
-          photoUrl={plant.photo_url}
+          photoUrl={plant.photo_url ? photoSrc(plant.photo_url, plant.photo_variants, 'medium') : undefined}
           location={plant.location || 'Unknown'}
           dateAdded={dateAdded}
         />
@@ -84,6 +84,7 @@ export interface IndividualPlant {
   scientific_name?: string
   location?: string
   photo_url?: string
+  photo_variants?: PhotoVariants | null
   acquired_date?: string
   created_at: string
 }
@@ -100,6 +101,7 @@ export interface CareEvent {
   notes?: string
   milestone_label?: string | null
   photo_filename?: string
+  photo_variants?: PhotoVariants | null
   created_at: string
 }
 
@@ -174,12 +176,20 @@ export interface SeasonCostCreate {
 }
 
 // Photos attached to batches
+// Resized copies of a stored photo, generated in the background after upload
+export type PhotoSize = 'thumb' | 'medium' | 'full'
+export type PhotoVariants = Record<PhotoSize, { webp: string; jpg: string }>
+
 export interface Photo {
   id: number
   batch_id: number
   event_id: number | null
   user_id: number
   filename: string
+  width?: number | null
+  height?: number | null
+  byte_size?: number | null
+  variants?: PhotoVariants | null
   caption: string | null
   taken_at: string
   created_at: string